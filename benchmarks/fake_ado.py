@@ -0,0 +1,113 @@
+"""Local stand-in for the Azure DevOps REST API used by benchmarks."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+_THREADS_PATH = re.compile(
+    r"^/(?P<org>[^/]+)/(?P<project>[^/]+)/_apis/git/repositories/(?P<repo>[^/]+)"
+    r"/pullRequests/(?P<id>\d+)/threads$",
+    re.IGNORECASE,
+)
+
+
+class FakeAzureDevOps:
+    """Serve canned thread payloads over HTTP on a random local port.
+
+    Payloads are registered per PR id and pre-encoded once, so the server
+    adds as little overhead as possible to the measurements. ETags are
+    honoured so cache revalidation can be exercised too.
+    """
+
+    def __init__(self, *, organization: str = "bench", latency: float = 0.0) -> None:
+        self.organization = organization
+        self.latency = latency
+        self.requests = 0
+        self._bodies: Dict[int, bytes] = {}
+        self._etags: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def organization_url(self) -> str:
+        assert self._server is not None, "server not started"
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/{self.organization}"
+
+    def add_threads(self, pr_id: int, payload: Dict[str, Any]) -> None:
+        self.add_threads_body(pr_id, json.dumps(payload).encode("utf-8"))
+
+    def add_threads_body(self, pr_id: int, body: bytes) -> None:
+        self._bodies[pr_id] = body
+        self._etags[pr_id] = '"' + hashlib.sha1(body).hexdigest() + '"'
+
+    def start(self) -> "FakeAzureDevOps":
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:  # noqa: N802 - http.server naming
+                fake._handle(self)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                return
+
+        class Server(ThreadingHTTPServer):
+            # The default backlog of 5 drops connections under concurrent load.
+            request_queue_size = 128
+            daemon_threads = True
+
+        self._server = Server(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeAzureDevOps":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+    def _handle(self, handler: BaseHTTPRequestHandler) -> None:
+        with self._lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        match = _THREADS_PATH.match(urlsplit(handler.path).path)
+        pr_id = int(match.group("id")) if match else None
+        if pr_id is None or pr_id not in self._bodies:
+            self._send(handler, 404, b'{"message": "not found"}')
+            return
+
+        etag = self._etags[pr_id]
+        if handler.headers.get("If-None-Match") == etag:
+            self._send(handler, 304, b"", etag=etag)
+            return
+        self._send(handler, 200, self._bodies[pr_id], etag=etag)
+
+    @staticmethod
+    def _send(handler: BaseHTTPRequestHandler, status: int, body: bytes, *, etag: Optional[str] = None) -> None:
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json; charset=utf-8")
+        handler.send_header("Content-Length", str(len(body)))
+        if etag:
+            handler.send_header("ETag", etag)
+        handler.end_headers()
+        if body:
+            handler.wfile.write(body)
@@ -0,0 +1,136 @@
+"""Benchmark comment normalization and serialization against validated models.
+
+Run with `python -m benchmarks.normalize --comments 10000`. The reference
+path rebuilds every comment through Pydantic validation and recomputes the
+thread-level fields per comment; the script fails if its output differs
+from the fast path.
+
+The `*_build_s` timings isolate turning the normalized records into response
+models: the single validation call the fast path uses, the same call in
+strict mode, and `model_construct` per record without any validation.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import Any, Callable, Dict, List
+
+from ado_review_lens.models import CommentModel, CommentsResponse, PullRequestTarget
+from ado_review_lens.service import (
+    _ThreadWalk,
+    _build_response,
+    _extract_author_id,
+    _extract_author_name,
+    _extract_file_path,
+    _extract_line_range,
+    _extract_resolved_by,
+    _extract_timestamp,
+)
+
+from .payloads import make_threads_payload
+
+_TARGET = PullRequestTarget(organization="example", project="team", repository="repo", pullRequestId=1)
+
+
+def reference_response(payload: Dict[str, Any]) -> CommentsResponse:
+    """Normalize with full per-comment validation, as before the fast path."""
+
+    comments: List[CommentModel] = []
+    active_thread_ids = set()
+    for thread in payload["value"]:
+        status = (thread.get("status") or "").lower()
+        if thread.get("isDeleted") or (status and status != "active"):
+            continue
+        thread_id = thread.get("id")
+        for comment in thread.get("comments", []):
+            if comment.get("isDeleted") or comment.get("commentType") == "system" or not comment.get("content"):
+                continue
+            active_thread_ids.add(thread_id)
+            comments.append(
+                CommentModel(
+                    commentId=str(comment.get("id")),
+                    threadId=int(thread_id) if thread_id is not None else -1,
+                    commentText=comment.get("content"),
+                    filePath=_extract_file_path(thread),
+                    lineRange=_extract_line_range(thread),
+                    authorDisplayName=_extract_author_name(comment),
+                    authorId=_extract_author_id(comment),
+                    timestamp=_extract_timestamp(comment),
+                    status=thread.get("status") or "unknown",
+                    isDeleted=False,
+                    resolvedBy=_extract_resolved_by(thread),
+                    externalId=None,
+                )
+            )
+    cursor = max((thread["lastUpdatedDate"] for thread in payload["value"]), default=None)
+    return CommentsResponse(
+        pr=_TARGET.pull_request_id,
+        repo=_TARGET.repository,
+        activeThreads=len(active_thread_ids),
+        comments=comments,
+        cursor=cursor,
+    )
+
+
+def fast_response(payload: Dict[str, Any]) -> CommentsResponse:
+    return _build_response(_TARGET, payload["value"])
+
+
+def validated_build(records: List[Dict[str, Any]], strict: bool) -> CommentsResponse:
+    return CommentsResponse.model_validate({"comments": records}, strict=strict)
+
+
+def constructed_build(records: List[Dict[str, Any]]) -> CommentsResponse:
+    return CommentsResponse.model_construct(comments=[CommentModel.model_construct(**record) for record in records])
+
+
+def check_parity(payload: Dict[str, Any]) -> None:
+    expected = reference_response(payload)
+    actual = fast_response(payload)
+    if json.loads(actual.model_dump_json(by_alias=True)) != expected.model_dump(by_alias=True):
+        raise AssertionError("fast normalization output differs from the validated reference")
+
+
+def _best_of(repeat: int, fn: Callable[[], Any]) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(comment_count: int, repeat: int) -> Dict[str, float]:
+    payload = make_threads_payload(comment_count)
+    check_parity(payload)
+    reference = reference_response(payload)
+    fast = fast_response(payload)
+    records = list(_ThreadWalk(_TARGET, None).comments(payload["value"]))
+
+    return {
+        "comments": float(comment_count),
+        "reference_normalize_s": _best_of(repeat, lambda: reference_response(payload)),
+        "fast_normalize_s": _best_of(repeat, lambda: fast_response(payload)),
+        "validate_build_s": _best_of(repeat, lambda: validated_build(records, strict=False)),
+        "strict_build_s": _best_of(repeat, lambda: validated_build(records, strict=True)),
+        "construct_build_s": _best_of(repeat, lambda: constructed_build(records)),
+        "reference_serialize_s": _best_of(
+            repeat, lambda: json.dumps(reference.model_dump(by_alias=True), indent=2).encode("utf-8")
+        ),
+        "fast_serialize_s": _best_of(repeat, lambda: fast.model_dump_json(by_alias=True, indent=2)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--comments", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.comments, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
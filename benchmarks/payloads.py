@@ -0,0 +1,74 @@
+"""Synthetic Azure DevOps thread payloads for benchmarks and tests."""
+
+from __future__ import annotations
+
+import random
+from typing import Any, Dict, List
+
+_STATUSES = ["active", "active", "active", "fixed", "closed", "wontFix", "pending"]
+
+
+def make_threads_payload(comment_count: int, *, comments_per_thread: int = 5, seed: int = 0) -> Dict[str, Any]:
+    """Return a `threads` response body with roughly `comment_count` comments.
+
+    The mix mirrors real PRs: mostly active file threads, some resolved or
+    deleted threads, system comments, deleted replies and PR-level threads
+    without a file context.
+    """
+
+    rng = random.Random(seed)
+    threads: List[Dict[str, Any]] = []
+    thread_id = 0
+    remaining = comment_count
+
+    while remaining > 0:
+        thread_id += 1
+        size = min(remaining, rng.randint(1, comments_per_thread * 2 - 1))
+        remaining -= size
+        threads.append(_make_thread(rng, thread_id, size))
+
+    return {"count": len(threads), "value": threads}
+
+
+def _make_thread(rng: random.Random, thread_id: int, size: int) -> Dict[str, Any]:
+    day = 1 + thread_id % 28
+    thread: Dict[str, Any] = {
+        "id": thread_id,
+        "status": rng.choice(_STATUSES),
+        "isDeleted": rng.random() < 0.05,
+        "publishedDate": f"2024-03-{day:02d}T08:00:00.000Z",
+        "lastUpdatedDate": f"2024-03-{day:02d}T{rng.randint(8, 20):02d}:30:00.1234567Z",
+        "properties": {
+            "Microsoft.TeamFoundation.Discussion.SupportsMarkdown": {"$type": "System.Int32", "$value": 1},
+            "CodeReviewThreadType": {"$type": "System.String", "$value": "Summary"},
+        },
+        "comments": [_make_comment(rng, thread_id, index) for index in range(1, size + 1)],
+    }
+    if rng.random() < 0.8:
+        start = rng.randint(1, 400)
+        thread["threadContext"] = {
+            "filePath": f"/src/module_{thread_id % 50}/file_{thread_id % 7}.py",
+            "rightFileStart": {"line": start, "offset": 1},
+            "rightFileEnd": {"line": start + rng.randint(0, 6), "offset": 12},
+        }
+    if thread["status"] != "active" and rng.random() < 0.5:
+        thread["properties"]["CodeReviewResolvedBy"] = {"$type": "System.String", "$value": "Reviewer Two"}
+    return thread
+
+
+def _make_comment(rng: random.Random, thread_id: int, index: int) -> Dict[str, Any]:
+    author = rng.randint(1, 12)
+    return {
+        "id": index,
+        "parentCommentId": 0 if index == 1 else index - 1,
+        "author": {
+            "displayName": f"Reviewer {author}",
+            "uniqueName": f"reviewer{author}@example.com",
+            "id": f"00000000-0000-0000-0000-{author:012d}",
+        },
+        "content": f"Comment {index} on thread {thread_id}: " + "please consider renaming this " * rng.randint(1, 6),
+        "publishedDate": "2024-03-01T09:00:00.000Z",
+        "lastUpdatedDate": f"2024-03-{1 + thread_id % 28:02d}T10:{index % 60:02d}:00.000Z",
+        "commentType": "system" if rng.random() < 0.1 else "text",
+        "isDeleted": rng.random() < 0.03,
+    }
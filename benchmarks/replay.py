@@ -0,0 +1,120 @@
+"""Profile comment fetches of pull requests recorded in a cassette.
+
+Record real PRs once with `AZDO_CASSETTE=prs.jsonl.gz AZDO_CASSETTE_MODE=record`
+and any CLI or server call, then run `python -m benchmarks.replay prs.jsonl.gz`
+to time every recorded PR offline and deterministically. `--latency-ms`
+simulates network latency, `--profile` prints the hottest functions, and
+`--baseline` fails on regressions as in `benchmarks.run`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+from urllib.parse import unquote
+
+from .normalize import _best_of
+from .run import _best_of_async, compare
+
+_THREADS_REQUEST = re.compile(
+    r"^GET (?P<base>https?://.+?)/(?P<project>[^/]+)/_apis/git/repositories/"
+    r"(?P<repo>[^/]+)/pullRequests/(?P<pr>\d+)/threads\?"
+)
+
+
+def recorded_pull_requests(path: Path) -> Tuple[str, List[Tuple[str, str, int]]]:
+    """Return the organization URL and `(project, repo, pr)` of every recorded threads request."""
+
+    from ado_review_lens.cassette import Cassette
+
+    organization_url = ""
+    pull_requests = []
+    for request in Cassette(path).requests():
+        match = _THREADS_REQUEST.match(request)
+        if match is None:
+            continue
+        organization_url = match.group("base")
+        pull_requests.append((unquote(match.group("project")), unquote(match.group("repo")), int(match.group("pr"))))
+    return organization_url, sorted(pull_requests)
+
+
+def run(path: Path, *, repeat: int, latency_ms: float, profile: bool) -> Dict[str, float]:
+    organization_url, pull_requests = recorded_pull_requests(path)
+    if not pull_requests:
+        raise SystemExit(f"{path} holds no recorded pull request threads")
+
+    # Replay never reaches Azure DevOps; the cache is disabled so every
+    # measurement includes the (simulated) round trip.
+    os.environ.update(
+        {
+            "AZDO_ORG_URL": organization_url,
+            "AZDO_CASSETTE": str(path),
+            "AZDO_CASSETTE_MODE": "replay",
+            "AZDO_REPLAY_LATENCY_MS": str(latency_ms),
+            "AZDO_CACHE_MAX_ENTRIES": "0",
+        }
+    )
+    os.environ.pop("AZDO_STORE_PATH", None)
+
+    from ado_review_lens.service import fetch_comments, fetch_comments_async
+
+    metrics: Dict[str, float] = {}
+    profiler = cProfile.Profile() if profile else None
+    for project, repo, pr_id in pull_requests:
+        options = dict(pr_id=pr_id, project=project, repo=repo, allow_cross_project=True)
+        label = f"{project}/{repo}#{pr_id}"
+        if profiler is not None:
+            profiler.enable()
+        metrics[f"fetch_sync_s[{label}]"] = _best_of(repeat, lambda: fetch_comments(**options))
+        metrics[f"fetch_async_s[{label}]"] = _best_of_async(repeat, lambda: fetch_comments_async(**options))
+        if profiler is not None:
+            profiler.disable()
+
+    if profiler is not None:
+        report = io.StringIO()
+        pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(25)
+        print(report.getvalue(), file=sys.stderr)
+    return metrics
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("cassette", type=Path)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--profile", action="store_true")
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--baseline", type=Path, default=None)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    metrics = run(args.cassette, repeat=args.repeat, latency_ms=args.latency_ms, profile=args.profile)
+    result = {
+        "meta": {"python": sys.version.split()[0], "cassette": str(args.cassette), "latencyMs": args.latency_ms},
+        "metrics": metrics,
+    }
+    print(json.dumps(metrics, indent=2))
+    if args.output is not None:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(metrics, baseline["metrics"], args.tolerance)
+        if regressions:
+            print("Regressions against baseline:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""End-to-end benchmark suite against a local Azure DevOps stand-in.
+
+Run with `python -m benchmarks.run`. Synthetic thread payloads are served by
+`benchmarks.fake_ado`, and the suite measures `fetch_comments` end to end,
+normalization alone, serialization alone, and the FastAPI and MCP endpoints
+under concurrent load. Results are written as JSON; pass `--baseline` with an
+earlier result file to fail on regressions.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Sequence
+
+from .fake_ado import FakeAzureDevOps
+from .normalize import _best_of, check_parity, fast_response
+from .payloads import make_threads_payload
+
+_DEFAULT_SIZES = (10, 100, 1_000, 10_000, 50_000)
+_RESULTS_DIR = Path(__file__).parent / "results"
+_PROJECT = "bench"
+_REPO = "bench"
+
+# PR ids are `size slot * _ID_STRIDE + n` so load tests can hit distinct PRs
+# of the same size without being collapsed by request coalescing.
+_ID_STRIDE = 100_000
+
+
+def _configure_environment(organization_url: str) -> None:
+    # Set before the API and MCP modules build their runtimes. The cache is
+    # disabled so every measurement includes the upstream round trip.
+    os.environ.update(
+        {
+            "AZDO_ORG_URL": organization_url,
+            "AZDO_PAT": "bench",
+            "AZDO_PROJECT": _PROJECT,
+            "AZDO_REPO": _REPO,
+            "AZDO_CACHE_MAX_ENTRIES": "0",
+        }
+    )
+
+
+def _pr_id(slot: int, n: int = 0) -> int:
+    return (slot + 1) * _ID_STRIDE + n
+
+
+def _percentile(samples: Sequence[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _best_of_async(repeat: int, fn: Callable[[], Awaitable[Any]]) -> float:
+    async def run() -> float:
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            await fn()
+            best = min(best, time.perf_counter() - started)
+        return best
+
+    return asyncio.run(run())
+
+
+def bench_size(slot: int, comment_count: int, repeat: int) -> Dict[str, float]:
+    """Measure one payload size: normalize, serialize and fetch end to end."""
+
+    from ado_review_lens.service import fetch_comments, fetch_comments_async
+
+    payload = make_threads_payload(comment_count)
+    check_parity(payload)
+    response = fast_response(payload)
+    pr_id = _pr_id(slot)
+
+    return {
+        "normalize_s": _best_of(repeat, lambda: fast_response(payload)),
+        "serialize_s": _best_of(repeat, lambda: response.model_dump_json(by_alias=True, indent=2)),
+        "fetch_sync_s": _best_of(repeat, lambda: fetch_comments(pr_id=pr_id)),
+        "fetch_async_s": _best_of_async(repeat, lambda: fetch_comments_async(pr_id=pr_id)),
+    }
+
+
+async def _load(
+    call: Callable[[int], Awaitable[Any]], pr_ids: Sequence[int], concurrency: int
+) -> Dict[str, float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one(pr_id: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await call(pr_id)
+            latencies.append(time.perf_counter() - started)
+
+    # Warm up connection pools and lazily built clients outside the timing.
+    await call(pr_ids[0])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(pr_id) for pr_id in pr_ids))
+    total = time.perf_counter() - started
+    return {
+        "total_s": total,
+        "p50_s": statistics.median(latencies),
+        "p95_s": _percentile(latencies, 0.95),
+        "requests_per_s": len(pr_ids) / total,
+    }
+
+
+async def bench_api(pr_ids: Sequence[int], concurrency: int) -> Dict[str, float]:
+    """Drive `POST /api/v1/pr/comments` through an in-process ASGI transport."""
+
+    import httpx
+
+    from ado_review_lens.api import _runtime, app
+
+    async def call(pr_id: int) -> None:
+        response = await client.post("/api/v1/pr/comments", json={"prId": pr_id})
+        response.raise_for_status()
+
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            return await _load(call, pr_ids, concurrency)
+    finally:
+        await _runtime.aclose()
+
+
+async def bench_mcp(pr_ids: Sequence[int], concurrency: int) -> Dict[str, float]:
+    """Call the `fetch_pr_comments` MCP tool concurrently."""
+
+    from ado_review_lens import server
+
+    async def call(pr_id: int) -> None:
+        await server.mcp.call_tool("fetch_pr_comments", {"pr": pr_id})
+
+    try:
+        return await _load(call, pr_ids, concurrency)
+    finally:
+        await server._get_runtime().aclose()
+
+
+def run(
+    sizes: Sequence[int],
+    *,
+    repeat: int,
+    load_comments: int,
+    load_requests: int,
+    concurrency: int,
+) -> Dict[str, Any]:
+    metrics: Dict[str, float] = {}
+    with FakeAzureDevOps() as fake:
+        _configure_environment(fake.organization_url)
+
+        for slot, size in enumerate(sizes):
+            fake.add_threads(_pr_id(slot), make_threads_payload(size))
+            for name, value in bench_size(slot, size, repeat).items():
+                metrics[f"{name}[{size}]"] = value
+
+        load_slot = len(sizes)
+        body = json.dumps(make_threads_payload(load_comments)).encode("utf-8")
+        pr_ids = [_pr_id(load_slot, n) for n in range(load_requests)]
+        for pr_id in pr_ids:
+            fake.add_threads_body(pr_id, body)
+
+        for prefix, bench in (("api", bench_api), ("mcp", bench_mcp)):
+            for name, value in asyncio.run(bench(pr_ids, concurrency)).items():
+                metrics[f"{prefix}_{name}[{load_comments}]"] = value
+
+        upstream_requests = fake.requests
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "sizes": list(sizes),
+            "repeat": repeat,
+            "loadComments": load_comments,
+            "loadRequests": load_requests,
+            "concurrency": concurrency,
+            "upstreamRequests": upstream_requests,
+        },
+        "metrics": metrics,
+    }
+
+
+def compare(current: Dict[str, float], baseline: Dict[str, float], tolerance: float) -> List[str]:
+    """Return a description of every metric that regressed beyond `tolerance`.
+
+    Throughput metrics (`*_per_s`) regress when they fall; all others are
+    durations and regress when they grow.
+    """
+
+    regressions = []
+    for name, before in baseline.items():
+        after = current.get(name)
+        if after is None or before <= 0:
+            continue
+        ratio = after / before
+        if name.split("[")[0].endswith("_per_s"):
+            regressed = ratio < 1 / (1 + tolerance)
+        else:
+            regressed = ratio > 1 + tolerance
+        if regressed:
+            regressions.append(f"{name}: {before:.6g} -> {after:.6g} ({ratio:.2f}x)")
+    return regressions
+
+
+def _parse_sizes(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=_parse_sizes, default=list(_DEFAULT_SIZES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--load-comments", type=int, default=1_000)
+    parser.add_argument("--load-requests", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--baseline", type=Path, default=None)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    # The MCP server enables INFO logging; per-request httpx lines drown the output.
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    result = run(
+        args.sizes,
+        repeat=args.repeat,
+        load_comments=args.load_comments,
+        load_requests=args.load_requests,
+        concurrency=args.concurrency,
+    )
+
+    output = args.output
+    if output is None:
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        output = _RESULTS_DIR / f"{stamp}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+
+    print(json.dumps(result["metrics"], indent=2))
+    print(f"Results written to {output}", file=sys.stderr)
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(result["metrics"], baseline["metrics"], args.tolerance)
+        if regressions:
+            print("Regressions against baseline:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
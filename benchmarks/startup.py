@@ -0,0 +1,92 @@
+"""Measure cold-start import cost of the CLI and MCP server entry points.
+
+Run with `python -m benchmarks.startup`. Each entry point is imported in a
+fresh interpreter under `-X importtime` and the cumulative time of its
+top-level module is reported; `--version` paths are timed end to end.
+Pass `--baseline` with an earlier result file to fail on regressions.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from .run import compare
+
+# Module imported by each entry point, as `python -m <module>` would.
+_IMPORTS = {
+    "cli": "ado_review_lens.cli",
+    "server": "ado_review_lens.server",
+    "service": "ado_review_lens.service",
+    "api": "ado_review_lens.api",
+}
+
+_COMMANDS = {
+    "cli_version": ["-m", "ado_review_lens", "--version"],
+    "server_version": ["-m", "ado_review_lens.server", "--version"],
+}
+
+
+def import_time(module: str) -> float:
+    """Return the cumulative import time of `module` in seconds."""
+
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in completed.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = [part.strip() for part in line.removeprefix("import time:").split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1_000_000
+    raise RuntimeError(f"{module} did not appear in the import-time report")
+
+
+def command_time(args: List[str]) -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, *args], capture_output=True, check=True)
+    return time.perf_counter() - started
+
+
+def run(repeat: int) -> Dict[str, float]:
+    metrics: Dict[str, float] = {}
+    for name, module in _IMPORTS.items():
+        metrics[f"import_{name}_s"] = min(import_time(module) for _ in range(repeat))
+    for name, args in _COMMANDS.items():
+        metrics[f"{name}_s"] = min(command_time(args) for _ in range(repeat))
+    return metrics
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--baseline", type=Path, default=None)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    result = {"meta": {"python": sys.version.split()[0], "repeat": args.repeat}, "metrics": run(args.repeat)}
+    print(json.dumps(result["metrics"], indent=2))
+    if args.output is not None:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(result["metrics"], baseline["metrics"], args.tolerance)
+        if regressions:
+            print("Regressions against baseline:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
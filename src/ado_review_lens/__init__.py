@@ -0,0 +1,4 @@
+"""Fetch active Azure DevOps pull request comments."""
+
+# Kept free of imports so `--version` and `--health` start instantly.
+__version__ = "0.1.1"
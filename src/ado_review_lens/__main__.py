@@ -0,0 +1,21 @@
+"""Console entry point that answers `--version`/`--health` before loading the CLI."""
+
+from __future__ import annotations
+
+import sys
+
+
+def main() -> None:
+    from .startup import run_fast_path
+
+    code = run_fast_path(sys.argv[1:])
+    if code is not None:
+        sys.exit(code)
+
+    from .cli import app
+
+    app()
+
+
+if __name__ == "__main__":
+    main()
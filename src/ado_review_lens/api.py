@@ -2,24 +2,135 @@
 
 from __future__ import annotations
 
-from fastapi import FastAPI, HTTPException
+import base64
+import binascii
+import hmac
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
 
+from fastapi import Body, FastAPI, Header, HTTPException
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+
+from .encoding import MIN_COMPRESS_SIZE, compress, compress_stream, dump_model, dumps, negotiate
 from .errors import AzureDevOpsRequestError, MCPUserError, MissingConfigurationError
-from .models import CommentsResponse, ErrorResponse, FetchRequest
-from .service import fetch_comments
+from .metrics import render as render_metrics
+from .metrics import timed
+from .models import (
+    BatchCommentsResponse,
+    BatchFetchRequest,
+    BatchItemResult,
+    CacheStats,
+    CommentsResponse,
+    ErrorResponse,
+    FetchRequest,
+    MCPConfig,
+    RepoScanRequest,
+    RuntimeStats,
+    WebhookResult,
+)
+from .runtime import LensRuntime
+from .service import (
+    comment_filter,
+    fetch_comments_async,
+    fetch_comments_batch_async,
+    stream_comments_async,
+    stream_repository_scan_async,
+    timed_out_prs,
+)
+from .threads import render_response
+from .webhooks import apply_event, verify_secret
+
+_runtime = LensRuntime()
+
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI) -> AsyncIterator[None]:
+    try:
+        yield
+    finally:
+        await _runtime.aclose()
+
 
-app = FastAPI(title="AdoReviewLens API")
+app = FastAPI(title="AdoReviewLens API", lifespan=_lifespan)
 
 
 @app.post("/api/v1/pr/comments", response_model=CommentsResponse)
-async def get_pr_comments(request: FetchRequest) -> CommentsResponse:
+async def get_pr_comments(
+    request: FetchRequest,
+    accept_encoding: Optional[str] = Header(default=None),
+    x_deadline: Optional[float] = Header(default=None, gt=0),
+) -> Response:
+    """Return the PR's comments.
+
+    With `fields` each comment carries only those keys; `shape: "threads"`
+    groups comments by thread and honours `maxBytes`/`maxTokens`. The
+    `deadline` field or `X-Deadline` header (seconds; the shorter wins)
+    bounds the call, which otherwise fails with 504. `contextLines` adds
+    each thread's code, with that many lines either side, as `codeContext`.
+    """
+
+    try:
+        response = await fetch_comments_async(
+            pr_id=request.pr_id,
+            pr_url=request.pr_url,
+            allow_cross_project=request.allow_cross_project,
+            project=request.project,
+            repo=request.repo,
+            since=request.since,
+            filters=comment_filter(request),
+            runtime=_runtime,
+            deadline=_deadline(request.deadline, x_deadline),
+            context_lines=request.context_lines,
+        )
+        # The result is already a validated `CommentsResponse`, so it is
+        # encoded directly instead of through `response_model` revalidation.
+        with timed("serialize"):
+            if request.shape == "comments" and not (request.fields or request.max_bytes or request.max_tokens):
+                body = dump_model(response)
+            else:
+                body = dumps(
+                    render_response(
+                        response,
+                        shape=request.shape,
+                        fields=request.fields,
+                        max_bytes=request.max_bytes,
+                        max_tokens=request.max_tokens,
+                    )
+                )
+            return _json_response(body, accept_encoding)
+    except MCPUserError as exc:
+        raise HTTPException(status_code=exc.status, detail=ErrorResponse(error=str(exc), status=exc.status).model_dump())
+    except MissingConfigurationError as exc:
+        raise HTTPException(status_code=400, detail=ErrorResponse(error=str(exc), status=400).model_dump())
+    except AzureDevOpsRequestError as exc:
+        raise HTTPException(status_code=exc.status, detail=ErrorResponse(error=str(exc), status=exc.status).model_dump())
+
+
+@app.post("/api/v1/pr/comments:stream", response_class=StreamingResponse)
+async def stream_pr_comments(
+    request: FetchRequest,
+    accept_encoding: Optional[str] = Header(default=None),
+    x_deadline: Optional[float] = Header(default=None, gt=0),
+) -> StreamingResponse:
+    """Stream comments as NDJSON, one comment per line and a trailing summary.
+
+    A stream cut off by its deadline ends without the summary line.
+    """
+
     try:
-        return fetch_comments(
+        if request.context_lines is not None:
+            raise MCPUserError("contextLines is not supported when streaming", status=400)
+        records = await stream_comments_async(
             pr_id=request.pr_id,
             pr_url=request.pr_url,
             allow_cross_project=request.allow_cross_project,
             project=request.project,
             repo=request.repo,
+            since=request.since,
+            filters=comment_filter(request),
+            fields=request.fields,
+            runtime=_runtime,
+            deadline=_deadline(request.deadline, x_deadline),
         )
     except MCPUserError as exc:
         raise HTTPException(status_code=exc.status, detail=ErrorResponse(error=str(exc), status=exc.status).model_dump())
@@ -27,3 +138,201 @@ async def get_pr_comments(request: FetchRequest) -> CommentsResponse:
         raise HTTPException(status_code=400, detail=ErrorResponse(error=str(exc), status=400).model_dump())
     except AzureDevOpsRequestError as exc:
         raise HTTPException(status_code=exc.status, detail=ErrorResponse(error=str(exc), status=exc.status).model_dump())
+
+    return _ndjson_response(records, accept_encoding)
+
+
+def _deadline(body: Optional[float], header: Optional[float]) -> Optional[float]:
+    limits = [value for value in (body, header) if value is not None]
+    return min(limits) if limits else None
+
+
+def _json_response(body: bytes, accept_encoding: Optional[str]) -> Response:
+    encoding = negotiate(accept_encoding) if len(body) >= MIN_COMPRESS_SIZE else None
+    headers = {"Vary": "Accept-Encoding"}
+    if encoding is not None:
+        body = compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _ndjson_response(records: AsyncIterator[Dict[str, Any]], accept_encoding: Optional[str]) -> StreamingResponse:
+    encoding = negotiate(accept_encoding)
+    headers = {"Vary": "Accept-Encoding"}
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return StreamingResponse(
+        compress_stream(_ndjson_lines(records), encoding),
+        media_type="application/x-ndjson",
+        headers=headers,
+    )
+
+
+async def _ndjson_lines(records: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    async for record in records:
+        yield dumps(record) + b"\n"
+
+
+@app.post("/api/v1/pr/comments:batch", response_model=BatchCommentsResponse)
+async def get_pr_comments_batch(
+    request: BatchFetchRequest,
+    accept_encoding: Optional[str] = Header(default=None),
+    x_deadline: Optional[float] = Header(default=None, gt=0),
+) -> Response:
+    """Fetch many PRs; with a deadline, unfinished ones are listed in `timedOut`."""
+
+    response = await fetch_comments_batch_async(
+        request.requests,
+        runtime=_runtime,
+        max_concurrency=request.max_concurrency,
+        deadline=_deadline(request.deadline, x_deadline),
+    )
+    with timed("serialize"):
+        return _json_response(dump_model(response), accept_encoding)
+
+
+@app.post("/api/v1/repo/comments:scan", response_class=StreamingResponse)
+async def scan_repo_comments(
+    request: RepoScanRequest,
+    accept_encoding: Optional[str] = Header(default=None),
+    x_deadline: Optional[float] = Header(default=None, gt=0),
+) -> StreamingResponse:
+    """Stream one NDJSON line per active PR as it finishes, then a summary line.
+
+    PRs unfinished at the deadline are reported as 504 entries and listed
+    in the summary's `timedOut`.
+    """
+
+    try:
+        results = await stream_repository_scan_async(
+            project=request.project,
+            repo=request.repo,
+            allow_cross_project=request.allow_cross_project,
+            since=request.since,
+            filters=comment_filter(request),
+            runtime=_runtime,
+            max_concurrency=request.max_concurrency,
+            deadline=_deadline(request.deadline, x_deadline),
+            context_lines=request.context_lines,
+        )
+    except MCPUserError as exc:
+        raise HTTPException(status_code=exc.status, detail=ErrorResponse(error=str(exc), status=exc.status).model_dump())
+    except MissingConfigurationError as exc:
+        raise HTTPException(status_code=400, detail=ErrorResponse(error=str(exc), status=400).model_dump())
+    except AzureDevOpsRequestError as exc:
+        raise HTTPException(status_code=exc.status, detail=ErrorResponse(error=str(exc), status=exc.status).model_dump())
+
+    return _ndjson_response(_scan_records(results), accept_encoding)
+
+
+async def _scan_records(results: AsyncIterator[BatchItemResult]) -> AsyncIterator[Dict[str, Any]]:
+    succeeded = failed = 0
+    timed_out: list[int] = []
+    async for item in results:
+        if item.error is None:
+            succeeded += 1
+        else:
+            failed += 1
+            timed_out.extend(timed_out_prs([item]))
+        yield item.model_dump(by_alias=True)
+    yield {
+        "summary": {
+            "pullRequests": succeeded + failed,
+            "succeeded": succeeded,
+            "failed": failed,
+            "timedOut": timed_out,
+        }
+    }
+
+
+@app.post("/api/v1/hooks/azure-devops", response_model=WebhookResult)
+async def receive_service_hook(
+    event: Dict[str, Any] = Body(...),
+    x_webhook_secret: Optional[str] = Header(default=None),
+    authorization: Optional[str] = Header(default=None),
+) -> WebhookResult:
+    """Apply an Azure DevOps service-hook event to the thread cache.
+
+    The shared secret is accepted as an `X-Webhook-Secret` header or as the
+    basic-auth password configured on the service hook.
+    """
+
+    try:
+        verify_secret(_runtime.config(), x_webhook_secret or _basic_auth_password(authorization))
+        return await apply_event(event, runtime=_runtime)
+    except MCPUserError as exc:
+        raise HTTPException(status_code=exc.status, detail=ErrorResponse(error=str(exc), status=exc.status).model_dump())
+    except MissingConfigurationError as exc:
+        raise HTTPException(status_code=400, detail=ErrorResponse(error=str(exc), status=400).model_dump())
+    except AzureDevOpsRequestError as exc:
+        raise HTTPException(status_code=exc.status, detail=ErrorResponse(error=str(exc), status=exc.status).model_dump())
+
+
+def _verify_admin_token(config: MCPConfig, authorization: Optional[str]) -> None:
+    if not config.admin_token:
+        raise MCPUserError("Config reload is not enabled", status=404)
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode("utf-8"), config.admin_token.encode("utf-8")):
+        raise MCPUserError("Invalid admin token", status=401)
+
+
+def _basic_auth_password(authorization: Optional[str]) -> Optional[str]:
+    scheme, _, credentials = (authorization or "").partition(" ")
+    if scheme.lower() != "basic":
+        return None
+    try:
+        decoded = base64.b64decode(credentials, validate=True).decode("utf-8")
+    except (binascii.Error, UnicodeDecodeError):
+        return None
+    return decoded.partition(":")[2]
+
+
+@app.get("/api/v1/cache/stats", response_model=CacheStats)
+async def get_cache_stats() -> CacheStats:
+    try:
+        return _runtime.cache_stats()
+    except MissingConfigurationError as exc:
+        raise HTTPException(status_code=400, detail=ErrorResponse(error=str(exc), status=400).model_dump())
+
+
+@app.get("/api/v1/stats", response_model=RuntimeStats)
+async def get_runtime_stats() -> RuntimeStats:
+    try:
+        return _runtime.stats()
+    except MissingConfigurationError as exc:
+        raise HTTPException(status_code=400, detail=ErrorResponse(error=str(exc), status=400).model_dump())
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics() -> PlainTextResponse:
+    """Expose stage latencies, request counters and cache stats for Prometheus."""
+
+    try:
+        stats = _runtime.stats()
+    except MissingConfigurationError:
+        # Still report process counters while configuration is incomplete.
+        stats = None
+    return PlainTextResponse(render_metrics(stats), media_type="text/plain; version=0.0.4")
+
+
+@app.post("/api/v1/config:reload")
+async def reload_config(authorization: Optional[str] = Header(default=None)) -> dict:
+    """Re-read configuration from the environment and `.env` file.
+
+    Only available when `AZDO_ADMIN_TOKEN` is set, and only to requests
+    carrying it as a bearer token.
+    """
+
+    try:
+        _verify_admin_token(_runtime.config(), authorization)
+        config = await _runtime.reload()
+    except MCPUserError as exc:
+        raise HTTPException(status_code=exc.status, detail=ErrorResponse(error=str(exc), status=exc.status).model_dump())
+    except MissingConfigurationError as exc:
+        raise HTTPException(status_code=400, detail=ErrorResponse(error=str(exc), status=400).model_dump())
+
+    return {
+        "organizationUrl": config.organization_url,
+        "defaultProject": config.default_project,
+        "defaultRepository": config.default_repository,
+    }
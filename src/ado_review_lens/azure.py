@@ -2,52 +2,829 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict
-
-import requests
+import asyncio
+import hashlib
+import json
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
 
+from .cache import BlobCache, CacheEntry, CacheKey, ThreadCache, blob_key, cache_key, off_loop
+from .cassette import cassette_transport, mount_cassette
+from .deadline import allows_delay, bound_timeout
 from .errors import AzureDevOpsRequestError, MCPUserError
+from .jsonstream import ArrayItemParser, aiter_items
+from .metrics import PAYLOAD_BYTES, UPSTREAM_REQUESTS, Stopwatch, timed
 from .models import MCPConfig, PullRequestTarget
+from .resolver import _extract_org_name
+from .singleflight import AsyncSingleFlight, SingleFlight
+from .store import open_thread_cache
+from .throttle import RETRY_STATUSES, AdaptiveLimiter, AsyncAdaptiveLimiter, RetryPolicy
+
+if TYPE_CHECKING:
+    # Each HTTP library is imported by the client that uses it, so the CLI
+    # does not pay for httpx and the async servers do not pay for requests.
+    import httpx
+    import requests
 
 _API_VERSION = "7.1"
 
+# Connection pool sizing for the async client; connections are kept alive
+# between calls so repeated fetches skip the TLS handshake.
+_MAX_CONNECTIONS = 20
+_MAX_KEEPALIVE_CONNECTIONS = 10
+_KEEPALIVE_EXPIRY = 60.0
+
+# Read size used when parsing thread payloads incrementally.
+_STREAM_CHUNK_SIZE = 64 * 1024
+
+# Page size when listing pull requests; the service caps `$top` at 1000.
+_PULL_REQUEST_PAGE_SIZE = 1000
+
+
+def _pull_request_url(base_url: str, target: PullRequestTarget) -> str:
+    return (
+        f"{base_url}/{target.project}/_apis/git/repositories/"
+        f"{target.repository}/pullRequests/{target.pull_request_id}"
+    )
+
+
+def _threads_url(base_url: str, target: PullRequestTarget) -> str:
+    return f"{_pull_request_url(base_url, target)}/threads"
+
+
+def _iterations_url(base_url: str, target: PullRequestTarget) -> str:
+    return f"{_pull_request_url(base_url, target)}/iterations"
+
+
+def _items_url(base_url: str, target: PullRequestTarget) -> str:
+    return f"{base_url}/{target.project}/_apis/git/repositories/{target.repository}/items"
+
+
+def _thread_url(base_url: str, target: PullRequestTarget, thread_id: int) -> str:
+    return f"{_threads_url(base_url, target)}/{thread_id}"
+
+
+def _pull_requests_url(base_url: str, project: str, repository: str) -> str:
+    return f"{base_url}/{project}/_apis/git/repositories/{repository}/pullrequests"
+
+
+def _pull_request_params(status: str, skip: int) -> Dict[str, str]:
+    return {
+        "searchCriteria.status": status,
+        "$top": str(_PULL_REQUEST_PAGE_SIZE),
+        "$skip": str(skip),
+    }
+
+
+def _iteration_params(iteration: Optional[int], base_iteration: Optional[int]) -> Dict[str, str]:
+    # Azure DevOps tracks thread positions to `$iteration`, diffed against
+    # `$baseIteration` when given.
+    params: Dict[str, str] = {}
+    if iteration is not None:
+        params["$iteration"] = str(iteration)
+        if base_iteration is not None:
+            params["$baseIteration"] = str(base_iteration)
+    return params
+
+
+def _item_params(path: str, commit_id: str) -> Dict[str, str]:
+    return {
+        "path": path,
+        "versionDescriptor.version": commit_id,
+        "versionDescriptor.versionType": "commit",
+        "includeContent": "true",
+        "$format": "json",
+    }
+
+
+def _item_text(item: Any) -> Optional[str]:
+    # Binary files are reported but not worth showing as code context.
+    if not isinstance(item, dict) or (item.get("contentMetadata") or {}).get("isBinary"):
+        return None
+    content = item.get("content")
+    return content if isinstance(content, str) else None
+
+
+def _object_id(item: Any) -> Optional[str]:
+    object_id = item.get("objectId") if isinstance(item, dict) else None
+    return object_id if isinstance(object_id, str) and object_id else None
+
+
+def _iterations_of(payload: Any) -> List[Dict[str, Any]]:
+    iterations = payload.get("value") if isinstance(payload, dict) else None
+    return [item for item in iterations or [] if isinstance(item, dict)]
+
+
+def _latest_iteration(iterations: Iterable[Mapping[str, Any]]) -> int:
+    numbers = [item["id"] for item in iterations if isinstance(item.get("id"), int)]
+    if not numbers:
+        raise MCPUserError("Pull request has no iterations", status=404)
+    return max(numbers)
+
+
+def _pull_request_signature(pull_request: Mapping[str, Any]) -> str:
+    """Summarize the pull request fields that move when its review does.
+
+    The source commit leads, since every push starts a new iteration; the
+    target commit, status, merge status, draft flag and reviewer votes follow
+    as a short digest.
+    """
+
+    source_commit = (pull_request.get("lastMergeSourceCommit") or {}).get("commitId") or ""
+    state = [
+        (pull_request.get("lastMergeTargetCommit") or {}).get("commitId"),
+        pull_request.get("status"),
+        pull_request.get("mergeStatus"),
+        pull_request.get("isDraft"),
+        sorted((str(reviewer.get("id")), reviewer.get("vote")) for reviewer in pull_request.get("reviewers") or []),
+    ]
+    digest = hashlib.sha1(json.dumps(state, separators=(",", ":")).encode("utf-8")).hexdigest()[:16]
+    return f"{source_commit}:{digest}"
+
+
+def _listed_signatures(
+    config: MCPConfig,
+    project: str,
+    repository: str,
+    pull_requests: Iterable[Mapping[str, Any]],
+) -> Dict[CacheKey, str]:
+    # Listed pull requests carry the same fields as a probe, so a repository
+    # scan can check every cached PR without probing each one.
+    organization = _extract_org_name(config.organization_url)
+    return {
+        cache_key(
+            PullRequestTarget(
+                organization=organization,
+                project=project,
+                repository=repository,
+                pullRequestId=pull_request["pullRequestId"],
+            )
+        ): _pull_request_signature(pull_request)
+        for pull_request in pull_requests
+        if "pullRequestId" in pull_request
+    }
+
+
+def _retry_policy(config: MCPConfig) -> RetryPolicy:
+    return RetryPolicy(max_attempts=config.max_retries + 1)
+
+
+def _raise_for_status(status_code: int, not_found: str = "PR not found") -> None:
+    if status_code == 404:
+        raise MCPUserError(not_found, status=404)
+    # Azure DevOps answers a rejected token with a 203 sign-in page.
+    if status_code in (401, 203):
+        raise MCPUserError("Insufficient permissions", status=401)
+    if status_code >= 400:
+        raise AzureDevOpsRequestError(
+            f"Azure DevOps request failed with {status_code}",
+            status=status_code,
+        )
+
+
+def _json_object(response: Union[requests.Response, httpx.Response]) -> Dict[str, Any]:
+    try:
+        payload = response.json()
+    except ValueError as exc:
+        raise _malformed_response() from exc
+    if not isinstance(payload, dict):
+        raise _malformed_response()
+    return payload
+
+
+def _blob_cache(config: MCPConfig, blobs: Optional[BlobCache]) -> BlobCache:
+    return blobs if blobs is not None else BlobCache(max_bytes=config.blob_cache_bytes)
+
+
+def _owned_cache(config: MCPConfig, cache: Optional[ThreadCache]) -> Optional[ThreadCache]:
+    # One-shot clients (such as CLI runs) have no shared cache, but can
+    # still start warm from the persistent store when one is configured.
+    if cache is not None or not config.store_path:
+        return None
+    return open_thread_cache(config)
+
+
+def _lookup(
+    cache: Optional[ThreadCache],
+    key: CacheKey,
+    target: PullRequestTarget,
+) -> Tuple[Optional[CacheEntry], bool]:
+    if cache is None:
+        return None, False
+    entry, fresh = cache.lookup(key)
+    if fresh:
+        # A listed signature only vouches for the revalidation right after the
+        # listing; drop it so a later one cannot confirm a PR that moved on.
+        cache.take_listed(cache_key(target))
+    return entry, fresh
+
+
+def _accept_threads(
+    cache: Optional[ThreadCache],
+    key: CacheKey,
+    entry: Optional[CacheEntry],
+    status_code: int,
+    headers: Mapping[str, str],
+    body: bytes,
+    decode: Callable[[], Dict[str, Any]],
+    signature: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Turn a threads response into a payload, updating the cache."""
+
+    if status_code == 304 and entry is not None and cache is not None:
+        cache.revalidated(key, signature=signature)
+        return entry.payload
+    _raise_for_status(status_code)
+
+    PAYLOAD_BYTES.observe(len(body))
+    with timed("decode"):
+        try:
+            payload = decode()
+        except ValueError as exc:
+            raise _malformed_response() from exc
+    if cache is not None:
+        cache.store(
+            key,
+            payload,
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified"),
+            signature=signature,
+        )
+    return payload
+
+
+def _cached_threads(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    threads = payload.get("value", []) if isinstance(payload, dict) else []
+    return threads if isinstance(threads, list) else []
+
+
+def _malformed_response() -> AzureDevOpsRequestError:
+    return AzureDevOpsRequestError("Azure DevOps returned a malformed response", status=502)
+
+
+def _parse_threads(chunks: Iterable[bytes], close: Callable[[], None]) -> Iterator[Dict[str, Any]]:
+    parser = ArrayItemParser()
+    decode = Stopwatch("decode")
+    size = 0
+    try:
+        for chunk in chunks:
+            size += len(chunk)
+            with decode.running():
+                threads = parser.feed(chunk)
+            yield from threads
+        with decode.running():
+            threads = parser.close()
+        yield from threads
+    except ValueError as exc:
+        raise _malformed_response() from exc
+    finally:
+        close()
+        PAYLOAD_BYTES.observe(size)
+        decode.record()
+
+
+async def _aparse_threads(response: httpx.Response) -> AsyncIterator[Dict[str, Any]]:
+    parser = ArrayItemParser()
+    decode = Stopwatch("decode")
+    size = 0
+    try:
+        async for chunk in response.aiter_bytes(_STREAM_CHUNK_SIZE):
+            size += len(chunk)
+            with decode.running():
+                threads = parser.feed(chunk)
+            for thread in threads:
+                yield thread
+        with decode.running():
+            threads = parser.close()
+        for thread in threads:
+            yield thread
+    except ValueError as exc:
+        raise _malformed_response() from exc
+    finally:
+        await response.aclose()
+        PAYLOAD_BYTES.observe(size)
+        decode.record()
+
 
 class AzureDevOpsClient:
     """Lightweight Azure DevOps REST API client."""
 
-    def __init__(self, config: MCPConfig) -> None:
+    def __init__(
+        self,
+        config: MCPConfig,
+        *,
+        cache: Optional[ThreadCache] = None,
+        blobs: Optional[BlobCache] = None,
+    ) -> None:
         self._config = config
         self._base_url = config.organization_url.rstrip("/")
+        self._owned_cache = _owned_cache(config, cache)
+        self._cache = cache if cache is not None else self._owned_cache
+        self._blobs = _blob_cache(config, blobs)
+        self._reads = SingleFlight()
+        self._retry = _retry_policy(config)
+        self._limiter = AdaptiveLimiter(config.max_concurrency)
+        self._timeout = (config.connect_timeout, config.read_timeout)
+        import requests
+
         self._session = requests.Session()
         self._session.auth = ("", config.personal_access_token)
         self._session.headers.update({"Content-Type": "application/json"})
+        mount_cassette(self._session, config)
+
+    def list_threads(
+        self,
+        target: PullRequestTarget,
+        *,
+        iteration: Optional[int] = None,
+        base_iteration: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Return raw thread payload for a pull request.
+
+        With `iteration` (and optionally `base_iteration`) thread positions
+        are tracked to that iteration. With a cache attached, fresh entries
+        are served locally and stale ones are revalidated with a conditional
+        request, or renewed by an unchanged pull request probe when probing
+        is enabled.
+        """
 
-    def list_threads(self, target: PullRequestTarget) -> Dict[str, Any]:
-        """Return raw thread payload for a pull request."""
+        key = cache_key(target, iteration=iteration, base_iteration=base_iteration)
+        entry, fresh = _lookup(self._cache, key, target)
+        if entry is not None and fresh:
+            return entry.payload
+        signature = self._probe(target, entry)
+        if entry is not None and self._cache.confirm(key, signature):
+            return entry.payload
 
-        url = (
-            f"{self._base_url}/{target.project}/_apis/git/repositories/"
-            f"{target.repository}/pullRequests/{target.pull_request_id}/threads"
+        url = _threads_url(self._base_url, target)
+        headers = entry.conditional_headers() if entry is not None else {}
+        with timed("fetch"):
+            response = self._get(url, headers, params=_iteration_params(iteration, base_iteration))
+            body = response.content
+
+        return _accept_threads(
+            self._cache,
+            key,
+            entry,
+            response.status_code,
+            response.headers,
+            body,
+            response.json,
+            signature,
         )
-        response = self._session.get(url, params={"api-version": _API_VERSION})
 
+    def probe(self, target: PullRequestTarget) -> str:
+        """Return a signature of the pull request that changes when it is pushed, voted on or closed.
+
+        This costs one small metadata request instead of the full thread list.
+        """
+
+        with timed("probe"):
+            response = self._get(_pull_request_url(self._base_url, target), {})
+        _raise_for_status(response.status_code)
+        return _pull_request_signature(_json_object(response))
+
+    def _probe(self, target: PullRequestTarget, entry: Optional[CacheEntry]) -> Optional[str]:
+        # A recent listing answers for free; otherwise probe only when there
+        # is a cached entry to confirm, so a cold miss costs one request.
+        if self._cache is None or not self._cache.probing:
+            return None
+        listed = self._cache.take_listed(cache_key(target))
+        if listed is not None or entry is None:
+            return listed
+        return self.probe(target)
+
+    def latest_iteration(self, target: PullRequestTarget) -> int:
+        """Return the number of the pull request's newest iteration (push)."""
+
+        return _latest_iteration(self.list_iterations(target))
+
+    def list_iterations(self, target: PullRequestTarget) -> List[Dict[str, Any]]:
+        """Return the pull request's raw iteration records, with their source and target commits."""
+
+        response = self._get(_iterations_url(self._base_url, target), {}, params={"includeCommits": "false"})
+        _raise_for_status(response.status_code)
+        return _iterations_of(_json_object(response))
+
+    def read_file(self, target: PullRequestTarget, path: str, commit_id: str) -> Optional[str]:
+        """Return the text of `path` at `commit_id`, or None when it is missing or binary.
+
+        Each file version is downloaded at most once while cached, and
+        concurrent reads of the same one share a request.
+        """
+
+        key = blob_key(target, commit_id, path)
+        found, text = self._blobs.lookup(key)
+        if found:
+            return text
+        return self._reads.do(key, lambda: self._read_file(target, path, commit_id))
+
+    def _read_file(self, target: PullRequestTarget, path: str, commit_id: str) -> Optional[str]:
+        response = self._get(_items_url(self._base_url, target), {}, params=_item_params(path, commit_id))
+        key = blob_key(target, commit_id, path)
         if response.status_code == 404:
-            raise MCPUserError("PR not found", status=404)
-        if response.status_code == 401:
-            raise MCPUserError("Insufficient permissions", status=401)
-        if response.status_code >= 400:
-            raise AzureDevOpsRequestError(
-                f"Azure DevOps request failed with {response.status_code}",
-                status=response.status_code,
-            )
+            self._blobs.store(key, None, None)
+            return None
+        _raise_for_status(response.status_code)
+        item = _json_object(response)
+        text = _item_text(item)
+        self._blobs.store(key, _object_id(item), text)
+        return text
+
+    def get_thread(self, target: PullRequestTarget, thread_id: int) -> Dict[str, Any]:
+        """Return one raw thread of a pull request, bypassing the cache."""
+
+        response = self._get(_thread_url(self._base_url, target, thread_id), {})
+        _raise_for_status(response.status_code, not_found="Thread not found")
+        return _json_object(response)
+
+    def list_pull_requests(self, project: str, repository: str, *, status: str = "active") -> List[Dict[str, Any]]:
+        """Return raw pull request records for a repository, following pagination.
+
+        When the cache probes, each record also serves as that PR's next probe.
+        """
+
+        url = _pull_requests_url(self._base_url, project, repository)
+        pull_requests: List[Dict[str, Any]] = []
+        while True:
+            response = self._get(url, {}, params=_pull_request_params(status, len(pull_requests)))
+            _raise_for_status(response.status_code, not_found="Repository not found")
+            page = _json_object(response).get("value") or []
+            pull_requests.extend(page)
+            if len(page) < _PULL_REQUEST_PAGE_SIZE:
+                if self._cache is not None and self._cache.probing:
+                    self._cache.remember_listed(_listed_signatures(self._config, project, repository, pull_requests))
+                return pull_requests
+
+    def iter_threads(
+        self,
+        target: PullRequestTarget,
+        *,
+        iteration: Optional[int] = None,
+        base_iteration: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Return an iterator over threads that parses the body incrementally.
+
+        The request is sent and its status checked before this returns, so
+        errors surface immediately. Only one raw thread is decoded at a time;
+        streamed payloads are served from, but not stored in, the cache.
+        """
+
+        key = cache_key(target, iteration=iteration, base_iteration=base_iteration)
+        entry, fresh = _lookup(self._cache, key, target)
+        if entry is not None and fresh:
+            return iter(_cached_threads(entry.payload))
+        signature = self._probe(target, entry)
+        if entry is not None and self._cache.confirm(key, signature):
+            return iter(_cached_threads(entry.payload))
+
+        url = _threads_url(self._base_url, target)
+        headers = entry.conditional_headers() if entry is not None else {}
+        with timed("fetch"):
+            response = self._get(url, headers, stream=True, params=_iteration_params(iteration, base_iteration))
 
-        return response.json()
+        if response.status_code == 304 and entry is not None and self._cache is not None:
+            response.close()
+            self._cache.revalidated(key, signature=signature)
+            return iter(_cached_threads(entry.payload))
+        if response.status_code >= 400 or response.status_code == 203:
+            response.close()
+        _raise_for_status(response.status_code)
+
+        return _parse_threads(response.iter_content(_STREAM_CHUNK_SIZE), response.close)
+
+    def _get(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        *,
+        stream: bool = False,
+        params: Optional[Dict[str, str]] = None,
+    ) -> requests.Response:
+        """GET `url`, retrying throttled or transient failures with backoff.
+
+        Timeouts and retries are cut short so the call ends by the current deadline.
+        """
+
+        import requests
+
+        attempt = 0
+        while True:
+            error: Optional[AzureDevOpsRequestError] = None
+            response: Optional[requests.Response] = None
+            with self._limiter:
+                try:
+                    connect_timeout, read_timeout = self._timeout
+                    response = self._session.get(
+                        url,
+                        params={**(params or {}), "api-version": _API_VERSION},
+                        headers=headers,
+                        timeout=(bound_timeout(connect_timeout), bound_timeout(read_timeout)),
+                        stream=stream,
+                    )
+                except requests.Timeout as exc:
+                    error = AzureDevOpsRequestError(f"Azure DevOps request timed out: {exc}", status=504)
+                except requests.RequestException as exc:
+                    error = AzureDevOpsRequestError(f"Azure DevOps request failed: {exc}", status=502)
+
+            if response is None:
+                UPSTREAM_REQUESTS.inc("error")
+            else:
+                UPSTREAM_REQUESTS.inc(str(response.status_code))
+                self._limiter.observe(response.status_code, response.headers)
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+
+            attempt += 1
+            delay = self._retry.delay(attempt - 1, response.headers if response is not None else None)
+            if delay is None or attempt >= self._retry.max_attempts or not allows_delay(delay):
+                if response is not None:
+                    return response
+                raise error
+            if response is not None:
+                response.close()
+            time.sleep(delay)
 
     def close(self) -> None:
         self._session.close()
+        if self._owned_cache is not None:
+            self._owned_cache.close()
 
     def __enter__(self) -> "AzureDevOpsClient":
         return self
 
     def __exit__(self, exc_type, exc, tb) -> None:
         self.close()
+
+
+class AsyncAzureDevOpsClient:
+    """Asynchronous Azure DevOps REST API client over a pooled HTTP/2 connection."""
+
+    def __init__(
+        self,
+        config: MCPConfig,
+        *,
+        cache: Optional[ThreadCache] = None,
+        blobs: Optional[BlobCache] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        self._config = config
+        self._base_url = config.organization_url.rstrip("/")
+        self._owned_cache = _owned_cache(config, cache)
+        self._cache = cache if cache is not None else self._owned_cache
+        self._blobs = _blob_cache(config, blobs)
+        self._reads = AsyncSingleFlight()
+        self._retry = _retry_policy(config)
+        self._limiter = AsyncAdaptiveLimiter(config.max_concurrency)
+        import httpx
+
+        limits = httpx.Limits(
+            max_connections=_MAX_CONNECTIONS,
+            max_keepalive_connections=_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=_KEEPALIVE_EXPIRY,
+        )
+        self._client = httpx.AsyncClient(
+            auth=("", config.personal_access_token),
+            headers={"Content-Type": "application/json"},
+            http2=True,
+            timeout=httpx.Timeout(config.read_timeout, connect=config.connect_timeout),
+            limits=limits,
+            transport=cassette_transport(config, transport, http2=True, limits=limits),
+        )
+
+    async def list_threads(
+        self,
+        target: PullRequestTarget,
+        *,
+        iteration: Optional[int] = None,
+        base_iteration: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Return raw thread payload for a pull request, consulting the cache."""
+
+        key = cache_key(target, iteration=iteration, base_iteration=base_iteration)
+        entry, fresh = await self._lookup(key, target)
+        if entry is not None and fresh:
+            return entry.payload
+        signature = await self._probe(target, entry)
+        if entry is not None and self._cache.confirm(key, signature):
+            return entry.payload
+
+        url = _threads_url(self._base_url, target)
+        headers = entry.conditional_headers() if entry is not None else {}
+        with timed("fetch"):
+            response = await self._get(url, headers, params=_iteration_params(iteration, base_iteration))
+
+        return await off_loop(
+            self._cache,
+            _accept_threads,
+            self._cache,
+            key,
+            entry,
+            response.status_code,
+            response.headers,
+            response.content,
+            response.json,
+            signature,
+        )
+
+    async def probe(self, target: PullRequestTarget) -> str:
+        """Return a signature of the pull request that changes when it is pushed, voted on or closed."""
+
+        with timed("probe"):
+            response = await self._get(_pull_request_url(self._base_url, target), {})
+        _raise_for_status(response.status_code)
+        return _pull_request_signature(_json_object(response))
+
+    async def _probe(self, target: PullRequestTarget, entry: Optional[CacheEntry]) -> Optional[str]:
+        if self._cache is None or not self._cache.probing:
+            return None
+        listed = self._cache.take_listed(cache_key(target))
+        if listed is not None or entry is None:
+            return listed
+        return await self.probe(target)
+
+    async def latest_iteration(self, target: PullRequestTarget) -> int:
+        """Return the number of the pull request's newest iteration (push)."""
+
+        return _latest_iteration(await self.list_iterations(target))
+
+    async def list_iterations(self, target: PullRequestTarget) -> List[Dict[str, Any]]:
+        """Return the pull request's raw iteration records, with their source and target commits."""
+
+        response = await self._get(_iterations_url(self._base_url, target), {}, params={"includeCommits": "false"})
+        _raise_for_status(response.status_code)
+        return _iterations_of(_json_object(response))
+
+    async def read_file(self, target: PullRequestTarget, path: str, commit_id: str) -> Optional[str]:
+        """Return the text of `path` at `commit_id`, or None when it is missing or binary."""
+
+        key = blob_key(target, commit_id, path)
+        found, text = self._blobs.lookup(key)
+        if found:
+            return text
+        return await self._reads.do(key, lambda: self._read_file(target, path, commit_id))
+
+    async def _read_file(self, target: PullRequestTarget, path: str, commit_id: str) -> Optional[str]:
+        response = await self._get(_items_url(self._base_url, target), {}, params=_item_params(path, commit_id))
+        key = blob_key(target, commit_id, path)
+        if response.status_code == 404:
+            self._blobs.store(key, None, None)
+            return None
+        _raise_for_status(response.status_code)
+        item = _json_object(response)
+        text = _item_text(item)
+        self._blobs.store(key, _object_id(item), text)
+        return text
+
+    async def get_thread(self, target: PullRequestTarget, thread_id: int) -> Dict[str, Any]:
+        """Return one raw thread of a pull request, bypassing the cache."""
+
+        response = await self._get(_thread_url(self._base_url, target, thread_id), {})
+        _raise_for_status(response.status_code, not_found="Thread not found")
+        return _json_object(response)
+
+    async def list_pull_requests(
+        self,
+        project: str,
+        repository: str,
+        *,
+        status: str = "active",
+    ) -> List[Dict[str, Any]]:
+        """Return raw pull request records for a repository, following pagination.
+
+        When the cache probes, each record also serves as that PR's next probe.
+        """
+
+        url = _pull_requests_url(self._base_url, project, repository)
+        pull_requests: List[Dict[str, Any]] = []
+        while True:
+            response = await self._get(url, {}, params=_pull_request_params(status, len(pull_requests)))
+            _raise_for_status(response.status_code, not_found="Repository not found")
+            page = _json_object(response).get("value") or []
+            pull_requests.extend(page)
+            if len(page) < _PULL_REQUEST_PAGE_SIZE:
+                if self._cache is not None and self._cache.probing:
+                    self._cache.remember_listed(_listed_signatures(self._config, project, repository, pull_requests))
+                return pull_requests
+
+    async def iter_threads(
+        self,
+        target: PullRequestTarget,
+        *,
+        iteration: Optional[int] = None,
+        base_iteration: Optional[int] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Return an async iterator over threads that parses the body incrementally."""
+
+        key = cache_key(target, iteration=iteration, base_iteration=base_iteration)
+        entry, fresh = await self._lookup(key, target)
+        if entry is not None and fresh:
+            return aiter_items(_cached_threads(entry.payload))
+        signature = await self._probe(target, entry)
+        if entry is not None and self._cache.confirm(key, signature):
+            return aiter_items(_cached_threads(entry.payload))
+
+        url = _threads_url(self._base_url, target)
+        headers = entry.conditional_headers() if entry is not None else {}
+        with timed("fetch"):
+            response = await self._get(
+                url,
+                headers,
+                stream=True,
+                params=_iteration_params(iteration, base_iteration),
+            )
+
+        if response.status_code == 304 and entry is not None and self._cache is not None:
+            await response.aclose()
+            await off_loop(self._cache, self._cache.revalidated, key, signature=signature)
+            return aiter_items(_cached_threads(entry.payload))
+        if response.status_code >= 400 or response.status_code == 203:
+            await response.aclose()
+        _raise_for_status(response.status_code)
+
+        return _aparse_threads(response)
+
+    async def _lookup(self, key: CacheKey, target: PullRequestTarget) -> Tuple[Optional[CacheEntry], bool]:
+        # Entries already in memory never touch the store.
+        if self._cache is not None and key in self._cache:
+            return _lookup(self._cache, key, target)
+        return await off_loop(self._cache, _lookup, self._cache, key, target)
+
+    async def _get(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        *,
+        stream: bool = False,
+        params: Optional[Dict[str, str]] = None,
+    ) -> httpx.Response:
+        """GET `url`, retrying throttled or transient failures with backoff.
+
+        Timeouts and retries are cut short so the call ends by the current deadline.
+        """
+
+        import httpx
+
+        attempt = 0
+        while True:
+            error: Optional[AzureDevOpsRequestError] = None
+            response: Optional[httpx.Response] = None
+            async with self._limiter:
+                try:
+                    request = self._client.build_request(
+                        "GET",
+                        url,
+                        params={**(params or {}), "api-version": _API_VERSION},
+                        headers=headers,
+                        timeout=httpx.Timeout(
+                            bound_timeout(self._config.read_timeout),
+                            connect=bound_timeout(self._config.connect_timeout),
+                        ),
+                    )
+                    response = await self._client.send(request, stream=stream)
+                except httpx.TimeoutException as exc:
+                    error = AzureDevOpsRequestError(f"Azure DevOps request timed out: {exc}", status=504)
+                except httpx.HTTPError as exc:
+                    error = AzureDevOpsRequestError(f"Azure DevOps request failed: {exc}", status=502)
+
+            if response is None:
+                UPSTREAM_REQUESTS.inc("error")
+            else:
+                UPSTREAM_REQUESTS.inc(str(response.status_code))
+                await self._limiter.observe(response.status_code, response.headers)
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+
+            attempt += 1
+            delay = self._retry.delay(attempt - 1, response.headers if response is not None else None)
+            if delay is None or attempt >= self._retry.max_attempts or not allows_delay(delay):
+                if response is not None:
+                    return response
+                raise error
+            if response is not None:
+                await response.aclose()
+            await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+        if self._owned_cache is not None:
+            self._owned_cache.close()
+
+    async def __aenter__(self) -> "AsyncAzureDevOpsClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
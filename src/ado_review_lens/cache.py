@@ -0,0 +1,464 @@
+"""In-memory caches for raw pull request thread payloads and file contents."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, Mapping, Optional, Tuple, TypeVar
+
+from .models import BlobCacheStats, CacheStats, PullRequestTarget
+
+if TYPE_CHECKING:
+    from .store import ThreadStore
+
+CacheKey = Tuple[str, ...]
+BlobKey = Tuple[str, ...]
+T = TypeVar("T")
+
+# How long a signature from a pull request listing may stand in for a probe;
+# after that the PR may have moved on without the listing showing it.
+LISTED_SIGNATURE_MAX_AGE = 10.0
+
+# Bound on remembered (commit, path) -> object id lookups; each is tiny.
+_MAX_BLOB_PATHS = 16384
+
+
+def cache_key(
+    target: PullRequestTarget,
+    *,
+    iteration: Optional[int] = None,
+    base_iteration: Optional[int] = None,
+) -> CacheKey:
+    """Return a case-insensitive cache key for a pull request target.
+
+    Payloads tracked to an iteration carry different thread positions, so
+    they are keyed apart from the plain thread list.
+    """
+
+    pull_request = str(target.pull_request_id)
+    if iteration is not None:
+        pull_request += f"@{iteration}" if base_iteration is None else f"@{base_iteration}..{iteration}"
+    return (
+        target.organization.lower(),
+        target.project.lower(),
+        target.repository.lower(),
+        pull_request,
+    )
+
+
+@dataclass
+class CacheEntry:
+    """Cached thread payload with the validators needed to revalidate it.
+
+    `stored_at` is when the entry was last known current and drives the TTL;
+    `verified_at` is when the threads themselves were last downloaded or
+    confirmed by a 304, which a probe alone does not advance. `signature`
+    is the pull request probe result recorded with the payload.
+    """
+
+    payload: Dict[str, Any]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+    signature: Optional[str] = None
+    verified_at: float = float("-inf")
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ThreadCache:
+    """Bounded LRU cache with a freshness TTL.
+
+    Entries older than `ttl` are kept so they can be revalidated with a
+    conditional request; only the LRU bound removes them. With a `store`,
+    misses fall back to the on-disk copy and new payloads are written
+    through, so other processes and later runs start warm.
+
+    With a positive `probe_max_age`, clients check stale entries with a cheap
+    pull request probe first: an unchanged signature renews the entry without
+    downloading the threads, for up to `probe_max_age` seconds after they
+    were last verified. Signatures from a recent repository listing can be
+    used in place of one probe each.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: float,
+        max_entries: int,
+        clock: Callable[[], float] = time.monotonic,
+        store: Optional["ThreadStore"] = None,
+        probe_max_age: float = 0.0,
+    ) -> None:
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._probe_max_age = probe_max_age
+        self._clock = clock
+        self._store = store
+        self._entries: "OrderedDict[CacheKey, CacheEntry]" = OrderedDict()
+        self._listed: Dict[CacheKey, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._revalidations = 0
+        self._evictions = 0
+        self._store_hits = 0
+        self._probe_hits = 0
+
+    @property
+    def persistent(self) -> bool:
+        """Whether lookups and writes may reach the on-disk store."""
+
+        return self._store is not None
+
+    @property
+    def probing(self) -> bool:
+        """Whether clients should probe pull requests before downloading threads."""
+
+        return self._probe_max_age > 0
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def lookup(self, key: CacheKey) -> Tuple[Optional[CacheEntry], bool]:
+        """Return the entry for `key` and whether it is still fresh.
+
+        A fresh entry counts as a hit; callers must revalidate stale ones.
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is None:
+            entry = self._load(key)
+            if entry is None:
+                return None, False
+
+        with self._lock:
+            fresh = self._clock() - entry.stored_at < self._ttl
+            if fresh:
+                self._hits += 1
+            return entry, fresh
+
+    def _load(self, key: CacheKey) -> Optional[CacheEntry]:
+        if self._store is None:
+            return None
+        stored = self._store.load(key)
+        if stored is None:
+            return None
+        stored_at = self._clock() - stored.age
+        entry = CacheEntry(
+            payload=stored.payload,
+            etag=stored.etag,
+            last_modified=stored.last_modified,
+            stored_at=stored_at,
+            signature=stored.source_commit,
+            verified_at=stored_at,
+        )
+        with self._lock:
+            self._store_hits += 1
+            self._insert(key, entry)
+        return entry
+
+    def _drop_superseded(self, key: CacheKey, payload: Dict[str, Any]) -> None:
+        # The store kept newer threads from another process; forget ours so
+        # the next lookup loads those instead.
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.payload is payload:
+                del self._entries[key]
+
+    def _insert(self, key: CacheKey, entry: CacheEntry) -> None:
+        if self._max_entries <= 0:
+            return
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def revalidated(self, key: CacheKey, *, signature: Optional[str] = None) -> None:
+        """Mark a stale entry as confirmed unchanged by the server."""
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.stored_at = entry.verified_at = self._clock()
+                if signature is not None:
+                    entry.signature = signature
+                self._revalidations += 1
+        if self._store is not None:
+            self._store.touch(key, source_commit=signature)
+
+    def remember_listed(self, signatures: Mapping[CacheKey, str]) -> None:
+        """Keep signatures from a pull request listing to stand in for each PR's next probe."""
+
+        with self._lock:
+            now = self._clock()
+            self._listed = {
+                key: listed for key, listed in self._listed.items() if now - listed[1] < LISTED_SIGNATURE_MAX_AGE
+            }
+            self._listed.update((key, (signature, now)) for key, signature in signatures.items())
+
+    def take_listed(self, key: CacheKey) -> Optional[str]:
+        """Return and forget the listed signature for `key`, unless it is too old to trust."""
+
+        with self._lock:
+            listed = self._listed.pop(key, None)
+            if listed is None or self._clock() - listed[1] >= LISTED_SIGNATURE_MAX_AGE:
+                return None
+            return listed[0]
+
+    def confirm(self, key: CacheKey, signature: Optional[str]) -> bool:
+        """Renew a stale entry whose pull request probe `signature` is unchanged.
+
+        Entries whose threads were last verified more than `probe_max_age`
+        seconds ago are refused, so changes the probe cannot see (such as a
+        new comment without a push or vote) are picked up eventually.
+        """
+
+        if signature is None or not self.probing:
+            return False
+        with self._lock:
+            entry = self._entries.get(key)
+            now = self._clock()
+            if entry is None or entry.signature != signature or now - entry.verified_at >= self._probe_max_age:
+                return False
+            entry.stored_at = now
+            self._probe_hits += 1
+            return True
+
+    def store(
+        self,
+        key: CacheKey,
+        payload: Dict[str, Any],
+        *,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        signature: Optional[str] = None,
+    ) -> None:
+        """Store a freshly downloaded payload, evicting the LRU entry if full."""
+
+        with self._lock:
+            self._misses += 1
+            now = self._clock()
+            self._insert(
+                key,
+                CacheEntry(
+                    payload=payload,
+                    etag=etag,
+                    last_modified=last_modified,
+                    stored_at=now,
+                    signature=signature,
+                    verified_at=now,
+                ),
+            )
+        if self._store is not None and not self._store.save(
+            key, payload, etag=etag, last_modified=last_modified, source_commit=signature
+        ):
+            self._drop_superseded(key, payload)
+
+    def update(
+        self,
+        key: CacheKey,
+        patch: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]],
+    ) -> bool:
+        """Replace a cached payload with `patch(payload)` and mark it fresh.
+
+        `patch` must return a new payload rather than mutate its argument,
+        since readers may still hold the old one. Returning None leaves the
+        entry untouched. The validators are kept: they no longer match the
+        patched payload, so the next revalidation downloads it again. Threads
+        only held by the store are loaded and patched too, so they do not come
+        back stale once their TTL is refreshed.
+        """
+
+        if key not in self and self._load(key) is None:
+            return False
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            payload = patch(entry.payload)
+            if payload is None:
+                return False
+            self._entries[key] = CacheEntry(
+                payload=payload,
+                etag=entry.etag,
+                last_modified=entry.last_modified,
+                stored_at=self._clock(),
+                signature=entry.signature,
+                verified_at=entry.verified_at,
+            )
+            self._entries.move_to_end(key)
+        if self._store is not None and not self._store.save(
+            key,
+            payload,
+            etag=entry.etag,
+            last_modified=entry.last_modified,
+            source_commit=entry.signature,
+        ):
+            self._drop_superseded(key, payload)
+        return True
+
+    def expire(self, key: CacheKey) -> None:
+        """Force the entry for `key` to be revalidated on its next lookup.
+
+        The probe signature is dropped too, so a probe cannot renew it.
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.stored_at = float("-inf")
+                entry.signature = None
+        if self._store is not None:
+            self._store.expire(key)
+
+    def invalidate(self, key: CacheKey) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+        if self._store is not None:
+            self._store.delete(key)
+
+    def clear(self) -> None:
+        """Drop the in-memory entries; the persistent store is left intact."""
+
+        with self._lock:
+            self._entries.clear()
+
+    def close(self) -> None:
+        if self._store is not None:
+            self._store.close()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                revalidations=self._revalidations,
+                evictions=self._evictions,
+                size=len(self._entries),
+                maxEntries=self._max_entries,
+                ttlSeconds=self._ttl,
+                storeHits=self._store_hits,
+                probeHits=self._probe_hits,
+            )
+
+
+async def off_loop(cache: Optional[ThreadCache], fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Call `fn`, in a worker thread when `cache` is backed by the on-disk store.
+
+    Store reads and writes (de)serialize whole payloads and may wait on
+    another process's lock, which must not stall the event loop.
+    """
+
+    if cache is not None and cache.persistent:
+        return await asyncio.to_thread(fn, *args, **kwargs)
+    return fn(*args, **kwargs)
+
+
+def blob_key(target: PullRequestTarget, commit_id: str, path: str) -> BlobKey:
+    """Return the key of a file version in the target's repository."""
+
+    return (
+        target.organization.lower(),
+        target.project.lower(),
+        target.repository.lower(),
+        commit_id.lower(),
+        path,
+    )
+
+
+class BlobCache:
+    """File contents keyed by git object id, with a (commit, path) index.
+
+    Commits never change, so entries need no revalidation. A file that is
+    identical across commits or pull requests is held once; files known to
+    be missing or binary are remembered without contents. The least recently
+    used contents are dropped once they exceed `max_bytes`.
+    """
+
+    def __init__(self, *, max_bytes: int, max_paths: int = _MAX_BLOB_PATHS) -> None:
+        self._max_bytes = max_bytes
+        self._max_paths = max_paths
+        self._paths: "OrderedDict[BlobKey, Optional[str]]" = OrderedDict()
+        self._blobs: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def lookup(self, key: BlobKey) -> Tuple[bool, Optional[str]]:
+        """Return whether `key` is known and, if it is a text file, its contents."""
+
+        with self._lock:
+            if key not in self._paths:
+                self._misses += 1
+                return False, None
+            self._paths.move_to_end(key)
+            object_id = self._paths[key]
+            if object_id is None:
+                self._hits += 1
+                return True, None
+            blob = self._blobs.get(object_id)
+            if blob is None:
+                # The contents were evicted; the path must be read again.
+                del self._paths[key]
+                self._misses += 1
+                return False, None
+            self._blobs.move_to_end(object_id)
+            self._hits += 1
+            return True, blob[0]
+
+    def store(self, key: BlobKey, object_id: Optional[str], text: Optional[str]) -> None:
+        """Remember the file at `key`; a None `text` marks it missing or binary."""
+
+        size = len(text.encode("utf-8")) if text is not None else 0
+        with self._lock:
+            if text is None or object_id is None:
+                object_id = None
+            elif size > self._max_bytes:
+                return
+            elif object_id in self._blobs:
+                self._blobs.move_to_end(object_id)
+            else:
+                self._blobs[object_id] = (text, size)
+                self._bytes += size
+                while self._bytes > self._max_bytes:
+                    _, (_, evicted) = self._blobs.popitem(last=False)
+                    self._bytes -= evicted
+                    self._evictions += 1
+            self._paths[key] = object_id
+            self._paths.move_to_end(key)
+            while len(self._paths) > self._max_paths:
+                self._paths.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._paths.clear()
+            self._blobs.clear()
+            self._bytes = 0
+
+    def stats(self) -> BlobCacheStats:
+        with self._lock:
+            return BlobCacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                size=len(self._blobs),
+                bytes=self._bytes,
+                maxBytes=self._max_bytes,
+            )
@@ -0,0 +1,273 @@
+"""Record and replay Azure DevOps HTTP traffic through a compressed cassette file.
+
+A cassette is a gzip-compressed JSON Lines file with one recorded response
+per line. Recording appends to it, so the same file can be extended over
+several runs; on replay the latest recording of each request wins.
+Credentials and cookies are never written.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import gzip
+import io
+import json
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Mapping, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from .errors import MCPUserError
+
+if TYPE_CHECKING:
+    import httpx
+    import requests
+
+    from .models import MCPConfig
+
+RECORD = "record"
+REPLAY = "replay"
+
+# Headers that would leak credentials or no longer describe the stored body,
+# which is kept decoded.
+_DROPPED_HEADERS = {"authorization", "set-cookie", "cookie", "content-encoding", "content-length", "transfer-encoding"}
+
+_write_lock = threading.Lock()
+
+
+@dataclass
+class Interaction:
+    """One recorded response."""
+
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+
+
+class Cassette:
+    """Recorded responses keyed by method and URL."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path).expanduser()
+        self._interactions: Dict[str, Interaction] = {}
+        if self.path.exists():
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._interactions)
+
+    def requests(self) -> List[str]:
+        """Return the recorded requests as `METHOD url` strings."""
+
+        return list(self._interactions)
+
+    def find(self, method: str, url: str) -> Optional[Interaction]:
+        return self._interactions.get(_request_key(method, url))
+
+    def record(self, method: str, url: str, status: int, headers: Mapping[str, str], body: bytes) -> None:
+        """Keep a response and append it to the cassette file."""
+
+        kept = {name: value for name, value in headers.items() if name.lower() not in _DROPPED_HEADERS}
+        key = _request_key(method, url)
+        self._interactions[key] = Interaction(status=status, headers=kept, body=body)
+        line = {"request": key, "status": status, "headers": kept, **_encode_body(body)}
+        with _write_lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Appending adds a gzip member; readers see one continuous stream.
+            with gzip.open(self.path, "at", encoding="utf-8") as handle:
+                handle.write(json.dumps(line, separators=(",", ":")) + "\n")
+
+    def respond(self, method: str, url: str, request_headers: Mapping[str, str]) -> Interaction:
+        """Return the recorded response, answering conditional requests with 304."""
+
+        interaction = self.find(method, url)
+        if interaction is None:
+            raise MCPUserError(f"No recorded response for {method} {url}", status=404)
+        etag = _header(interaction.headers, "ETag")
+        if interaction.status == 200 and etag and _header(request_headers, "If-None-Match") == etag:
+            return Interaction(status=304, headers=interaction.headers, body=b"")
+        return interaction
+
+    def _load(self) -> None:
+        with gzip.open(self.path, "rt", encoding="utf-8") as handle:
+            for line in handle:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if "base64" in entry:
+                    body = base64.b64decode(entry["base64"])
+                else:
+                    body = entry.get("text", "").encode("utf-8")
+                self._interactions[entry["request"]] = Interaction(
+                    status=int(entry["status"]),
+                    headers=dict(entry.get("headers") or {}),
+                    body=body,
+                )
+
+
+def open_cassette(config: MCPConfig) -> Optional[Cassette]:
+    """Return the configured cassette, or None when traffic goes to Azure DevOps directly."""
+
+    if not config.cassette_path:
+        return None
+    return Cassette(config.cassette_path)
+
+
+def mount_cassette(session: requests.Session, config: MCPConfig) -> None:
+    """Route a `requests` session through the configured cassette, if any."""
+
+    cassette = open_cassette(config)
+    if cassette is None:
+        return
+    adapter = (
+        _RecordingAdapter(cassette) if config.cassette_mode == RECORD else _ReplayAdapter(cassette, config.replay_latency)
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+
+def cassette_transport(
+    config: MCPConfig,
+    transport: Optional[httpx.AsyncBaseTransport],
+    **transport_options,
+) -> Optional[httpx.AsyncBaseTransport]:
+    """Wrap or replace an httpx transport according to the configured cassette.
+
+    `transport_options` build the real transport when recording without an
+    explicit `transport`.
+    """
+
+    cassette = open_cassette(config)
+    if cassette is None:
+        return transport
+    if config.cassette_mode != RECORD:
+        return ReplayTransport(cassette, latency=config.replay_latency)
+
+    import httpx
+
+    return RecordingTransport(cassette, transport or httpx.AsyncHTTPTransport(**transport_options))
+
+
+def _request_key(method: str, url: str) -> str:
+    # Query parameters are sorted so equivalent URLs share one recording.
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return f"{method.upper()} {urlunsplit((parts.scheme, parts.netloc, parts.path, query, ''))}"
+
+
+def _encode_body(body: bytes) -> Dict[str, str]:
+    try:
+        return {"text": body.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"base64": base64.b64encode(body).decode("ascii")}
+
+
+def _header(headers: Mapping[str, str], name: str) -> Optional[str]:
+    lowered = name.lower()
+    for key, value in headers.items():
+        if key.lower() == lowered:
+            return value
+    return None
+
+
+class ReplayTransport:
+    """httpx transport answering from a cassette after `latency` seconds."""
+
+    def __init__(self, cassette: Cassette, *, latency: float = 0.0) -> None:
+        self._cassette = cassette
+        self._latency = latency
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        import httpx
+
+        interaction = self._cassette.respond(request.method, str(request.url), request.headers)
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        return httpx.Response(interaction.status, headers=interaction.headers, content=interaction.body, request=request)
+
+    async def aclose(self) -> None:
+        return None
+
+
+class RecordingTransport:
+    """httpx transport that forwards to `inner` and records every response."""
+
+    def __init__(self, cassette: Cassette, inner: httpx.AsyncBaseTransport) -> None:
+        self._cassette = cassette
+        self._inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        import httpx
+
+        response = await self._inner.handle_async_request(request)
+        try:
+            # Reading decodes any content-encoding, matching the stored headers.
+            body = await response.aread()
+        finally:
+            await response.aclose()
+        self._cassette.record(request.method, str(request.url), response.status_code, response.headers, body)
+        headers = {name: value for name, value in response.headers.items() if name.lower() not in _DROPPED_HEADERS}
+        return httpx.Response(response.status_code, headers=headers, content=body, request=request)
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+class _ReplayAdapter:
+    """`requests` adapter answering from a cassette after `latency` seconds."""
+
+    def __init__(self, cassette: Cassette, latency: float = 0.0) -> None:
+        self._cassette = cassette
+        self._latency = latency
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        interaction = self._cassette.respond(request.method or "GET", request.url or "", request.headers)
+        if self._latency:
+            time.sleep(self._latency)
+        return _requests_response(request, interaction.status, interaction.headers, interaction.body)
+
+    def close(self) -> None:
+        return None
+
+
+class _RecordingAdapter:
+    """`requests` adapter that sends through a real adapter and records every response."""
+
+    def __init__(self, cassette: Cassette) -> None:
+        from requests.adapters import HTTPAdapter
+
+        self._cassette = cassette
+        self._inner = HTTPAdapter()
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        response = self._inner.send(request, **kwargs)
+        body = response.content
+        self._cassette.record(request.method or "GET", request.url or "", response.status_code, response.headers, body)
+        return _requests_response(request, response.status_code, response.headers, body)
+
+    def close(self) -> None:
+        self._inner.close()
+
+
+def _requests_response(
+    request: requests.PreparedRequest,
+    status: int,
+    headers: Mapping[str, str],
+    body: bytes,
+) -> requests.Response:
+    import requests
+    from requests.structures import CaseInsensitiveDict
+
+    response = requests.Response()
+    response.status_code = status
+    response.headers = CaseInsensitiveDict(
+        {name: value for name, value in headers.items() if name.lower() not in _DROPPED_HEADERS}
+    )
+    response.raw = io.BytesIO(body)
+    response.url = request.url or ""
+    response.request = request
+    response.encoding = "utf-8"
+    return response
@@ -2,55 +2,366 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
-from typing import Optional
+from contextlib import nullcontext
+from enum import Enum
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional
 
 import typer
 
 from .errors import AzureDevOpsRequestError, MCPUserError, MissingConfigurationError
-from .service import fetch_comments
+
+if TYPE_CHECKING:
+    from .models import CommentFilter, FetchRequest
+
+# The service layer (pydantic, HTTP clients) is imported inside the command
+# so `--help` and argument errors stay fast.
 
 app = typer.Typer(help="Fetch Azure DevOps PR comments.")
 
 
+class OutputFormat(str, Enum):
+    json = "json"
+    ndjson = "ndjson"
+
+
+class OutputShape(str, Enum):
+    comments = "comments"
+    threads = "threads"
+
+
+def _check_deadline(value: Optional[float]) -> Optional[float]:
+    if value is not None and value <= 0:
+        raise typer.BadParameter("must be a positive number of seconds")
+    return value
+
+
+def _parse_iteration(value: Optional[str]) -> Optional[int | str]:
+    if value is None:
+        return None
+    value = value.strip().lower()
+    if value == "latest":
+        return value
+    if not value.isdigit():
+        raise typer.BadParameter("must be an iteration number or latest")
+    return int(value)
+
+
 @app.command()
 def fetch(
-    pr: Optional[int] = typer.Option(None, "--pr", help="Numeric pull request identifier"),
-    url: Optional[str] = typer.Option(None, "--url", help="Full Azure DevOps PR URL"),
+    pr: Optional[List[int]] = typer.Option(None, "--pr", help="Numeric pull request identifier (repeatable)"),
+    url: Optional[List[str]] = typer.Option(None, "--url", help="Full Azure DevOps PR URL (repeatable)"),
+    input_file: Optional[Path] = typer.Option(
+        None,
+        "--input",
+        help="File with one PR id or URL per line",
+        exists=True,
+        dir_okay=False,
+        readable=True,
+    ),
+    scan: bool = typer.Option(False, "--scan", help="Fetch every active PR in the project/repository"),
     allow_cross_project: bool = typer.Option(False, "--allow-cross-project", help="Allow fetching outside default project"),
     project: Optional[str] = typer.Option(None, "--project", help="Override project name"),
     repo: Optional[str] = typer.Option(None, "--repo", help="Override repository name"),
+    since: Optional[str] = typer.Option(None, "--since", help="Only return changes after this timestamp or cursor"),
+    file_glob: Optional[List[str]] = typer.Option(
+        None,
+        "--file",
+        help="Only threads on files matching this glob (repeatable)",
+    ),
+    author: Optional[List[str]] = typer.Option(
+        None,
+        "--author",
+        help="Only comments by this author name or id (repeatable)",
+    ),
+    updated_after: Optional[str] = typer.Option(
+        None,
+        "--updated-after",
+        help="Only comments updated after this timestamp",
+    ),
+    include_resolved: bool = typer.Option(False, "--include-resolved", help="Also return comments on closed threads"),
+    iteration: Optional[str] = typer.Option(
+        None,
+        "--iteration",
+        callback=_parse_iteration,
+        help="Only threads opened on this iteration number, or latest",
+    ),
+    base_iteration: Optional[int] = typer.Option(
+        None,
+        "--base-iteration",
+        min=0,
+        help="With --iteration, keep threads opened after this iteration",
+    ),
+    context_lines: Optional[int] = typer.Option(
+        None,
+        "--context-lines",
+        min=0,
+        max=50,
+        help="Attach the commented code with this many lines either side",
+    ),
+    field: Optional[List[str]] = typer.Option(
+        None,
+        "--field",
+        help="Only print these comment fields (repeatable or comma-separated)",
+    ),
+    shape: OutputShape = typer.Option(
+        OutputShape.comments,
+        "--shape",
+        help="comments lists every comment; threads nests comments under their thread",
+    ),
+    max_tokens: Optional[int] = typer.Option(
+        None,
+        "--max-tokens",
+        min=1,
+        help="Trim threads output to about this many tokens",
+    ),
+    max_bytes: Optional[int] = typer.Option(
+        None,
+        "--max-bytes",
+        min=1,
+        help="Trim threads output to this many bytes of compact JSON",
+    ),
+    compact: bool = typer.Option(False, "--compact", help="Print JSON documents on one line, without indentation"),
+    timings: bool = typer.Option(False, "--timings", help="Print a per-stage timing report to stderr"),
+    max_concurrency: int = typer.Option(8, "--max-concurrency", min=1, max=64, help="Parallel fetches in batch mode"),
+    deadline: Optional[float] = typer.Option(
+        None,
+        "--deadline",
+        callback=_check_deadline,
+        help="Give up after this many seconds; batch and scan report unfinished PRs as timed out",
+    ),
+    output_format: OutputFormat = typer.Option(
+        OutputFormat.json,
+        "--format",
+        help="json prints one document; ndjson streams one record per line",
+    ),
 ) -> None:
-    """Fetch active pull request comments and print JSON."""
-
-    try:
-        response = fetch_comments(
-            pr_id=pr,
-            pr_url=url,
-            allow_cross_project=allow_cross_project,
-            project=project,
-            repo=repo,
-        )
-        typer.echo(json.dumps(response.model_dump(by_alias=True), indent=2))
-    except MCPUserError as exc:
-        typer.echo(
-            json.dumps({"error": str(exc), "status": exc.status}),
-            err=True,
-        )
-        raise typer.Exit(code=1)
-    except MissingConfigurationError as exc:
-        typer.echo(
-            json.dumps({"error": str(exc), "status": 400}),
-            err=True,
-        )
+    """Fetch active pull request comments and print JSON.
+
+    Passing several `--pr`/`--url` values or an `--input` file switches to
+    batch mode, which prints one envelope with a result or error per PR.
+    `--scan` lists the active PRs of the repository and fetches them all.
+    With `--format ndjson` each comment (or batch result) is written as its
+    own line as soon as it is ready, followed by a summary record; `--compact`
+    prints JSON documents without indentation.
+    `--file`, `--author`, `--updated-after`, `--include-resolved` and
+    `--iteration`/`--base-iteration` filter every mode; `--field`, `--shape` and the budgets apply to single-PR
+    JSON output only. `--context-lines` attaches each thread's code as
+    `codeContext` in JSON and batch output. `--deadline` bounds the whole run; batch and scan
+    keep the PRs finished in time and list the rest under `timedOut`.
+    """
+
+    prs = list(pr or [])
+    urls = list(url or [])
+    if input_file is not None:
+        _read_targets(input_file, prs, urls)
+    fields = [name.strip() for value in field or [] for name in value.split(",") if name.strip()]
+    batch = input_file is not None or len(prs) + len(urls) > 1
+
+    if scan and (prs or urls):
+        raise typer.BadParameter("--scan cannot be combined with --pr, --url or --input")
+    rendered = bool(fields) or shape is OutputShape.threads or max_tokens is not None or max_bytes is not None
+    if rendered and (scan or batch):
+        raise typer.BadParameter("--field, --shape and budgets apply to single-PR output only")
+    if output_format is OutputFormat.ndjson and (shape is OutputShape.threads or max_tokens or max_bytes):
+        raise typer.BadParameter("--shape threads and budgets require --format json")
+    if output_format is OutputFormat.ndjson and context_lines is not None and not (scan or batch):
+        raise typer.BadParameter("--context-lines requires --format json for a single PR")
+
+    from .encoding import dumps
+    from .metrics import collect_timings, format_timings, timed
+    from .models import CommentFilter, FetchRequest
+    from .service import fetch_comments, stream_comments
+    from .threads import render_response
+
+    filters = CommentFilter(
+        files=list(file_glob or []),
+        authors=list(author or []),
+        updatedAfter=updated_after,
+        includeResolved=include_resolved,
+        iteration=iteration,
+        baseIteration=base_iteration,
+    )
+
+    options = dict(
+        pr_id=prs[0] if prs else None,
+        pr_url=urls[0] if urls else None,
+        allow_cross_project=allow_cross_project,
+        project=project,
+        repo=repo,
+        since=since,
+        filters=filters,
+        deadline=deadline,
+    )
+    report = collect_timings() if timings else nullcontext({})
+    with report as stage_totals:
+        try:
+            if batch:
+                template = FetchRequest(
+                    allowCrossProject=allow_cross_project,
+                    project=project,
+                    repo=repo,
+                    since=since,
+                    contextLines=context_lines,
+                )
+                template = template.model_copy(update=filters.model_dump())
+                _fetch_batch(prs, urls, template, max_concurrency, deadline, output_format, not compact)
+            elif scan:
+                _scan_repository(
+                    project,
+                    repo,
+                    allow_cross_project,
+                    since,
+                    filters,
+                    max_concurrency,
+                    context_lines,
+                    deadline,
+                    output_format,
+                    not compact,
+                )
+            elif output_format is OutputFormat.ndjson:
+                _echo_ndjson(stream_comments(**options, fields=fields))
+            elif rendered:
+                response = fetch_comments(**options, context_lines=context_lines)
+                with timed("serialize"):
+                    body = render_response(
+                        response,
+                        shape=shape.value,
+                        fields=fields,
+                        max_bytes=max_bytes,
+                        max_tokens=max_tokens,
+                    )
+                    text = dumps(body, indent=not compact)
+                typer.echo(text)
+            else:
+                response = fetch_comments(**options, context_lines=context_lines)
+                with timed("serialize"):
+                    text = dumps(response, indent=not compact)
+                typer.echo(text)
+        except MCPUserError as exc:
+            typer.echo(
+                json.dumps({"error": str(exc), "status": exc.status}),
+                err=True,
+            )
+            raise typer.Exit(code=1)
+        except MissingConfigurationError as exc:
+            typer.echo(
+                json.dumps({"error": str(exc), "status": 400}),
+                err=True,
+            )
+            raise typer.Exit(code=1)
+        except AzureDevOpsRequestError as exc:
+            typer.echo(
+                json.dumps({"error": str(exc), "status": exc.status}),
+                err=True,
+            )
+            raise typer.Exit(code=1)
+        finally:
+            if timings:
+                typer.echo(format_timings(stage_totals), err=True)
+
+
+def _read_targets(path: Path, prs: List[int], urls: List[str]) -> None:
+    for line in path.read_text(encoding="utf-8").splitlines():
+        value = line.strip()
+        if not value or value.startswith("#"):
+            continue
+        if value.isdigit():
+            prs.append(int(value))
+        else:
+            urls.append(value)
+
+
+def _echo_ndjson(records: Iterable[Any]) -> None:
+    from .encoding import dumps
+
+    for record in records:
+        typer.echo(dumps(record))
+
+
+def _fetch_batch(
+    prs: List[int],
+    urls: List[str],
+    template: FetchRequest,
+    max_concurrency: int,
+    deadline: Optional[float],
+    output_format: OutputFormat,
+    indent: bool,
+) -> None:
+    from .encoding import dumps
+    from .service import fetch_comments_batch_async
+
+    requests = [template.model_copy(update={"pr_id": pr_id}) for pr_id in prs]
+    requests.extend(template.model_copy(update={"pr_url": pr_url}) for pr_url in urls)
+
+    response = asyncio.run(
+        fetch_comments_batch_async(requests, max_concurrency=max_concurrency, deadline=deadline)
+    )
+    if output_format is OutputFormat.ndjson:
+        _echo_ndjson(response.results)
+        summary = {"succeeded": response.succeeded, "failed": response.failed, "timedOut": response.timed_out}
+        _echo_ndjson([{"summary": summary}])
+    else:
+        typer.echo(dumps(response, indent=indent))
+    if response.failed:
         raise typer.Exit(code=1)
-    except AzureDevOpsRequestError as exc:
-        typer.echo(
-            json.dumps({"error": str(exc), "status": exc.status}),
-            err=True,
-        )
+
+
+def _scan_repository(
+    project: Optional[str],
+    repo: Optional[str],
+    allow_cross_project: bool,
+    since: Optional[str],
+    filters: CommentFilter,
+    max_concurrency: int,
+    context_lines: Optional[int],
+    deadline: Optional[float],
+    output_format: OutputFormat,
+    indent: bool,
+) -> None:
+    from .encoding import dumps
+    from .service import scan_repository_async
+
+    options = dict(
+        project=project,
+        repo=repo,
+        allow_cross_project=allow_cross_project,
+        since=since,
+        filters=filters,
+        max_concurrency=max_concurrency,
+        context_lines=context_lines,
+        deadline=deadline,
+    )
+    if output_format is OutputFormat.ndjson:
+        failed = asyncio.run(_echo_scan_ndjson(options))
+    else:
+        response = asyncio.run(scan_repository_async(**options))
+        typer.echo(dumps(response, indent=indent))
+        failed = response.failed
+    if failed:
         raise typer.Exit(code=1)
 
 
+async def _echo_scan_ndjson(options: Dict[str, Any]) -> int:
+    from .service import stream_repository_scan_async, timed_out_prs
+
+    succeeded = failed = 0
+    timed_out: List[int] = []
+    async for item in await stream_repository_scan_async(**options):
+        if item.error is None:
+            succeeded += 1
+        else:
+            failed += 1
+            timed_out.extend(timed_out_prs([item]))
+        _echo_ndjson([item])
+    summary = {"pullRequests": succeeded + failed, "succeeded": succeeded, "failed": failed, "timedOut": timed_out}
+    _echo_ndjson([{"summary": summary}])
+    return failed
+
+
 if __name__ == "__main__":
-    app()
+    from ado_review_lens.__main__ import main
+
+    main()
@@ -3,19 +3,29 @@
 from __future__ import annotations
 
 import os
-from typing import Optional
-
-from dotenv import load_dotenv
+import threading
+from typing import Dict, Optional
 
+from .cassette import RECORD, REPLAY
 from .errors import MissingConfigurationError
 from .models import MCPConfig
 
 
+# Values this process took from the .env file, so later loads can tell them
+# apart from variables set in the real environment.
+_dotenv_values: Dict[str, str] = {}
+_dotenv_lock = threading.Lock()
+
+
 def load_config() -> MCPConfig:
-    """Load configuration from environment variables."""
+    """Load configuration from environment variables.
 
-    # Load values from a local .env file if present.
-    load_dotenv()
+    A local .env file fills in variables missing from the environment. It is
+    re-read on every call, so long-running servers pick up edited settings on
+    reload, but real environment variables always take precedence over it.
+    """
+
+    _apply_dotenv()
 
     organization_url = os.getenv("AZDO_ORG_URL")
     pat = os.getenv("AZDO_PAT")
@@ -25,17 +35,74 @@ def load_config() -> MCPConfig:
     if not organization_url:
         raise MissingConfigurationError("AZDO_ORG_URL is required")
 
-    if not pat:
+    cassette_path = os.getenv("AZDO_CASSETTE") or None
+    cassette_mode = (os.getenv("AZDO_CASSETTE_MODE") or REPLAY).strip().lower()
+    if cassette_mode not in {RECORD, REPLAY}:
+        raise MissingConfigurationError("AZDO_CASSETTE_MODE must be record or replay")
+    offline = cassette_path is not None and cassette_mode == REPLAY
+
+    # Replaying a cassette never reaches Azure DevOps, so no token is needed.
+    if not pat and not offline:
         raise MissingConfigurationError("AZDO_PAT is required")
 
     return MCPConfig(
         organization_url=organization_url.rstrip("/"),
-        personal_access_token=pat,
+        personal_access_token=pat or "",
         default_project=default_project,
         default_repository=default_repository,
+        cache_ttl_seconds=_env_number("AZDO_CACHE_TTL", 30.0),
+        cache_max_entries=int(_env_number("AZDO_CACHE_MAX_ENTRIES", 256)),
+        connect_timeout=_env_number("AZDO_CONNECT_TIMEOUT", 5.0),
+        read_timeout=_env_number("AZDO_READ_TIMEOUT", 30.0),
+        max_retries=int(_env_number("AZDO_MAX_RETRIES", 3)),
+        max_concurrency=max(1, int(_env_number("AZDO_MAX_CONCURRENCY", 16))),
+        stream_threads=_env_flag("AZDO_STREAM_THREADS"),
+        store_path=os.getenv("AZDO_STORE_PATH") or None,
+        store_max_bytes=int(_env_number("AZDO_STORE_MAX_MB", 256) * 1024 * 1024),
+        webhook_secret=os.getenv("AZDO_WEBHOOK_SECRET") or None,
+        admin_token=os.getenv("AZDO_ADMIN_TOKEN") or None,
+        probe_max_age_seconds=_env_number("AZDO_PROBE_MAX_AGE", 0.0),
+        blob_cache_bytes=int(_env_number("AZDO_BLOB_CACHE_MB", 64) * 1024 * 1024),
+        cassette_path=cassette_path,
+        cassette_mode=cassette_mode,
+        replay_latency=_env_number("AZDO_REPLAY_LATENCY_MS", 0) / 1000,
     )
 
 
+def _apply_dotenv() -> None:
+    from dotenv import dotenv_values, find_dotenv
+
+    values = {name: value for name, value in dotenv_values(find_dotenv()).items() if value is not None}
+    with _dotenv_lock:
+        for name in set(_dotenv_values) | set(values):
+            current = os.environ.get(name)
+            if current is not None and current != _dotenv_values.get(name):
+                # Set outside the .env file; it wins, as it did at startup.
+                _dotenv_values.pop(name, None)
+            elif name in values:
+                os.environ[name] = _dotenv_values[name] = values[name]
+            else:
+                os.environ.pop(name, None)
+                del _dotenv_values[name]
+
+
+def _env_flag(env_var: str) -> bool:
+    return (os.getenv(env_var) or "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _env_number(env_var: str, default: float) -> float:
+    raw = os.getenv(env_var)
+    if not raw:
+        return default
+    try:
+        value = float(raw)
+    except ValueError:
+        raise MissingConfigurationError(f"{env_var} must be a number") from None
+    if value < 0:
+        raise MissingConfigurationError(f"{env_var} must not be negative")
+    return value
+
+
 def env_override(value: Optional[str], env_var: str) -> Optional[str]:
     """Return `value` if provided, otherwise lookup `env_var`."""
 
@@ -0,0 +1,99 @@
+"""Per-request deadlines shared by every stage of a fetch.
+
+A deadline is an absolute `time.monotonic()` value held in a context
+variable, so it follows a request through resolution, HTTP calls, retries
+and normalization, and is inherited by the tasks a batch starts. Nested
+scopes keep the earlier deadline.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Iterator, Optional, TypeVar
+
+from .errors import DeadlineExceededError
+
+T = TypeVar("T")
+
+_deadline: ContextVar[Optional[float]] = ContextVar("ado_review_lens_deadline", default=None)
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float] = None, *, at: Optional[float] = None) -> Iterator[Optional[float]]:
+    """Bound the enclosed block to `seconds` from now, or to the monotonic time `at`.
+
+    Yields the deadline in force, which is None when neither applies.
+    """
+
+    candidates = [value for value in (_deadline.get(), at) if value is not None]
+    if seconds is not None:
+        candidates.append(time.monotonic() + seconds)
+    if not candidates:
+        yield None
+        return
+    token = _deadline.set(min(candidates))
+    try:
+        yield min(candidates)
+    finally:
+        _deadline.reset(token)
+
+
+def deadline_after(seconds: Optional[float]) -> Optional[float]:
+    """Return the deadline `seconds` from now, capped by the current one."""
+
+    with deadline_scope(seconds) as deadline_at:
+        return deadline_at
+
+
+def current_deadline() -> Optional[float]:
+    """Return the deadline of the current context, if any."""
+
+    return _deadline.get()
+
+
+def time_left(deadline_at: Optional[float] = None) -> Optional[float]:
+    """Return the seconds left before `deadline_at` (default: the current deadline)."""
+
+    if deadline_at is None:
+        deadline_at = _deadline.get()
+    if deadline_at is None:
+        return None
+    return deadline_at - time.monotonic()
+
+
+def check_deadline(deadline_at: Optional[float] = None) -> None:
+    """Raise `DeadlineExceededError` once the deadline has passed."""
+
+    left = time_left(deadline_at)
+    if left is not None and left <= 0:
+        raise DeadlineExceededError()
+
+
+def bound_timeout(timeout: float) -> float:
+    """Shorten a network timeout so it ends no later than the deadline."""
+
+    check_deadline()
+    left = time_left()
+    return timeout if left is None else min(timeout, left)
+
+
+def allows_delay(delay: float) -> bool:
+    """Whether waiting `delay` seconds still leaves time before the deadline."""
+
+    left = time_left()
+    return left is None or delay < left
+
+
+async def within_deadline(awaitable: Awaitable[T]) -> T:
+    """Await `awaitable`, cancelling it when the current deadline passes."""
+
+    left = time_left()
+    if left is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, timeout=max(left, 0.0))
+    except asyncio.TimeoutError:
+        raise DeadlineExceededError() from None
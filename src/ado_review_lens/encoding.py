@@ -0,0 +1,103 @@
+"""Fast JSON encoding and response compression."""
+
+from __future__ import annotations
+
+import gzip
+import json
+import zlib
+from typing import Any, AsyncIterator, Optional
+
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+try:  # Optional: `pip install ado-review-lens[fast]`.
+    import orjson
+except ImportError:  # pragma: no cover - exercised when orjson is absent
+    orjson = None
+
+try:  # Optional: `pip install ado-review-lens[fast]`.
+    import brotli
+except ImportError:  # pragma: no cover - exercised when brotli is absent
+    brotli = None
+
+# Bodies smaller than this are sent as-is; compressing them saves little.
+MIN_COMPRESS_SIZE = 1024
+
+_GZIP_LEVEL = 6
+_BROTLI_QUALITY = 5
+
+
+def dumps(value: Any, *, indent: bool = False) -> bytes:
+    """Encode plain JSON data to UTF-8 bytes, with orjson when it is installed."""
+
+    if isinstance(value, BaseModel):
+        return dump_model(value, indent=indent)
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(value, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def dump_model(model: BaseModel, *, indent: bool = False) -> bytes:
+    """Serialize a response model by alias straight to bytes, without revalidating it."""
+
+    return to_json(model, by_alias=True, indent=2 if indent else None)
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick `br` or `gzip` from an `Accept-Encoding` header, preferring brotli."""
+
+    offered = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        offered[name.strip().lower()] = quality
+    for encoding in ("br", "gzip"):
+        if encoding == "br" and brotli is None:
+            continue
+        if offered.get(encoding, offered.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: Optional[str]) -> bytes:
+    """Compress a complete body with the negotiated encoding."""
+
+    if encoding == "br":
+        return brotli.compress(body, quality=_BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=_GZIP_LEVEL, mtime=0)
+    return body
+
+
+async def compress_stream(chunks: AsyncIterator[bytes], encoding: Optional[str]) -> AsyncIterator[bytes]:
+    """Compress a streamed body, flushing after each chunk so records arrive promptly."""
+
+    if encoding is None:
+        async for chunk in chunks:
+            yield chunk
+        return
+
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=_BROTLI_QUALITY)
+        async for chunk in chunks:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+        return
+
+    compressor = zlib.compressobj(_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    async for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
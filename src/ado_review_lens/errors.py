@@ -19,6 +19,22 @@ class AzureDevOpsRequestError(RuntimeError):
         self.status = status
 
 
+class DeadlineExceededError(AzureDevOpsRequestError):
+    """Raised when a request runs past its deadline."""
+
+    def __init__(self, message: str = "Deadline exceeded", status: int = 504) -> None:
+        super().__init__(message, status)
+
+
 class MissingConfigurationError(RuntimeError):
     """Raised when required environment configuration is missing."""
 
+
+def error_status(exc: Exception) -> int:
+    """Return the HTTP-style status associated with a known error."""
+
+    if isinstance(exc, (MCPUserError, AzureDevOpsRequestError)):
+        return exc.status
+    if isinstance(exc, MissingConfigurationError):
+        return 400
+    return 500
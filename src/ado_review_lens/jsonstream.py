@@ -0,0 +1,135 @@
+"""Incremental parsing of the `value` array in Azure DevOps list responses."""
+
+from __future__ import annotations
+
+import codecs
+import json
+from typing import Any, AsyncIterator, Iterable, List, TypeVar
+
+_WHITESPACE = " \t\n\r"
+
+T = TypeVar("T")
+
+
+class ArrayItemParser:
+    """Push parser yielding items of one top-level array as bytes arrive.
+
+    Azure DevOps list endpoints return `{"count": N, "value": [...]}`. Only
+    one item of `value` is held in memory at a time; sibling keys are parsed
+    and discarded. Feed chunks with `feed` and call `close` at end of body.
+    """
+
+    def __init__(self, key: str = "value") -> None:
+        self._key = key
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._state = "start"
+        self._current_key = ""
+        # Remaining-buffer size needed before retrying an incomplete value;
+        # doubling it keeps parsing linear for values spanning many chunks.
+        self._retry_size = 0
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """Consume `chunk` and return the array items it completed."""
+
+        self._buffer += self._decoder.decode(chunk)
+        return self._drain(final=False)
+
+    def close(self) -> List[Any]:
+        """Flush the remaining input and verify the document was complete."""
+
+        self._buffer += self._decoder.decode(b"", final=True)
+        items = self._drain(final=True)
+        if self._state != "done":
+            raise ValueError("Truncated or malformed JSON response")
+        return items
+
+    def _drain(self, *, final: bool) -> List[Any]:
+        items: List[Any] = []
+        if not final and len(self._buffer) - self._pos < self._retry_size:
+            return items
+
+        while self._state != "done":
+            self._skip_whitespace()
+            if self._pos >= len(self._buffer):
+                break
+            char = self._buffer[self._pos]
+
+            if self._state == "start":
+                self._expect(char, "{")
+                self._state = "key"
+            elif self._state == "key":
+                if char == "}":
+                    self._pos += 1
+                    self._state = "done"
+                elif char == ",":
+                    self._pos += 1
+                else:
+                    key = self._decode(final)
+                    if key is _INCOMPLETE:
+                        break
+                    self._current_key = key
+                    self._state = "colon"
+            elif self._state == "colon":
+                self._expect(char, ":")
+                self._state = "array" if self._current_key == self._key else "skip"
+            elif self._state == "skip":
+                if self._decode(final) is _INCOMPLETE:
+                    break
+                self._state = "key"
+            elif self._state == "array":
+                self._expect(char, "[")
+                self._state = "item"
+            elif self._state == "item":
+                if char == "]":
+                    self._pos += 1
+                    self._state = "key"
+                elif char == ",":
+                    self._pos += 1
+                else:
+                    item = self._decode(final)
+                    if item is _INCOMPLETE:
+                        break
+                    items.append(item)
+
+        self._buffer = self._buffer[self._pos :]
+        self._pos = 0
+        return items
+
+    def _decode(self, final: bool) -> Any:
+        try:
+            value, end = self._json.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise ValueError("Truncated or malformed JSON response") from None
+            self._retry_size = 2 * (len(self._buffer) - self._pos)
+            return _INCOMPLETE
+        if end >= len(self._buffer) and not final:
+            # A number at the very end of the buffer may continue in the next chunk.
+            self._retry_size = len(self._buffer) - self._pos + 1
+            return _INCOMPLETE
+        self._retry_size = 0
+        self._pos = end
+        return value
+
+    def _skip_whitespace(self) -> None:
+        buffer = self._buffer
+        while self._pos < len(buffer) and buffer[self._pos] in _WHITESPACE:
+            self._pos += 1
+
+    def _expect(self, char: str, expected: str) -> None:
+        if char != expected:
+            raise ValueError(f"Unexpected {char!r} in JSON response, expected {expected!r}")
+        self._pos += 1
+
+
+_INCOMPLETE = object()
+
+
+async def aiter_items(items: Iterable[T]) -> AsyncIterator[T]:
+    """Serve already-parsed items through the same async iterator interface as a parsed stream."""
+
+    for item in items:
+        yield item
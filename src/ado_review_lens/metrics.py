@@ -0,0 +1,250 @@
+"""Per-stage timings and process-wide counters in Prometheus text format."""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .errors import AzureDevOpsRequestError, MCPUserError, MissingConfigurationError, error_status
+
+if TYPE_CHECKING:
+    from .models import RuntimeStats
+
+_PREFIX = "ado_review_lens"
+
+# Stages of one fetch, in pipeline order; used to order the CLI report.
+STAGES = ("config", "resolve", "probe", "fetch", "decode", "normalize", "enrich", "serialize")
+
+_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_BYTES_BUCKETS = tuple(1024 * 4**power for power in range(9))  # 1 KiB .. 64 MiB
+_COMMENT_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+LabelValues = Tuple[str, ...]
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()) -> None:
+        self.name = f"{_PREFIX}_{name}"
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        with self._lock:
+            return self._values.get(labels, 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.labels, key)} {_number(value)}" for key, value in values]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float], labels: Sequence[str] = ()) -> None:
+        self.name = f"{_PREFIX}_{name}"
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # label values -> (non-cumulative counts per bucket then +Inf, [sum])
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            counts, total = series
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            else:
+                counts[-1] += 1
+            total[0] += value
+
+    def count(self, *labels: str) -> int:
+        with self._lock:
+            series = self._series.get(labels)
+            return sum(series[0]) if series is not None else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            series = sorted((key, (list(counts), total[0])) for key, (counts, total) in self._series.items())
+        lines: List[str] = []
+        for key, (counts, total) in series:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                le = "+Inf" if bound == math.inf else _number(bound)
+                lines.append(f"{self.name}_bucket{_labels((*self.labels, 'le'), (*key, le))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+STAGE_SECONDS = Histogram("stage_seconds", "Time spent in each stage of a comment fetch.", _LATENCY_BUCKETS, ["stage"])
+FETCHES = Counter("fetches_total", "Comment fetches started.")
+ERRORS = Counter("errors_total", "Comment fetches that failed, by HTTP-style status.", ["status"])
+UPSTREAM_REQUESTS = Counter(
+    "upstream_requests_total",
+    "Azure DevOps HTTP responses by status code; transport failures count as `error`.",
+    ["status"],
+)
+PAYLOAD_BYTES = Histogram("payload_bytes", "Size of downloaded thread payloads.", _BYTES_BUCKETS)
+COMMENTS_PER_PR = Histogram("comments_per_pr", "Comments returned per pull request fetch.", _COMMENT_BUCKETS)
+
+_METRICS = (STAGE_SECONDS, FETCHES, ERRORS, UPSTREAM_REQUESTS, PAYLOAD_BYTES, COMMENTS_PER_PR)
+
+# Stage totals for the current CLI invocation, when a report was requested.
+_report: ContextVar[Optional[Dict[str, float]]] = ContextVar("ado_review_lens_timings", default=None)
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """Record the duration of the enclosed block under `stage`."""
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started)
+
+
+def record_stage(stage: str, elapsed: float) -> None:
+    """Record `elapsed` seconds spent in `stage` as one observation."""
+
+    STAGE_SECONDS.observe(elapsed, stage)
+    report = _report.get()
+    if report is not None:
+        report[stage] = report.get(stage, 0.0) + elapsed
+
+
+class Stopwatch:
+    """Sum the time a lazily consumed stage spends across many short steps.
+
+    Streams interleave decoding, normalizing and writing; each step runs
+    under `running()` and the total is recorded once by `record()`.
+    """
+
+    def __init__(self, stage: str) -> None:
+        self.stage = stage
+        self.elapsed = 0.0
+
+    @contextmanager
+    def running(self) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.elapsed += time.perf_counter() - started
+
+    def record(self) -> None:
+        record_stage(self.stage, self.elapsed)
+
+
+@contextmanager
+def track_fetch() -> Iterator[None]:
+    """Count a fetch and, if it fails with a known error, its status."""
+
+    FETCHES.inc()
+    with track_errors():
+        yield
+
+
+@contextmanager
+def track_errors() -> Iterator[None]:
+    """Count a known error raised in the enclosed block by its status.
+
+    Streams use this on their own, since they fail after `track_fetch` returns.
+    """
+
+    try:
+        yield
+    except (MCPUserError, MissingConfigurationError, AzureDevOpsRequestError) as exc:
+        ERRORS.inc(str(error_status(exc)))
+        raise
+
+
+@contextmanager
+def collect_timings() -> Iterator[Dict[str, float]]:
+    """Collect per-stage totals for the enclosed block into the yielded dict."""
+
+    timings: Dict[str, float] = {}
+    token = _report.set(timings)
+    try:
+        yield timings
+    finally:
+        _report.reset(token)
+
+
+def format_timings(timings: Dict[str, float]) -> str:
+    """Render collected stage totals as an aligned plain-text table."""
+
+    ordered = [stage for stage in STAGES if stage in timings]
+    ordered.extend(sorted(stage for stage in timings if stage not in STAGES))
+    lines = [f"{stage:<10} {timings[stage] * 1000:9.1f} ms" for stage in ordered]
+    lines.append(f"{'total':<10} {sum(timings.values()) * 1000:9.1f} ms")
+    return "\n".join(lines)
+
+
+def render(stats: Optional[RuntimeStats] = None) -> str:
+    """Return every metric, plus cache and coalescing gauges from `stats`, as Prometheus text."""
+
+    lines: List[str] = []
+    for metric in _METRICS:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.samples())
+    if stats is not None:
+        cache = stats.cache
+        for name, kind, help_text, value in (
+            ("cache_hits_total", "counter", "Thread cache hits.", cache.hits),
+            ("cache_misses_total", "counter", "Thread cache misses.", cache.misses),
+            ("cache_revalidations_total", "counter", "Stale entries confirmed by a 304.", cache.revalidations),
+            ("cache_evictions_total", "counter", "Entries evicted from the thread cache.", cache.evictions),
+            ("cache_store_hits_total", "counter", "Entries loaded from the persistent store.", cache.store_hits),
+            ("cache_probe_hits_total", "counter", "Stale entries renewed by a pull request probe.", cache.probe_hits),
+            ("cache_entries", "gauge", "Entries held in the thread cache.", cache.size),
+            ("coalesced_total", "counter", "Fetches that shared another caller's result.", stats.coalescing.coalesced),
+            ("in_flight", "gauge", "Fetches currently running.", stats.coalescing.in_flight),
+            ("blob_cache_hits_total", "counter", "File reads served from the contents cache.", stats.blobs.hits),
+            ("blob_cache_misses_total", "counter", "File reads that went to Azure DevOps.", stats.blobs.misses),
+            ("blob_cache_bytes", "gauge", "Bytes of file contents held in memory.", stats.blobs.bytes),
+        ):
+            lines.append(f"# HELP {_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {_PREFIX}_{name} {kind}")
+            lines.append(f"{_PREFIX}_{name} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def _labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
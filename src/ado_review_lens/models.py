@@ -2,10 +2,16 @@
 
 from __future__ import annotations
 
-from typing import Optional
+from typing import Literal, Optional, Union
 
 from pydantic import BaseModel, ConfigDict, Field
 
+# `iteration` value selecting a pull request's newest iteration.
+LATEST_ITERATION = "latest"
+
+# Upper bound for `contextLines`, the lines of code shown around a thread.
+MAX_CONTEXT_LINES = 50
+
 
 class PullRequestTarget(BaseModel):
     """Resolved target information for a pull request lookup."""
@@ -19,6 +25,18 @@ class PullRequestTarget(BaseModel):
     pull_request_id: int = Field(alias="pullRequestId")
 
 
+class CodeSnippet(BaseModel):
+    """Source lines around a thread's position, from the commit it refers to."""
+
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    commit_id: str = Field(alias="commitId")
+    start_line: int = Field(alias="startLine")
+    end_line: int = Field(alias="endLine")
+    text: str
+
+
 class CommentModel(BaseModel):
     """Normalized comment representation returned by the MCP."""
 
@@ -37,6 +55,7 @@ class CommentModel(BaseModel):
     is_deleted: bool = Field(alias="isDeleted")
     resolved_by: Optional[str] = Field(default=None, alias="resolvedBy")
     external_id: Optional[str] = Field(default=None, alias="externalId")
+    code_context: Optional[CodeSnippet] = Field(default=None, alias="codeContext")
 
 
 class CommentsResponse(BaseModel):
@@ -49,6 +68,53 @@ class CommentsResponse(BaseModel):
     repo: Optional[str] = None
     active_threads: int = Field(default=0, alias="activeThreads")
     comments: list[CommentModel] = Field(default_factory=list)
+    cursor: Optional[str] = None
+    removed_thread_ids: list[int] = Field(default_factory=list, alias="removedThreadIds")
+
+
+class ThreadComment(BaseModel):
+    """A comment nested under its thread in the `threads` output shape."""
+
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    comment_id: str = Field(alias="commentId")
+    comment_text: str = Field(alias="commentText")
+    author_display_name: str = Field(alias="authorDisplayName")
+    author_id: str = Field(alias="authorId")
+    timestamp: str
+
+
+class ReviewThread(BaseModel):
+    """Thread-level fields stated once, with the thread's comments nested."""
+
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    thread_id: int = Field(alias="threadId")
+    file_path: Optional[str] = Field(default=None, alias="filePath")
+    line_range: Optional[str] = Field(default=None, alias="lineRange")
+    status: str
+    resolved_by: Optional[str] = Field(default=None, alias="resolvedBy")
+    code_context: Optional[CodeSnippet] = Field(default=None, alias="codeContext")
+    comments: list[ThreadComment] = Field(default_factory=list)
+    omitted_comments: int = Field(default=0, alias="omittedComments")
+
+
+class ThreadsResponse(BaseModel):
+    """Compact response envelope grouping comments by thread."""
+
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    pr: Optional[int] = None
+    repo: Optional[str] = None
+    active_threads: int = Field(default=0, alias="activeThreads")
+    threads: list[ReviewThread] = Field(default_factory=list)
+    cursor: Optional[str] = None
+    removed_thread_ids: list[int] = Field(default_factory=list, alias="removedThreadIds")
+    truncated: bool = False
+    omitted_thread_ids: list[int] = Field(default_factory=list, alias="omittedThreadIds")
 
 
 class ErrorResponse(BaseModel):
@@ -62,6 +128,20 @@ class ErrorResponse(BaseModel):
     detail: Optional[str] = None
 
 
+class CommentFilter(BaseModel):
+    """Optional narrowing of the comments returned for a pull request."""
+
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    files: list[str] = Field(default_factory=list)
+    authors: list[str] = Field(default_factory=list)
+    updated_after: Optional[str] = Field(default=None, alias="updatedAfter")
+    include_resolved: bool = Field(default=False, alias="includeResolved")
+    iteration: Optional[Union[int, Literal["latest"]]] = None
+    base_iteration: Optional[int] = Field(default=None, alias="baseIteration")
+
+
 class FetchRequest(BaseModel):
     """Request payload for the HTTP API."""
 
@@ -73,6 +153,139 @@ class FetchRequest(BaseModel):
     project: Optional[str] = None
     repo: Optional[str] = None
     allow_cross_project: bool = Field(default=False, alias="allowCrossProject")
+    since: Optional[str] = None
+    files: list[str] = Field(default_factory=list)
+    authors: list[str] = Field(default_factory=list)
+    updated_after: Optional[str] = Field(default=None, alias="updatedAfter")
+    include_resolved: bool = Field(default=False, alias="includeResolved")
+    iteration: Optional[Union[int, Literal["latest"]]] = None
+    base_iteration: Optional[int] = Field(default=None, alias="baseIteration")
+    fields: list[str] = Field(default_factory=list)
+    shape: Literal["comments", "threads"] = "comments"
+    max_bytes: Optional[int] = Field(default=None, ge=1, alias="maxBytes")
+    max_tokens: Optional[int] = Field(default=None, ge=1, alias="maxTokens")
+    context_lines: Optional[int] = Field(default=None, ge=0, le=MAX_CONTEXT_LINES, alias="contextLines")
+    deadline: Optional[float] = Field(default=None, gt=0)
+
+
+class BatchFetchRequest(BaseModel):
+    """Request payload for fetching several pull requests at once."""
+
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    requests: list[FetchRequest] = Field(default_factory=list)
+    max_concurrency: int = Field(default=8, ge=1, le=64, alias="maxConcurrency")
+    deadline: Optional[float] = Field(default=None, gt=0)
+
+
+class RepoScanRequest(BaseModel):
+    """Request payload for scanning every active pull request in a repository."""
+
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    project: Optional[str] = None
+    repo: Optional[str] = None
+    allow_cross_project: bool = Field(default=False, alias="allowCrossProject")
+    since: Optional[str] = None
+    files: list[str] = Field(default_factory=list)
+    authors: list[str] = Field(default_factory=list)
+    updated_after: Optional[str] = Field(default=None, alias="updatedAfter")
+    include_resolved: bool = Field(default=False, alias="includeResolved")
+    iteration: Optional[Union[int, Literal["latest"]]] = None
+    base_iteration: Optional[int] = Field(default=None, alias="baseIteration")
+    max_concurrency: int = Field(default=8, ge=1, le=64, alias="maxConcurrency")
+    context_lines: Optional[int] = Field(default=None, ge=0, le=MAX_CONTEXT_LINES, alias="contextLines")
+    deadline: Optional[float] = Field(default=None, gt=0)
+
+
+class BatchItemResult(BaseModel):
+    """Outcome of a single pull request within a batch."""
+
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    pr: Optional[int] = None
+    pr_url: Optional[str] = Field(default=None, alias="prUrl")
+    result: Optional[CommentsResponse] = None
+    error: Optional[ErrorResponse] = None
+
+
+class BatchCommentsResponse(BaseModel):
+    """Response envelope for batch fetches, one entry per requested PR."""
+
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    results: list[BatchItemResult] = Field(default_factory=list)
+    succeeded: int = 0
+    failed: int = 0
+    timed_out: list[int] = Field(default_factory=list, alias="timedOut")
+
+
+class WebhookResult(BaseModel):
+    """What a service-hook event changed in the thread cache."""
+
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    action: str
+    pr: Optional[int] = None
+    thread_id: Optional[int] = Field(default=None, alias="threadId")
+
+
+class CacheStats(BaseModel):
+    """Counters describing thread cache effectiveness."""
+
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    hits: int = 0
+    misses: int = 0
+    revalidations: int = 0
+    evictions: int = 0
+    size: int = 0
+    max_entries: int = Field(default=0, alias="maxEntries")
+    ttl_seconds: float = Field(default=0.0, alias="ttlSeconds")
+    store_hits: int = Field(default=0, alias="storeHits")
+    probe_hits: int = Field(default=0, alias="probeHits")
+
+
+class BlobCacheStats(BaseModel):
+    """Counters for the file contents cache behind `codeContext`."""
+
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    size: int = 0
+    bytes: int = 0
+    max_bytes: int = Field(default=0, alias="maxBytes")
+
+
+class CoalescingStats(BaseModel):
+    """Counters for identical concurrent fetches that shared one upstream call."""
+
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    executed: int = 0
+    coalesced: int = 0
+    in_flight: int = Field(default=0, alias="inFlight")
+
+
+class RuntimeStats(BaseModel):
+    """Aggregated runtime counters exposed by the API and MCP server."""
+
+
+    model_config = ConfigDict(populate_by_name=True)
+
+    cache: CacheStats
+    coalescing: CoalescingStats
+    blobs: BlobCacheStats = Field(default_factory=BlobCacheStats)
 
 
 class MCPConfig(BaseModel):
@@ -85,3 +298,19 @@ class MCPConfig(BaseModel):
     default_project: Optional[str] = None
     default_repository: Optional[str] = None
     personal_access_token: str
+    cache_ttl_seconds: float = 30.0
+    cache_max_entries: int = 256
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    max_retries: int = 3
+    max_concurrency: int = 16
+    stream_threads: bool = False
+    store_path: Optional[str] = None
+    store_max_bytes: int = 256 * 1024 * 1024
+    webhook_secret: Optional[str] = None
+    admin_token: Optional[str] = None
+    probe_max_age_seconds: float = 0.0
+    blob_cache_bytes: int = 64 * 1024 * 1024
+    cassette_path: Optional[str] = None
+    cassette_mode: Literal["record", "replay"] = "replay"
+    replay_latency: float = 0.0
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 import re
-from typing import Optional
+from typing import Optional, Tuple
 from urllib.parse import urlparse
 
 from .errors import MCPUserError
@@ -55,6 +55,25 @@ def resolve_target(
     )
 
 
+def resolve_repository(
+    *,
+    config: MCPConfig,
+    allow_cross_project: bool,
+    project_override: Optional[str],
+    repo_override: Optional[str],
+) -> Tuple[str, str]:
+    """Resolve the project and repository for repository-wide operations."""
+
+    project = project_override or config.default_project
+    repository = repo_override or config.default_repository
+
+    if not project or not repository:
+        raise MCPUserError("Missing project or repo context", status=400)
+
+    _check_scope(config, project, repository, allow_cross_project)
+    return project, repository
+
+
 def _resolve_from_url(
     *,
     config: MCPConfig,
@@ -91,6 +110,17 @@ def _build_target(
     pull_request_id: int,
     allow_cross_project: bool,
 ) -> PullRequestTarget:
+    _check_scope(config, project, repository, allow_cross_project)
+
+    return PullRequestTarget(
+        organization=_extract_org_name(config.organization_url),
+        project=project,
+        repository=repository,
+        pullRequestId=pull_request_id,
+    )
+
+
+def _check_scope(config: MCPConfig, project: str, repository: str, allow_cross_project: bool) -> None:
     default_project = config.default_project
     default_repository = config.default_repository
 
@@ -99,10 +129,3 @@ def _build_target(
             raise MCPUserError("Cross-project access not allowed", status=400)
         if default_repository and repository.lower() != default_repository.lower():
             raise MCPUserError("Cross-project access not allowed", status=400)
-
-    return PullRequestTarget(
-        organization=_extract_org_name(config.organization_url),
-        project=project,
-        repository=repository,
-        pullRequestId=pull_request_id,
-    )
@@ -0,0 +1,237 @@
+"""Process-lifetime configuration and client holder."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterator, Optional
+
+from .azure import AsyncAzureDevOpsClient, AzureDevOpsClient
+from .cache import BlobCache, ThreadCache
+from .config import load_config
+from .models import CacheStats, CoalescingStats, MCPConfig, RuntimeStats
+from .singleflight import AsyncSingleFlight, SingleFlight
+from .store import open_thread_cache
+
+if TYPE_CHECKING:
+    import httpx
+
+
+class Generation:
+    """Clients and caches built from one configuration.
+
+    Each is created on first use. `leases` counts the calls still using
+    them, so a reload can wait for those to finish before closing them.
+    """
+
+    def __init__(self, config: MCPConfig, lock: threading.Lock, transport: Optional[httpx.AsyncBaseTransport]) -> None:
+        self._config = config
+        self._lock = lock
+        self._transport = transport
+        self._client: Optional[AzureDevOpsClient] = None
+        self._async_client: Optional[AsyncAzureDevOpsClient] = None
+        self._cache: Optional[ThreadCache] = None
+        self._blobs: Optional[BlobCache] = None
+        self.leases = 0
+
+    def config(self) -> MCPConfig:
+        return self._config
+
+    def cache(self) -> ThreadCache:
+        with self._lock:
+            if self._cache is None:
+                self._cache = open_thread_cache(self._config)
+            return self._cache
+
+    def blobs(self) -> BlobCache:
+        with self._lock:
+            if self._blobs is None:
+                self._blobs = BlobCache(max_bytes=self._config.blob_cache_bytes)
+            return self._blobs
+
+    def client(self) -> AzureDevOpsClient:
+        cache = self.cache()
+        blobs = self.blobs()
+        with self._lock:
+            if self._client is None:
+                self._client = AzureDevOpsClient(self._config, cache=cache, blobs=blobs)
+            return self._client
+
+    def async_client(self) -> AsyncAzureDevOpsClient:
+        cache = self.cache()
+        blobs = self.blobs()
+        with self._lock:
+            if self._async_client is None:
+                self._async_client = AsyncAzureDevOpsClient(
+                    self._config,
+                    cache=cache,
+                    blobs=blobs,
+                    transport=self._transport,
+                )
+            return self._async_client
+
+    def close(self) -> None:
+        """Close the synchronous client and the persistent store connection."""
+
+        with self._lock:
+            client, self._client = self._client, None
+            cache = self._cache
+        if client is not None:
+            client.close()
+        if cache is not None:
+            # The store reopens on next use, so the cache itself stays valid.
+            cache.close()
+
+    async def aclose(self) -> None:
+        """Close every client of this generation."""
+
+        self.close()
+        with self._lock:
+            async_client, self._async_client = self._async_client, None
+        if async_client is not None:
+            await async_client.aclose()
+
+
+class LensRuntime:
+    """Own the configuration and Azure DevOps clients for a long-running process.
+
+    Clients are created on first use and kept open so their connection pools
+    stay warm between requests; both share one thread cache and one file
+    contents cache, and identical
+    concurrent fetches are coalesced through `flights`/`async_flights`.
+    `reload` re-reads the environment and, when the configuration actually
+    changed, starts a new `Generation` of clients and caches. Calls hold a
+    `lease` on the generation they use, and the old one is closed once
+    those calls finish.
+    """
+
+    def __init__(
+        self,
+        config: Optional[MCPConfig] = None,
+        *,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        self._lock = threading.Lock()
+        self._drained = threading.Condition(self._lock)
+        self._config = config
+        self._transport = transport
+        self._generation: Optional[Generation] = None
+        self.flights = SingleFlight()
+        self.async_flights = AsyncSingleFlight()
+
+    def config(self) -> MCPConfig:
+        """Return the active configuration, loading it on first use."""
+
+        return self.generation().config()
+
+    def generation(self) -> Generation:
+        """Return the current generation of clients and caches."""
+
+        with self._lock:
+            return self._current()
+
+    def acquire(self) -> Generation:
+        """Return the current generation, leased until `release` is called."""
+
+        with self._lock:
+            generation = self._current()
+            generation.leases += 1
+        return generation
+
+    def release(self, generation: Generation) -> None:
+        with self._drained:
+            generation.leases -= 1
+            self._drained.notify_all()
+
+    @contextmanager
+    def lease(self) -> Iterator[Generation]:
+        """Hold the current generation for the duration of a call."""
+
+        generation = self.acquire()
+        try:
+            yield generation
+        finally:
+            self.release(generation)
+
+    def cache(self) -> ThreadCache:
+        """Return the thread cache shared by both clients."""
+
+        return self.generation().cache()
+
+    def blobs(self) -> BlobCache:
+        """Return the file contents cache shared by both clients."""
+
+        return self.generation().blobs()
+
+    def cache_stats(self) -> CacheStats:
+        return self.cache().stats()
+
+    def stats(self) -> RuntimeStats:
+        sync_stats = self.flights.stats()
+        async_stats = self.async_flights.stats()
+        return RuntimeStats(
+            cache=self.cache_stats(),
+            coalescing=CoalescingStats(
+                executed=sync_stats.executed + async_stats.executed,
+                coalesced=sync_stats.coalesced + async_stats.coalesced,
+                inFlight=sync_stats.in_flight + async_stats.in_flight,
+            ),
+            blobs=self.blobs().stats(),
+        )
+
+    def client(self) -> AzureDevOpsClient:
+        """Return the shared synchronous client."""
+
+        return self.generation().client()
+
+    def async_client(self) -> AsyncAzureDevOpsClient:
+        """Return the shared asynchronous client."""
+
+        return self.generation().async_client()
+
+    async def reload(self) -> MCPConfig:
+        """Re-read configuration and start new clients if it changed.
+
+        The previous clients and caches are closed once every call leasing
+        them has finished; calls starting meanwhile use the new ones.
+        """
+
+        config = load_config()
+        with self._lock:
+            if config == self._config:
+                return config
+            self._config = config
+            retired, self._generation = self._generation, None
+
+        if retired is not None:
+            await asyncio.to_thread(self._wait_drained, retired)
+            await retired.aclose()
+        return config
+
+    def _current(self) -> Generation:
+        if self._generation is None:
+            if self._config is None:
+                self._config = load_config()
+            self._generation = Generation(self._config, threading.Lock(), self._transport)
+        return self._generation
+
+    def _wait_drained(self, generation: Generation) -> None:
+        with self._drained:
+            self._drained.wait_for(lambda: generation.leases == 0)
+
+    def close(self) -> None:
+        """Close the synchronous client and the persistent store connection."""
+
+        with self._lock:
+            generation = self._generation
+        if generation is not None:
+            generation.close()
+
+    async def aclose(self) -> None:
+        """Close every client owned by the runtime."""
+
+        with self._lock:
+            generation = self._generation
+        if generation is not None:
+            await generation.aclose()
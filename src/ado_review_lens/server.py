@@ -2,33 +2,227 @@
 
 from __future__ import annotations
 
-from typing import Optional
-
-from mcp.server.fastmcp import FastMCP
+import asyncio
+import functools
+import os
+import sys
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, List, Literal, Optional, Sequence, Union
 
 from .errors import AzureDevOpsRequestError, MCPUserError, MissingConfigurationError
-from .service import fetch_comments
 
-mcp = FastMCP("AdoReviewLens")
+if TYPE_CHECKING:
+    from mcp.server.fastmcp import FastMCP
+
+    from .runtime import LensRuntime
+
+# FastMCP, pydantic and the HTTP clients are loaded on first use: `mcp` is
+# built when the server starts and the service layer on the first tool call.
+_runtime: Optional[LensRuntime] = None
+
+_TRANSPORTS = ("stdio", "sse", "streamable-http")
+
+# Tool calls this process runs at once; set by `main`, None means no cap.
+_tool_slots: Optional[asyncio.Semaphore] = None
+
+
+def _get_runtime() -> LensRuntime:
+    global _runtime
+    if _runtime is None:
+        from .runtime import LensRuntime
+
+        _runtime = LensRuntime()
+    return _runtime
+
+
+@asynccontextmanager
+async def _lifespan(server: FastMCP) -> AsyncIterator[None]:
+    try:
+        yield
+    finally:
+        if _runtime is not None:
+            await _runtime.aclose()
 
 
-@mcp.tool()
-def fetch_pr_comments(
+async def fetch_pr_comments(
     pr: Optional[int] = None,
     url: Optional[str] = None,
     allow_cross_project: bool = False,
     project: Optional[str] = None,
     repo: Optional[str] = None,
+    since: Optional[str] = None,
+    files: Optional[List[str]] = None,
+    authors: Optional[List[str]] = None,
+    updated_after: Optional[str] = None,
+    include_resolved: bool = False,
+    iteration: Optional[Union[int, Literal["latest"]]] = None,
+    base_iteration: Optional[int] = None,
+    fields: Optional[List[str]] = None,
+    shape: str = "comments",
+    max_bytes: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    context_lines: Optional[int] = None,
+    deadline: Optional[float] = None,
 ) -> dict:
-    """Fetch active Azure DevOps pull request comments."""
+    """Fetch active Azure DevOps pull request comments.
+
+    Pass the `cursor` from a previous call as `since` to receive only
+    comments that changed after it plus `removedThreadIds`. `files` (glob
+    patterns), `authors` (display name, unique name or id) and
+    `updated_after` narrow the result; `include_resolved` also returns
+    comments on closed threads. `iteration` (a number or "latest") keeps
+    only threads opened on that push, with line ranges tracked to it;
+    `base_iteration` widens this to every push after it. `fields` limits
+    each comment to those keys, e.g. `["filePath", "lineRange", "commentText"]`.
+    `context_lines` (0-50) attaches the commented code as `codeContext`,
+    with that many lines either side, so no separate file reads are needed.
+
+    `shape="threads"` states file, line range and status once per thread
+    with its comments nested, which is far smaller for long discussions.
+    With it, `max_tokens` or `max_bytes` caps the response: the oldest
+    replies are dropped first (counted in `omittedComments`), then the least
+    recently active threads (listed in `omittedThreadIds`).
+
+    `deadline` (seconds) makes the call fail with 504 instead of running longer.
+    """
+
+    from .metrics import timed
+    from .models import CommentFilter
+    from .service import fetch_comments_async
+    from .threads import render_response
 
     try:
-        response = fetch_comments(
+        response = await fetch_comments_async(
             pr_id=pr,
             pr_url=url,
             allow_cross_project=allow_cross_project,
             project=project,
             repo=repo,
+            since=since,
+            filters=CommentFilter(
+                files=files or [],
+                authors=authors or [],
+                updatedAfter=updated_after,
+                includeResolved=include_resolved,
+                iteration=iteration,
+                baseIteration=base_iteration,
+            ),
+            runtime=_get_runtime(),
+            deadline=deadline,
+            context_lines=context_lines,
+        )
+        with timed("serialize"):
+            return render_response(
+                response,
+                shape=shape,
+                fields=fields,
+                max_bytes=max_bytes,
+                max_tokens=max_tokens,
+            )
+    except MissingConfigurationError as exc:
+        raise ValueError(str(exc)) from exc
+    except MCPUserError as exc:
+        raise ValueError(f"{exc.status}: {exc}") from exc
+    except AzureDevOpsRequestError as exc:
+        raise RuntimeError(f"Azure DevOps error ({exc.status}): {exc}") from exc
+
+
+async def fetch_pr_comments_batch(
+    prs: Optional[List[int]] = None,
+    urls: Optional[List[str]] = None,
+    allow_cross_project: bool = False,
+    project: Optional[str] = None,
+    repo: Optional[str] = None,
+    since: Optional[str] = None,
+    files: Optional[List[str]] = None,
+    authors: Optional[List[str]] = None,
+    updated_after: Optional[str] = None,
+    include_resolved: bool = False,
+    iteration: Optional[Union[int, Literal["latest"]]] = None,
+    base_iteration: Optional[int] = None,
+    context_lines: Optional[int] = None,
+    max_concurrency: int = 8,
+    deadline: Optional[float] = None,
+) -> dict:
+    """Fetch active comments for several pull requests concurrently.
+
+    Each PR gets its own entry with either `result` or `error`. The filters
+    and `context_lines` match those of `fetch_pr_comments` and apply to every PR. With
+    `deadline` (seconds) the PRs not finished in time are listed in `timedOut`.
+    """
+
+    from .models import FetchRequest
+    from .service import fetch_comments_batch_async
+
+    template = FetchRequest(
+        allowCrossProject=allow_cross_project,
+        project=project,
+        repo=repo,
+        since=since,
+        files=files or [],
+        authors=authors or [],
+        updatedAfter=updated_after,
+        includeResolved=include_resolved,
+        iteration=iteration,
+        baseIteration=base_iteration,
+        contextLines=context_lines,
+    )
+    requests = [template.model_copy(update={"pr_id": pr}) for pr in prs or []]
+    requests.extend(template.model_copy(update={"pr_url": url}) for url in urls or [])
+
+    response = await fetch_comments_batch_async(
+        requests,
+        runtime=_get_runtime(),
+        max_concurrency=max_concurrency,
+        deadline=deadline,
+    )
+    return response.model_dump(by_alias=True)
+
+
+async def scan_repo_comments(
+    project: Optional[str] = None,
+    repo: Optional[str] = None,
+    allow_cross_project: bool = False,
+    since: Optional[str] = None,
+    files: Optional[List[str]] = None,
+    authors: Optional[List[str]] = None,
+    updated_after: Optional[str] = None,
+    include_resolved: bool = False,
+    iteration: Optional[Union[int, Literal["latest"]]] = None,
+    base_iteration: Optional[int] = None,
+    context_lines: Optional[int] = None,
+    max_concurrency: int = 8,
+    deadline: Optional[float] = None,
+) -> dict:
+    """Fetch active comments for every open pull request in a repository.
+
+    Defaults to the configured project and repository. Each PR gets its own
+    entry with either `result` or `error`, ordered by PR id. The filters
+    and `context_lines` match those of `fetch_pr_comments`; `deadline` behaves as in
+    `fetch_pr_comments_batch`.
+    """
+
+    from .models import CommentFilter
+    from .service import scan_repository_async
+
+    try:
+        response = await scan_repository_async(
+            project=project,
+            repo=repo,
+            allow_cross_project=allow_cross_project,
+            since=since,
+            filters=CommentFilter(
+                files=files or [],
+                authors=authors or [],
+                updatedAfter=updated_after,
+                includeResolved=include_resolved,
+                iteration=iteration,
+                baseIteration=base_iteration,
+            ),
+            runtime=_get_runtime(),
+            max_concurrency=max_concurrency,
+            deadline=deadline,
+            context_lines=context_lines,
         )
         return response.model_dump(by_alias=True)
     except MissingConfigurationError as exc:
@@ -39,10 +233,110 @@ def fetch_pr_comments(
         raise RuntimeError(f"Azure DevOps error ({exc.status}): {exc}") from exc
 
 
+async def runtime_stats() -> dict:
+    """Report thread cache counters and how many fetches were coalesced."""
+
+    try:
+        return _get_runtime().stats().model_dump(by_alias=True)
+    except MissingConfigurationError as exc:
+        raise ValueError(str(exc)) from exc
+
+
+async def reload_config() -> dict:
+    """Re-read Azure DevOps configuration from the environment and `.env` file."""
+
+    try:
+        config = await _get_runtime().reload()
+    except MissingConfigurationError as exc:
+        raise ValueError(str(exc)) from exc
+
+    return {
+        "organizationUrl": config.organization_url,
+        "defaultProject": config.default_project,
+        "defaultRepository": config.default_repository,
+    }
+
+
+_TOOLS = (fetch_pr_comments, fetch_pr_comments_batch, scan_repo_comments, runtime_stats)
+
+# Over SSE and streamable HTTP any client that can reach the port could call
+# these, so they are only offered to the single local stdio client.
+_STDIO_TOOLS = (reload_config,)
+
+
+_mcp: Optional[FastMCP] = None
+
+
+def _limited(tool: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """Wrap a tool so it waits for a free slot when the concurrency cap is reached."""
+
+    @functools.wraps(tool)
+    async def call(*args: Any, **kwargs: Any) -> Any:
+        if _tool_slots is None:
+            return await tool(*args, **kwargs)
+        async with _tool_slots:
+            return await tool(*args, **kwargs)
+
+    return call
+
+
+def _server(transport: str = "stdio", **settings: Any) -> FastMCP:
+    """Return the FastMCP server; `transport` and `settings` (host, port, ...) apply when it is first built."""
+
+    global _mcp
+    if _mcp is None:
+        from mcp.server.fastmcp import FastMCP
+
+        _mcp = FastMCP("AdoReviewLens", lifespan=_lifespan, **settings)
+        for tool in _TOOLS + (_STDIO_TOOLS if transport == "stdio" else ()):
+            _mcp.add_tool(_limited(tool))
+    return _mcp
+
+
+def __getattr__(name: str) -> Any:
+    # `server.mcp` keeps working for `mcp dev`/`mcp install` and embedders.
+    if name == "mcp":
+        return _server()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _parse_args(argv: Sequence[str]) -> Any:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the AdoReviewLens MCP server.")
+    parser.add_argument(
+        "--transport",
+        choices=_TRANSPORTS,
+        default=os.getenv("AZDO_MCP_TRANSPORT") or "stdio",
+        help="stdio serves one client; sse and streamable-http let many clients share this process",
+    )
+    parser.add_argument("--host", default=os.getenv("AZDO_MCP_HOST") or "127.0.0.1", help="HTTP bind address")
+    parser.add_argument("--port", type=int, default=os.getenv("AZDO_MCP_PORT") or "8000", help="HTTP port")
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=os.getenv("AZDO_MCP_MAX_CONCURRENCY") or "32",
+        help="Tool calls run at once; further calls wait (0 disables the cap)",
+    )
+    args = parser.parse_args(argv)
+    if args.max_concurrency < 0:
+        parser.error("--max-concurrency must not be negative")
+    return args
+
+
 def main() -> None:
-    """Run the MCP server using stdio transport."""
+    """Run the MCP server over stdio, or over SSE or streamable HTTP for many clients."""
+
+    from .startup import run_fast_path
+
+    code = run_fast_path(sys.argv[1:])
+    if code is not None:
+        sys.exit(code)
 
-    mcp.run()
+    global _tool_slots
+    args = _parse_args(sys.argv[1:])
+    _tool_slots = asyncio.Semaphore(args.max_concurrency) if args.max_concurrency else None
+    _server(args.transport, host=args.host, port=args.port).run(transport=args.transport)
 
 
 if __name__ == "__main__":
@@ -2,12 +2,56 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, List
+import asyncio
+import contextvars
+import functools
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Pattern,
+    Sequence,
+    Tuple,
+)
 
-from .azure import AzureDevOpsClient
+from .azure import AsyncAzureDevOpsClient, AzureDevOpsClient
+from .cache import cache_key
 from .config import load_config
-from .models import CommentModel, CommentsResponse
-from .resolver import resolve_target
+from .deadline import check_deadline, current_deadline, deadline_after, deadline_scope, within_deadline
+from .errors import AzureDevOpsRequestError, MCPUserError, MissingConfigurationError, error_status
+from .jsonstream import aiter_items
+from .metrics import COMMENTS_PER_PR, Stopwatch, timed, track_errors, track_fetch
+from .models import (
+    LATEST_ITERATION,
+    MAX_CONTEXT_LINES,
+    BatchCommentsResponse,
+    BatchItemResult,
+    CommentFilter,
+    CommentModel,
+    CommentsResponse,
+    ErrorResponse,
+    FetchRequest,
+    MCPConfig,
+    PullRequestTarget,
+    RepoScanRequest,
+)
+from .resolver import _PR_URL_PATTERN, resolve_repository, resolve_target
+from .runtime import Generation, LensRuntime
+from .snippets import FileVersion, ThreadAnchor, attach_snippets, iteration_commits, plan_files, thread_anchor
+from .timestamps import parse_timestamp
+
+# Output name -> model field name, for `fields` projection.
+_COMMENT_FIELDS = {field.alias or name: name for name, field in CommentModel.model_fields.items()}
 
 
 def fetch_comments(
@@ -17,11 +61,435 @@ def fetch_comments(
     allow_cross_project: bool = False,
     project: str | None = None,
     repo: str | None = None,
+    since: str | None = None,
+    filters: CommentFilter | None = None,
+    runtime: LensRuntime | None = None,
+    deadline: float | None = None,
+    context_lines: int | None = None,
+) -> CommentsResponse:
+    """Fetch active Azure DevOps pull request comments.
+
+    Without a `runtime` the configuration is loaded and a client is opened
+    and closed for this call only, which suits one-shot CLI invocations.
+
+    With `since` (a timestamp or the `cursor` of a previous response) only
+    comments updated after it are returned, together with the ids of
+    threads that stopped being active in the meantime.
+
+    `filters` narrows the result by file, author, update time and thread
+    status; unwanted threads are skipped before any comment is normalized.
+    Its `iteration` (a number or "latest") and optional `baseIteration`
+    keep only threads opened on those iterations, with line ranges tracked
+    to `iteration`.
+
+    `deadline` bounds the whole call, retries included, to that many
+    seconds; past it `DeadlineExceededError` (status 504) is raised.
+
+    With `context_lines` each comment on a file position carries
+    `codeContext`: the commented lines plus that many lines either side,
+    read from the commit the thread's line numbers refer to. Each file
+    version is downloaded once and the reads run in parallel.
+    """
+
+    with deadline_scope(deadline), track_fetch():
+        config, target = _prepare(runtime, pr_id, pr_url, allow_cross_project, project, repo, since, filters)
+        _check_context_lines(context_lines)
+        if runtime is None:
+            with AzureDevOpsClient(config) as client:
+                response = _load_response(client, config, target, since, filters, context_lines)
+        else:
+            with runtime.lease() as active:
+                client = active.client()
+                response = runtime.flights.do(
+                    _flight_key(target, since, filters, context_lines),
+                    lambda: _load_response(client, config, target, since, filters, context_lines),
+                )
+    COMMENTS_PER_PR.observe(len(response.comments))
+    return response
+
+
+async def fetch_comments_async(
+    *,
+    pr_id: int | None = None,
+    pr_url: str | None = None,
+    allow_cross_project: bool = False,
+    project: str | None = None,
+    repo: str | None = None,
+    since: str | None = None,
+    filters: CommentFilter | None = None,
+    runtime: LensRuntime | None = None,
+    deadline: float | None = None,
+    context_lines: int | None = None,
 ) -> CommentsResponse:
-    """Fetch active Azure DevOps pull request comments."""
+    """Fetch active Azure DevOps pull request comments without blocking the event loop.
+
+    Identical concurrent calls on the same runtime share one upstream request
+    and one normalization pass.
+    """
+
+    async def load(client: AsyncAzureDevOpsClient) -> CommentsResponse:
+        resolved = await _resolve_iteration_async(client, target, filters)
+        threads = await _load_threads_async(client, config, target, resolved)
+        attach = None
+        if context_lines is not None:
+            attach = functools.partial(_attach_context_async, client, target, resolved, context_lines=context_lines)
+        return await _build_response_async(target, threads, since, resolved, attach)
+
+    with deadline_scope(deadline), track_fetch():
+        config, target = _prepare(runtime, pr_id, pr_url, allow_cross_project, project, repo, since, filters)
+        _check_context_lines(context_lines)
+        if runtime is None:
+            async with AsyncAzureDevOpsClient(config) as client:
+                response = await within_deadline(load(client))
+        else:
+            with runtime.lease() as active:
+                client = active.async_client()
+                response = await within_deadline(
+                    runtime.async_flights.do(_flight_key(target, since, filters, context_lines), lambda: load(client))
+                )
+    COMMENTS_PER_PR.observe(len(response.comments))
+    return response
+
+
+def stream_comments(
+    *,
+    pr_id: int | None = None,
+    pr_url: str | None = None,
+    allow_cross_project: bool = False,
+    project: str | None = None,
+    repo: str | None = None,
+    since: str | None = None,
+    filters: CommentFilter | None = None,
+    fields: Sequence[str] | None = None,
+    runtime: LensRuntime | None = None,
+    deadline: float | None = None,
+) -> Iterator[Dict[str, Any]]:
+    """Fetch threads, then return a lazy iterator of output records.
+
+    Each normalized comment is produced as its own record and a final
+    `{"summary": {...}}` record carries `activeThreads`, `cursor` and
+    `removedThreadIds`. Errors from resolution and the Azure DevOps call
+    are raised here, before the first record is produced. With `fields`
+    each comment record carries only those keys. Iteration stops with
+    `DeadlineExceededError`, before the summary, once `deadline` passes.
+    """
+
+    with deadline_scope(deadline), track_fetch():
+        config, target = _prepare(runtime, pr_id, pr_url, allow_cross_project, project, repo, since, filters)
+
+        if runtime is not None:
+            active = runtime.acquire()
+            client = active.client()
+            release = functools.partial(runtime.release, active)
+        else:
+            client = AzureDevOpsClient(config)
+            release = client.close
+        try:
+            filters = _resolve_iteration(client, target, filters)
+            walk = _ThreadWalk(target, since, filters, fields)
+            threads = _load_threads(client, config, target, filters)
+        except BaseException:
+            release()
+            raise
+        return _closing(_iter_records(walk, threads), release)
+
+
+async def stream_comments_async(
+    *,
+    pr_id: int | None = None,
+    pr_url: str | None = None,
+    allow_cross_project: bool = False,
+    project: str | None = None,
+    repo: str | None = None,
+    since: str | None = None,
+    filters: CommentFilter | None = None,
+    fields: Sequence[str] | None = None,
+    runtime: LensRuntime | None = None,
+    deadline: float | None = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Async variant of `stream_comments` returning an async iterator."""
+
+    with deadline_scope(deadline), track_fetch():
+        config, target = _prepare(runtime, pr_id, pr_url, allow_cross_project, project, repo, since, filters)
+
+        if runtime is not None:
+            active = runtime.acquire()
+            client = active.async_client()
+            release = _async_release(runtime, active)
+        else:
+            client = AsyncAzureDevOpsClient(config)
+            release = client.aclose
+        try:
+            walk, threads = await within_deadline(_open_walk_async(client, config, target, since, filters, fields))
+        except BaseException:
+            await release()
+            raise
+        return _aclosing(_aiter_records(walk, threads), release)
+
+
+async def fetch_comments_batch_async(
+    requests: Sequence[FetchRequest],
+    *,
+    runtime: LensRuntime | None = None,
+    max_concurrency: int = 8,
+    deadline: float | None = None,
+) -> BatchCommentsResponse:
+    """Fetch comments for many pull requests with bounded concurrency.
+
+    Results keep the order of `requests`. A failing PR is reported in its own
+    entry and does not abort the rest of the batch. With `deadline` (seconds)
+    PRs still unfinished when it passes are reported with status 504 and
+    listed in `timedOut`, next to the results completed in time.
+    """
+
+    owned_runtime = runtime is None
+    active_runtime = runtime if runtime is not None else LensRuntime()
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    try:
+        deadline_at = deadline_after(deadline)
+        results = await asyncio.gather(
+            *(_fetch_batch_item(request, active_runtime, semaphore, deadline_at) for request in requests)
+        )
+    finally:
+        if owned_runtime:
+            await active_runtime.aclose()
+
+    return _batch_response(results)
+
+
+async def stream_repository_scan_async(
+    *,
+    project: str | None = None,
+    repo: str | None = None,
+    allow_cross_project: bool = False,
+    since: str | None = None,
+    filters: CommentFilter | None = None,
+    runtime: LensRuntime | None = None,
+    max_concurrency: int = 8,
+    deadline: float | None = None,
+    context_lines: int | None = None,
+) -> AsyncIterator[BatchItemResult]:
+    """List a repository's active pull requests and fetch their comments concurrently.
+
+    The repository is resolved and its PRs listed before this returns, so
+    those errors are raised here. Per-PR results are then yielded in the
+    order they finish; a failing PR is reported in its own entry, and PRs
+    unfinished at `deadline` (seconds, counted from this call) as timed out.
+    """
+
+    owned_runtime = runtime is None
+    active_runtime = runtime if runtime is not None else LensRuntime()
+    deadline_at = deadline_after(deadline)
+    try:
+        config = active_runtime.config()
+        project_name, repository = resolve_repository(
+            config=config,
+            allow_cross_project=allow_cross_project,
+            project_override=project,
+            repo_override=repo,
+        )
+        _check_options(since, filters)
+        _check_context_lines(context_lines)
+        with deadline_scope(at=deadline_at), active_runtime.lease() as active:
+            pull_requests = await within_deadline(active.async_client().list_pull_requests(project_name, repository))
+    except BaseException:
+        if owned_runtime:
+            await active_runtime.aclose()
+        raise
+
+    template = FetchRequest(
+        project=project_name,
+        repo=repository,
+        allowCrossProject=allow_cross_project,
+        since=since,
+        contextLines=context_lines,
+    )
+    if filters is not None:
+        template = template.model_copy(update=filters.model_dump())
+    requests = [template.model_copy(update={"pr_id": pull_request["pullRequestId"]}) for pull_request in pull_requests]
+    return _scan_results(requests, active_runtime, max_concurrency, owned_runtime, deadline_at)
+
+
+async def scan_repository_async(
+    *,
+    project: str | None = None,
+    repo: str | None = None,
+    allow_cross_project: bool = False,
+    since: str | None = None,
+    filters: CommentFilter | None = None,
+    runtime: LensRuntime | None = None,
+    max_concurrency: int = 8,
+    deadline: float | None = None,
+    context_lines: int | None = None,
+) -> BatchCommentsResponse:
+    """Scan a repository's active pull requests into one envelope ordered by PR id."""
+
+    results = await stream_repository_scan_async(
+        project=project,
+        repo=repo,
+        allow_cross_project=allow_cross_project,
+        since=since,
+        filters=filters,
+        runtime=runtime,
+        max_concurrency=max_concurrency,
+        deadline=deadline,
+        context_lines=context_lines,
+    )
+    collected = [item async for item in results]
+    collected.sort(key=lambda item: item.pr or 0)
+    return _batch_response(collected)
+
+
+async def _scan_results(
+    requests: Sequence[FetchRequest],
+    runtime: LensRuntime,
+    max_concurrency: int,
+    owned_runtime: bool,
+    deadline_at: float | None = None,
+) -> AsyncIterator[BatchItemResult]:
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    tasks = [
+        asyncio.ensure_future(_fetch_batch_item(request, runtime, semaphore, deadline_at)) for request in requests
+    ]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+    finally:
+        # Stop outstanding fetches if the consumer goes away early.
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if owned_runtime:
+            await runtime.aclose()
+
+
+def _batch_response(results: Sequence[BatchItemResult]) -> BatchCommentsResponse:
+    failed = sum(1 for item in results if item.error is not None)
+    return BatchCommentsResponse(
+        results=list(results),
+        succeeded=len(results) - failed,
+        failed=failed,
+        timedOut=timed_out_prs(results),
+    )
+
 
-    config = load_config()
-    target = resolve_target(
+def timed_out_prs(results: Iterable[BatchItemResult]) -> List[int]:
+    """Return the ids of batch or scan entries that ran out of time."""
+
+    return [item.pr for item in results if item.error is not None and item.error.status == 504 and item.pr is not None]
+
+
+async def _fetch_batch_item(
+    request: FetchRequest,
+    runtime: LensRuntime,
+    semaphore: asyncio.Semaphore,
+    deadline_at: float | None = None,
+) -> BatchItemResult:
+    # Entered inside the task so the batch deadline also reaches entries
+    # started lazily, as scan results are.
+    with deadline_scope(at=deadline_at):
+        async with semaphore:
+            try:
+                response = await fetch_comments_async(
+                    pr_id=request.pr_id,
+                    pr_url=request.pr_url,
+                    allow_cross_project=request.allow_cross_project,
+                    project=request.project,
+                    repo=request.repo,
+                    since=request.since,
+                    filters=comment_filter(request),
+                    runtime=runtime,
+                    deadline=request.deadline,
+                    context_lines=request.context_lines,
+                )
+            except (MCPUserError, MissingConfigurationError, AzureDevOpsRequestError) as exc:
+                status = error_status(exc)
+                return BatchItemResult(
+                    pr=_request_pr_id(request),
+                    prUrl=request.pr_url,
+                    error=ErrorResponse(error=str(exc), status=status),
+                )
+
+    return BatchItemResult(pr=response.pr, prUrl=request.pr_url, result=response)
+
+
+def _request_pr_id(request: FetchRequest) -> int | None:
+    if request.pr_id is not None or not request.pr_url:
+        return request.pr_id
+    match = _PR_URL_PATTERN.match(request.pr_url)
+    return int(match.group("id")) if match else None
+
+
+def comment_filter(request: FetchRequest | RepoScanRequest) -> CommentFilter:
+    """Return the filter fields of an API request."""
+
+    return CommentFilter.model_validate(request, from_attributes=True)
+
+
+def project_response(response: CommentsResponse, fields: Sequence[str] | None = None) -> Dict[str, Any]:
+    """Dump `response` by alias, keeping only `fields` of each comment when given."""
+
+    names = _check_fields(fields)
+    if names is None:
+        return response.model_dump(by_alias=True)
+    return response.model_dump(by_alias=True, include=_response_include(names))
+
+
+def _check_fields(fields: Sequence[str] | None) -> Tuple[str, ...] | None:
+    if not fields:
+        return None
+    unknown = [name for name in fields if name not in _COMMENT_FIELDS]
+    if unknown:
+        raise MCPUserError(f"Unknown comment fields: {', '.join(unknown)}", status=400)
+    return tuple(dict.fromkeys(fields))
+
+
+def _response_include(names: Sequence[str]) -> Dict[str, Any]:
+    include: Dict[str, Any] = {name: True for name in CommentsResponse.model_fields if name != "comments"}
+    include["comments"] = {"__all__": {_COMMENT_FIELDS[name] for name in names}}
+    return include
+
+
+def _flight_key(
+    target: PullRequestTarget,
+    since: str | None,
+    filters: CommentFilter | None,
+    context_lines: int | None = None,
+) -> Hashable:
+    return (cache_key(target), since, filters.model_dump_json() if filters is not None else None, context_lines)
+
+
+def _prepare(
+    runtime: LensRuntime | None,
+    pr_id: int | None,
+    pr_url: str | None,
+    allow_cross_project: bool,
+    project: str | None,
+    repo: str | None,
+    since: str | None,
+    filters: CommentFilter | None,
+) -> Tuple[MCPConfig, PullRequestTarget]:
+    # Batch entries that start after the deadline fail here, without a request.
+    check_deadline()
+    with timed("config"):
+        config = runtime.config() if runtime is not None else load_config()
+    with timed("resolve"):
+        target = _resolve(config, pr_id, pr_url, allow_cross_project, project, repo)
+        # Reject a malformed cursor or filter before spending a request on it.
+        _check_options(since, filters)
+    return config, target
+
+
+def _resolve(
+    config: MCPConfig,
+    pr_id: int | None,
+    pr_url: str | None,
+    allow_cross_project: bool,
+    project: str | None,
+    repo: str | None,
+) -> PullRequestTarget:
+    return resolve_target(
         config=config,
         pr_id=pr_id,
         pr_url=pr_url,
@@ -30,69 +498,544 @@ def fetch_comments(
         repo_override=repo,
     )
 
-    with AzureDevOpsClient(config) as client:
-        payload = client.list_threads(target)
 
-    threads = payload.get("value", []) if isinstance(payload, dict) else []
-    comments: List[CommentModel] = []
-    active_thread_ids: set[int] = set()
+def _load_response(
+    client: AzureDevOpsClient,
+    config: MCPConfig,
+    target: PullRequestTarget,
+    since: str | None,
+    filters: CommentFilter | None,
+    context_lines: int | None = None,
+) -> CommentsResponse:
+    filters = _resolve_iteration(client, target, filters)
+    threads = _load_threads(client, config, target, filters)
+    attach = None
+    if context_lines is not None:
+        attach = functools.partial(_attach_context, client, config, target, filters, context_lines=context_lines)
+    return _build_response(target, threads, since, filters, attach)
+
+
+def _load_threads(
+    client: AzureDevOpsClient,
+    config: MCPConfig,
+    target: PullRequestTarget,
+    filters: CommentFilter | None = None,
+) -> Iterable[Dict[str, Any]]:
+    options = _iteration_options(filters)
+    if config.stream_threads:
+        return client.iter_threads(target, **options)
+    return _threads_of(client.list_threads(target, **options))
+
+
+async def _load_threads_async(
+    client: AsyncAzureDevOpsClient,
+    config: MCPConfig,
+    target: PullRequestTarget,
+    filters: CommentFilter | None = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    options = _iteration_options(filters)
+    if config.stream_threads:
+        return await client.iter_threads(target, **options)
+    return aiter_items(_threads_of(await client.list_threads(target, **options)))
+
+
+async def _open_walk_async(
+    client: AsyncAzureDevOpsClient,
+    config: MCPConfig,
+    target: PullRequestTarget,
+    since: str | None,
+    filters: CommentFilter | None,
+    fields: Sequence[str] | None,
+) -> Tuple["_ThreadWalk", AsyncIterator[Dict[str, Any]]]:
+    filters = await _resolve_iteration_async(client, target, filters)
+    walk = _ThreadWalk(target, since, filters, fields)
+    return walk, await _load_threads_async(client, config, target, filters)
+
+
+def _iteration_options(filters: CommentFilter | None) -> Dict[str, int | None]:
+    if filters is None or not isinstance(filters.iteration, int):
+        return {}
+    return {"iteration": filters.iteration, "base_iteration": filters.base_iteration}
+
+
+def _resolve_iteration(
+    client: AzureDevOpsClient,
+    target: PullRequestTarget,
+    filters: CommentFilter | None,
+) -> CommentFilter | None:
+    """Replace `iteration="latest"` with the number of the PR's newest iteration."""
+
+    if filters is None or filters.iteration != LATEST_ITERATION:
+        return filters
+    with timed("resolve"):
+        latest = client.latest_iteration(target)
+    return _pin_iteration(filters, latest)
+
+
+async def _resolve_iteration_async(
+    client: AsyncAzureDevOpsClient,
+    target: PullRequestTarget,
+    filters: CommentFilter | None,
+) -> CommentFilter | None:
+    if filters is None or filters.iteration != LATEST_ITERATION:
+        return filters
+    with timed("resolve"):
+        latest = await client.latest_iteration(target)
+    return _pin_iteration(filters, latest)
+
+
+def _pin_iteration(filters: CommentFilter, iteration: int) -> CommentFilter:
+    if filters.base_iteration is not None and filters.base_iteration >= iteration:
+        raise MCPUserError("baseIteration must be lower than iteration", status=400)
+    return filters.model_copy(update={"iteration": iteration})
+
+
+def _build_response(
+    target: PullRequestTarget,
+    threads: Iterable[Dict[str, Any]],
+    since: str | None = None,
+    filters: CommentFilter | None = None,
+    attach: Callable[[Mapping[int, ThreadAnchor], List[Dict[str, Any]]], None] | None = None,
+) -> CommentsResponse:
+    """Normalize threads into a response; `attach` may add code context to the records first."""
+
+    walk = _ThreadWalk(target, since, filters, anchored=attach is not None)
+    with timed("normalize"):
+        comments = list(walk.comments(threads))
+        if attach is None:
+            return walk.response(comments)
+    attach(walk.anchors, comments)
+    with timed("normalize"):
+        return walk.response(comments)
+
+
+async def _build_response_async(
+    target: PullRequestTarget,
+    threads: AsyncIterator[Dict[str, Any]],
+    since: str | None = None,
+    filters: CommentFilter | None = None,
+    attach: Callable[[Mapping[int, ThreadAnchor], List[Dict[str, Any]]], Awaitable[None]] | None = None,
+) -> CommentsResponse:
+    walk = _ThreadWalk(target, since, filters, anchored=attach is not None)
+    with timed("normalize"):
+        comments = [comment async for thread in threads for comment in walk.visit(thread)]
+        if attach is None:
+            return walk.response(comments)
+    await attach(walk.anchors, comments)
+    with timed("normalize"):
+        return walk.response(comments)
+
+
+def _attach_context(
+    client: AzureDevOpsClient,
+    config: MCPConfig,
+    target: PullRequestTarget,
+    filters: CommentFilter | None,
+    anchors: Mapping[int, ThreadAnchor],
+    comments: List[Dict[str, Any]],
+    *,
+    context_lines: int,
+) -> None:
+    if not anchors:
+        return
+    with timed("enrich"):
+        commits = iteration_commits(client.list_iterations(target))
+        files = plan_files(comments, anchors, commits, **_iteration_options(filters))
+        versions = list(dict.fromkeys(files.values()))
+        texts = _read_files(client, target, versions, config.max_concurrency)
+        attach_snippets(comments, files, dict(zip(versions, texts)), context_lines)
+
+
+async def _attach_context_async(
+    client: AsyncAzureDevOpsClient,
+    target: PullRequestTarget,
+    filters: CommentFilter | None,
+    anchors: Mapping[int, ThreadAnchor],
+    comments: List[Dict[str, Any]],
+    *,
+    context_lines: int,
+) -> None:
+    if not anchors:
+        return
+    with timed("enrich"):
+        commits = iteration_commits(await client.list_iterations(target))
+        files = plan_files(comments, anchors, commits, **_iteration_options(filters))
+        versions = list(dict.fromkeys(files.values()))
+        # The client's limiter bounds how many of these run at once.
+        texts = await asyncio.gather(*(client.read_file(target, path, commit_id) for commit_id, path in versions))
+        attach_snippets(comments, files, dict(zip(versions, texts)), context_lines)
+
+
+def _read_files(
+    client: AzureDevOpsClient,
+    target: PullRequestTarget,
+    versions: Sequence[FileVersion],
+    max_workers: int,
+) -> List[str | None]:
+    if len(versions) < 2:
+        return [client.read_file(target, path, commit_id) for commit_id, path in versions]
+    with ThreadPoolExecutor(max_workers=min(len(versions), max_workers)) as pool:
+        # Each read runs in a copy of this context so it keeps the deadline.
+        futures = [
+            pool.submit(contextvars.copy_context().run, client.read_file, target, path, commit_id)
+            for commit_id, path in versions
+        ]
+        return [future.result() for future in futures]
+
+
+def _check_context_lines(context_lines: int | None) -> None:
+    if context_lines is not None and not 0 <= context_lines <= MAX_CONTEXT_LINES:
+        raise MCPUserError(f"contextLines must be between 0 and {MAX_CONTEXT_LINES}", status=400)
+
+
+def _summary_record(walk: "_ThreadWalk") -> Dict[str, Any]:
+    return {"summary": walk.response([]).model_dump(by_alias=True, exclude={"comments"})}
+
+
+def _iter_records(walk: "_ThreadWalk", threads: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    # Errors raised while streaming come after `track_fetch` has returned.
+    normalize = Stopwatch("normalize")
+    try:
+        with track_errors():
+            for thread in threads:
+                with normalize.running():
+                    comments = walk.visit(thread)
+                yield from comments
+            with normalize.running():
+                summary = _summary_record(walk)
+    finally:
+        normalize.record()
+    yield summary
+
+
+async def _aiter_records(walk: "_ThreadWalk", threads: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+    normalize = Stopwatch("normalize")
+    try:
+        with track_errors():
+            async for thread in threads:
+                with normalize.running():
+                    comments = walk.visit(thread)
+                for comment in comments:
+                    yield comment
+            with normalize.running():
+                summary = _summary_record(walk)
+    finally:
+        normalize.record()
+    yield summary
+
+
+def _closing(records: Iterator[Dict[str, Any]], close: Callable[[], None]) -> Iterator[Dict[str, Any]]:
+    try:
+        yield from records
+    finally:
+        close()
+
+
+async def _aclosing(
+    records: AsyncIterator[Dict[str, Any]],
+    close: Callable[[], Awaitable[None]],
+) -> AsyncIterator[Dict[str, Any]]:
+    try:
+        async for record in records:
+            yield record
+    finally:
+        await close()
+
+
+def _async_release(runtime: LensRuntime, generation: Generation) -> Callable[[], Awaitable[None]]:
+    async def release() -> None:
+        runtime.release(generation)
+
+    return release
+
+
+def _threads_of(payload: Any) -> List[Dict[str, Any]]:
+    return payload.get("value", []) if isinstance(payload, dict) else []
+
+
+class _ThreadWalk:
+    """Filter threads into normalized comments while tracking summary fields.
+
+    `comments` is lazy, so callers can stream comments out one at a time and
+    ask for the summary once the walk is finished. Filters are checked
+    against the raw thread and comment payloads, so skipped threads cost
+    no normalization; the cursor still advances over every thread.
+    """
+
+    def __init__(
+        self,
+        target: PullRequestTarget,
+        since: str | None,
+        filters: CommentFilter | None = None,
+        fields: Sequence[str] | None = None,
+        *,
+        anchored: bool = False,
+    ) -> None:
+        filters = filters or CommentFilter()
+        self._target = target
+        self._since_at = _parse_since(since)
+        self._cursor = since
+        self._cursor_at = self._since_at
+        self._active_thread_ids: set[int] = set()
+        self._removed_thread_ids: List[int] = []
+        self._file_globs = [_compile_glob(pattern) for pattern in filters.files]
+        self._authors = {author.lower() for author in filters.authors}
+        self._include_resolved = filters.include_resolved
+        self._threshold_at = max(filter(None, [self._since_at, _parse_updated_after(filters)]), default=None)
+        self._iterations = _iteration_window(filters)
+        self._fields = _check_fields(fields)
+        self._deadline_at = current_deadline()
+        self._anchors: Dict[int, ThreadAnchor] | None = {} if anchored else None
+
+    @property
+    def anchors(self) -> Mapping[int, ThreadAnchor]:
+        """Positions of the threads that produced comments, when the walk is `anchored`."""
+
+        return self._anchors or {}
+
+    def comments(self, threads: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        for thread in threads:
+            yield from self.visit(thread)
+
+    def visit(self, thread: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Record one thread in the summary and return its comments to emit."""
+
+        if self._deadline_at is not None:
+            check_deadline(self._deadline_at)
+        since_at = self._since_at
+        thread_id = thread.get("id")
+        updated = thread.get("lastUpdatedDate")
+        updated_at = parse_timestamp(updated)
+        if updated_at is not None and (self._cursor_at is None or updated_at > self._cursor_at):
+            self._cursor, self._cursor_at = str(updated), updated_at
+
+        threshold_at = self._threshold_at
+        if threshold_at is not None and updated_at is not None and updated_at <= threshold_at:
+            return []
 
-    for thread in threads:
-        if thread.get("isDeleted"):
-            continue
         status = (thread.get("status") or "").lower()
-        if status and status != "active":
-            continue
+        inactive = bool(status) and status != "active"
+        if thread.get("isDeleted") or (inactive and not self._include_resolved):
+            if since_at is not None and isinstance(thread_id, int):
+                self._removed_thread_ids.append(thread_id)
+            return []
 
-        thread_comments = _normalize_thread_comments(thread)
-        if thread_comments:
-            thread_id = thread.get("id")
-            if isinstance(thread_id, int):
-                active_thread_ids.add(thread_id)
-            comments.extend(thread_comments)
-
-    return CommentsResponse(
-        pr=target.pull_request_id,
-        repo=target.repository,
-        activeThreads=len(active_thread_ids),
-        comments=comments,
-    )
+        if self._file_globs and not self._matches_files(thread):
+            return []
+        if self._iterations is not None and not self._matches_iterations(thread):
+            return []
+
+        thread_comments = _normalize_thread_comments(thread, threshold_at, self._authors)
+        if thread_comments and isinstance(thread_id, int) and not inactive:
+            self._active_thread_ids.add(thread_id)
+        if thread_comments and isinstance(thread_id, int) and self._anchors is not None:
+            anchor = thread_anchor(thread)
+            if anchor is not None:
+                self._anchors[thread_id] = anchor
+        if self._fields is not None:
+            fields = self._fields
+            return [{name: comment[name] for name in fields} for comment in thread_comments]
+        return thread_comments
+
+    def _matches_files(self, thread: Dict[str, Any]) -> bool:
+        file_path = _extract_file_path(thread)
+        if file_path is None:
+            return False
+        path = file_path.lstrip("/")
+        return any(pattern.fullmatch(path) for pattern in self._file_globs)
+
+    def _matches_iterations(self, thread: Dict[str, Any]) -> bool:
+        iteration = _thread_iteration(thread)
+        after, through = self._iterations
+        return iteration is not None and after < iteration <= through
+
+    def response(self, comments: List[Dict[str, Any]]) -> CommentsResponse:
+        # One validation call builds every comment model inside pydantic-core,
+        # which is over twice as fast as `model_construct` per record (see
+        # the `*_build_s` timings in benchmarks/normalize.py).
+        return CommentsResponse.model_validate(
+            {
+                "pr": self._target.pull_request_id,
+                "repo": self._target.repository,
+                "activeThreads": len(self._active_thread_ids),
+                "comments": comments,
+                "cursor": self._cursor,
+                "removedThreadIds": self._removed_thread_ids,
+            }
+        )
+
+
+def _parse_since(since: str | None) -> datetime | None:
+    if not since:
+        return None
+    parsed = parse_timestamp(since)
+    if parsed is None:
+        raise MCPUserError("Invalid since cursor", status=400)
+    return parsed
+
+
+def _parse_updated_after(filters: CommentFilter | None) -> datetime | None:
+    if filters is None or not filters.updated_after:
+        return None
+    parsed = parse_timestamp(filters.updated_after)
+    if parsed is None:
+        raise MCPUserError("Invalid updatedAfter timestamp", status=400)
+    return parsed
+
+
+def _check_options(since: str | None, filters: CommentFilter | None) -> None:
+    _parse_since(since)
+    _parse_updated_after(filters)
+    _check_iterations(filters)
 
 
-def _normalize_thread_comments(thread: Dict[str, Any]) -> List[CommentModel]:
-    normalized: List[CommentModel] = []
-    thread_id = thread.get("id")
+def _check_iterations(filters: CommentFilter | None) -> None:
+    if filters is None:
+        return
+    iteration, base_iteration = filters.iteration, filters.base_iteration
+    if isinstance(iteration, int) and iteration < 1:
+        raise MCPUserError("iteration must be a positive number or latest", status=400)
+    if base_iteration is None:
+        return
+    if iteration is None:
+        raise MCPUserError("baseIteration requires iteration", status=400)
+    if base_iteration < 0:
+        raise MCPUserError("baseIteration must not be negative", status=400)
+    if isinstance(iteration, int):
+        _pin_iteration(filters, iteration)
+
+
+def _iteration_window(filters: CommentFilter | None) -> Tuple[int, int] | None:
+    # Threads opened after the base (by default the previous iteration) and
+    # up to `iteration` are kept.
+    if filters is None or not isinstance(filters.iteration, int):
+        return None
+    after = filters.base_iteration if filters.base_iteration is not None else filters.iteration - 1
+    return after, filters.iteration
+
+
+def _thread_iteration(thread: Dict[str, Any]) -> int | None:
+    """Return the iteration a thread was opened on, if it is tied to one."""
+
+    context = (thread.get("pullRequestThreadContext") or {}).get("iterationContext") or {}
+    iteration = context.get("secondComparingIteration")
+    return iteration if isinstance(iteration, int) else None
+
+
+def _normalize_thread_comments(
+    thread: Dict[str, Any],
+    since_at: datetime | None = None,
+    authors: set[str] | frozenset[str] = frozenset(),
+) -> List[Dict[str, Any]]:
+    """Return the thread's comments as alias-keyed `CommentModel` records.
+
+    Records are plain dicts in field order: NDJSON output writes them as-is
+    and `CommentsResponse` validates them in a single pass, which is much
+    cheaper than building one model per comment. `authors` holds lowercased
+    display names, unique names or ids to keep.
+    """
+
+    normalized: List[Dict[str, Any]] = []
+    thread_fields: Tuple[Any, ...] | None = None
 
     for comment in thread.get("comments", []):
         if comment.get("isDeleted"):
             continue
         if comment.get("commentType") == "system":
             continue
+        if since_at is not None:
+            comment_at = parse_timestamp(_extract_timestamp(comment))
+            if comment_at is not None and comment_at <= since_at:
+                continue
+        if authors and not _matches_author(comment, authors):
+            continue
 
         content = comment.get("content")
         if not content:
             continue
 
-        normalized.append(
-            CommentModel(
-                commentId=str(comment.get("id")),
-                threadId=int(thread_id) if thread_id is not None else -1,
-                commentText=content,
-                filePath=_extract_file_path(thread),
-                lineRange=_extract_line_range(thread),
-                authorDisplayName=_extract_author_name(comment),
-                authorId=_extract_author_id(comment),
-                timestamp=_extract_timestamp(comment),
-                status=thread.get("status") or "unknown",
-                isDeleted=False,
-                resolvedBy=_extract_resolved_by(thread),
-                externalId=None,
+        if thread_fields is None:
+            # Shared by every comment in the thread, so computed once.
+            thread_id = thread.get("id")
+            thread_fields = (
+                int(thread_id) if thread_id is not None else -1,
+                _extract_file_path(thread),
+                _extract_line_range(thread),
+                str(thread.get("status") or "unknown"),
+                _extract_resolved_by(thread),
             )
+        thread_id_value, file_path, line_range, status, resolved_by = thread_fields
+
+        normalized.append(
+            {
+                "commentId": str(comment.get("id")),
+                "threadId": thread_id_value,
+                "commentText": str(content),
+                "filePath": file_path,
+                "lineRange": line_range,
+                "authorDisplayName": _extract_author_name(comment),
+                "authorId": _extract_author_id(comment),
+                "timestamp": _extract_timestamp(comment),
+                "status": status,
+                "isDeleted": False,
+                "resolvedBy": resolved_by,
+                "externalId": None,
+                "codeContext": None,
+            }
         )
 
     return normalized
 
 
+def _compile_glob(pattern: str) -> Pattern[str]:
+    """Compile a path glob: `*`, `?` and `[...]` stay within one directory and `**` spans any number.
+
+    Patterns without a slash match the file name in any directory.
+    """
+
+    pattern = pattern.lstrip("/")
+    if "/" not in pattern:
+        pattern = f"**/{pattern}"
+    segments = pattern.split("/")
+    parts = []
+    for index, segment in enumerate(segments):
+        last = index == len(segments) - 1
+        if segment == "**":
+            parts.append(".*" if last else "(?:.*/)?")
+        else:
+            parts.append(_glob_segment(segment) + ("" if last else "/"))
+    return re.compile("".join(parts))
+
+
+def _glob_segment(segment: str) -> str:
+    parts = []
+    index = 0
+    while index < len(segment):
+        char = segment[index]
+        index += 1
+        if char == "*":
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[":
+            # A "]" right after "[" or "[!" is part of the set, as in fnmatch.
+            start = index + 1 if segment[index : index + 1] == "!" else index
+            end = segment.find("]", start + 1)
+            if end < 0:
+                parts.append(re.escape(char))
+                continue
+            body = segment[index:end].replace("\\", "\\\\")
+            index = end + 1
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            elif body.startswith("^"):
+                body = "\\" + body
+            parts.append(f"[{body}]")
+        else:
+            parts.append(re.escape(char))
+    return "".join(parts)
+
+
 def _extract_file_path(thread: Dict[str, Any]) -> str | None:
     thread_context = thread.get("threadContext") or {}
     file_path = thread_context.get("filePath")
@@ -132,6 +1075,14 @@ def _extract_line_range(thread: Dict[str, Any]) -> str | None:
     return f"{start_line}-{end_line}"
 
 
+def _matches_author(comment: Dict[str, Any], authors: set[str] | frozenset[str]) -> bool:
+    author = comment.get("author") or {}
+    return any(
+        isinstance(value, str) and value.lower() in authors
+        for value in (author.get("displayName"), author.get("uniqueName"), author.get("id"))
+    )
+
+
 def _extract_author_name(comment: Dict[str, Any]) -> str:
     author = comment.get("author") or {}
     name = author.get("displayName") or author.get("uniqueName") or "Unknown"
@@ -0,0 +1,119 @@
+"""Request coalescing for identical concurrent fetches."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+from .deadline import check_deadline, time_left
+from .errors import DeadlineExceededError
+from .models import CoalescingStats
+
+T = TypeVar("T")
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+def _abandoned(future: "asyncio.Future[Any]") -> bool:
+    return future.done() and (future.cancelled() or isinstance(future.exception(), DeadlineExceededError))
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; concurrent callers share its outcome.
+
+    Followers wait no longer than their own deadline. If the leader runs out
+    of its (shorter) deadline, they run the call again themselves.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._executed = 0
+        self._coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+                self._executed += 1
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            if not call.done.wait(time_left()):
+                check_deadline()
+            if isinstance(call.error, DeadlineExceededError):
+                return self.do(key, fn)
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> CoalescingStats:
+        with self._lock:
+            return CoalescingStats(executed=self._executed, coalesced=self._coalesced, inFlight=len(self._calls))
+
+
+class AsyncSingleFlight:
+    """Asyncio counterpart of `SingleFlight` for use within one event loop."""
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self._executed = 0
+        self._coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        future = self._calls.get(key)
+        if future is not None:
+            self._coalesced += 1
+            try:
+                # Shield so a cancelled follower does not cancel the shared call.
+                return await asyncio.shield(future)
+            except (asyncio.CancelledError, DeadlineExceededError):
+                # Only retry when the leader gave up (for example at its own
+                # deadline); cancellation of this caller propagates.
+                if not _abandoned(future):
+                    raise
+            return await self.do(key, fn)
+
+        future = asyncio.get_running_loop().create_future()
+        # Mark the outcome as retrieved even when no follower awaits it.
+        future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self._calls[key] = future
+        self._executed += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+    def stats(self) -> CoalescingStats:
+        return CoalescingStats(executed=self._executed, coalesced=self._coalesced, inFlight=len(self._calls))
@@ -0,0 +1,165 @@
+"""Code context for review threads: the file version a thread points at and the lines around it."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+# Longest snippet attached to one thread, context included.
+MAX_SNIPPET_LINES = 200
+
+# (commit id, path) of one file version.
+FileVersion = Tuple[str, str]
+
+
+@dataclass(frozen=True)
+class ThreadAnchor:
+    """Which side of which diff a thread's line numbers belong to.
+
+    `iteration` is the iteration the thread was opened on and
+    `base_iteration` the one it was compared with (0 for the target branch).
+    """
+
+    left: bool
+    iteration: Optional[int]
+    base_iteration: Optional[int]
+
+
+@dataclass(frozen=True)
+class IterationCommits:
+    """The pushed commit of an iteration and the merge base it was diffed against."""
+
+    source: Optional[str]
+    base: Optional[str]
+
+
+def thread_anchor(thread: Mapping[str, Any]) -> Optional[ThreadAnchor]:
+    """Return the anchor of a thread on a file position, or None for PR-level threads."""
+
+    context = thread.get("threadContext") or {}
+    if not isinstance(context.get("filePath"), str):
+        return None
+    if isinstance(context.get("rightFileStart"), dict):
+        left = False
+    elif isinstance(context.get("leftFileStart"), dict):
+        left = True
+    else:
+        return None
+    iterations = (thread.get("pullRequestThreadContext") or {}).get("iterationContext") or {}
+    return ThreadAnchor(
+        left=left,
+        iteration=_number(iterations.get("secondComparingIteration")),
+        base_iteration=_number(iterations.get("firstComparingIteration")),
+    )
+
+
+def iteration_commits(iterations: Iterable[Mapping[str, Any]]) -> Dict[int, IterationCommits]:
+    """Map iteration numbers to their commits, from raw iteration records."""
+
+    commits: Dict[int, IterationCommits] = {}
+    for iteration in iterations:
+        number = iteration.get("id")
+        if not isinstance(number, int):
+            continue
+        commits[number] = IterationCommits(
+            source=_commit_id(iteration.get("sourceRefCommit")),
+            base=_commit_id(iteration.get("commonRefCommit")) or _commit_id(iteration.get("targetRefCommit")),
+        )
+    return commits
+
+
+def anchor_commit(
+    anchor: ThreadAnchor,
+    commits: Mapping[int, IterationCommits],
+    *,
+    iteration: Optional[int] = None,
+    base_iteration: Optional[int] = None,
+) -> Optional[str]:
+    """Return the commit whose copy of the file the anchor's line numbers refer to.
+
+    Threads fetched with `iteration` are tracked to it, diffed against
+    `base_iteration`; others keep the iterations they were opened on.
+    Right-side lines belong to the iteration's source commit, left-side
+    lines to the compared iteration's, or to the merge base.
+    """
+
+    if iteration is None:
+        iteration, base_iteration = anchor.iteration, anchor.base_iteration
+    if iteration not in commits:
+        # Threads without iteration context refer to the newest iteration.
+        iteration, base_iteration = max(commits, default=None), None
+        if iteration is None:
+            return None
+    if not anchor.left:
+        return commits[iteration].source
+    if base_iteration and base_iteration in commits:
+        return commits[base_iteration].source
+    return commits[iteration].base
+
+
+def plan_files(
+    comments: Iterable[Mapping[str, Any]],
+    anchors: Mapping[int, ThreadAnchor],
+    commits: Mapping[int, IterationCommits],
+    *,
+    iteration: Optional[int] = None,
+    base_iteration: Optional[int] = None,
+) -> Dict[int, FileVersion]:
+    """Return the file version to read for each thread that has commented lines."""
+
+    files: Dict[int, FileVersion] = {}
+    for comment in comments:
+        thread_id = comment["threadId"]
+        anchor = anchors.get(thread_id)
+        if thread_id in files or anchor is None or not comment["filePath"] or not comment["lineRange"]:
+            continue
+        commit_id = anchor_commit(anchor, commits, iteration=iteration, base_iteration=base_iteration)
+        if commit_id:
+            files[thread_id] = (commit_id, comment["filePath"])
+    return files
+
+
+def attach_snippets(
+    comments: Iterable[Dict[str, Any]],
+    files: Mapping[int, FileVersion],
+    texts: Mapping[FileVersion, Optional[str]],
+    context_lines: int,
+) -> None:
+    """Set `codeContext` on comment records whose thread's file could be read."""
+
+    snippets: Dict[int, Optional[Dict[str, Any]]] = {}
+    for comment in comments:
+        thread_id = comment["threadId"]
+        if thread_id not in snippets:
+            version = files.get(thread_id)
+            text = texts.get(version) if version is not None else None
+            snippets[thread_id] = (
+                None if text is None else cut_snippet(text, version[0], comment["lineRange"], context_lines)
+            )
+        comment["codeContext"] = snippets[thread_id]
+
+
+def cut_snippet(text: str, commit_id: str, line_range: str, context_lines: int) -> Optional[Dict[str, Any]]:
+    """Return `line_range` ("12" or "12-15") of `text` with `context_lines` either side.
+
+    Ranges past the end of the file yield None; very long ranges are cut to
+    `MAX_SNIPPET_LINES`.
+    """
+
+    start, _, end = line_range.partition("-")
+    first, last = int(start), int(end or start)
+    lines: List[str] = text.replace("\r\n", "\n").split("\n")
+    if first > len(lines):
+        return None
+    low = max(1, first - context_lines)
+    high = min(len(lines), last + context_lines, low + MAX_SNIPPET_LINES - 1)
+    return {"commitId": commit_id, "startLine": low, "endLine": high, "text": "\n".join(lines[low - 1 : high])}
+
+
+def _commit_id(ref: Any) -> Optional[str]:
+    commit_id = ref.get("commitId") if isinstance(ref, dict) else None
+    return commit_id if isinstance(commit_id, str) and commit_id else None
+
+
+def _number(value: Any) -> Optional[int]:
+    return value if isinstance(value, int) else None
@@ -0,0 +1,53 @@
+"""Fast `--version` and `--health` paths that load no third-party packages."""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set
+
+from . import __version__
+
+_REQUIRED_SETTINGS = ("AZDO_ORG_URL", "AZDO_PAT")
+
+
+def health() -> Dict[str, object]:
+    """Report whether the required settings are present, without validating them."""
+
+    available = {name for name in _REQUIRED_SETTINGS if os.getenv(name)} | _dotenv_names(Path(".env"))
+    missing: List[str] = [name for name in _REQUIRED_SETTINGS if name not in available]
+    return {"status": "error" if missing else "ok", "version": __version__, "missing": missing}
+
+
+def run_fast_path(argv: Sequence[str]) -> Optional[int]:
+    """Handle `--version` or `--health` given as the only argument.
+
+    Returns the process exit code, or None when the full command line
+    interface has to be loaded.
+    """
+
+    if list(argv) == ["--version"]:
+        print(__version__)
+        return 0
+    if list(argv) == ["--health"]:
+        report = health()
+        print(json.dumps(report))
+        return 0 if report["status"] == "ok" else 1
+    return None
+
+
+def _dotenv_names(path: Path) -> Set[str]:
+    # A shallow read of `KEY=value` lines; values are parsed by python-dotenv
+    # when the configuration is actually loaded.
+    try:
+        lines = path.read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return set()
+    names = set()
+    for line in lines:
+        name, separator, value = line.strip().partition("=")
+        name = name.strip().removeprefix("export ").strip()
+        if separator and value.strip() and name and not name.startswith("#"):
+            names.add(name)
+    return names
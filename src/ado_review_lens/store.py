@@ -0,0 +1,234 @@
+"""SQLite-backed thread store shared across processes."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from .cache import CacheKey, ThreadCache
+from .models import MCPConfig
+from .timestamps import latest_timestamp, parse_timestamp
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS threads (
+    organization TEXT NOT NULL,
+    project TEXT NOT NULL,
+    repository TEXT NOT NULL,
+    pull_request_id TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    last_updated TEXT,
+    source_commit TEXT,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (organization, project, repository, pull_request_id)
+);
+CREATE INDEX IF NOT EXISTS threads_accessed_at ON threads (accessed_at);
+"""
+
+_KEY_CLAUSE = "organization = ? AND project = ? AND repository = ? AND pull_request_id = ?"
+
+# How long a writer waits for another process to release the database.
+_BUSY_TIMEOUT_MS = 5000
+
+
+@dataclass
+class StoredThreads:
+    """Thread payload loaded from disk, with the validators recorded for it."""
+
+    payload: Dict[str, Any]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    last_updated: Optional[str]
+    source_commit: Optional[str]
+    age: float
+
+
+class ThreadStore:
+    """Persistent store of raw thread payloads keyed like `ThreadCache`.
+
+    The database runs in WAL mode so CLI runs and API workers can read
+    concurrently while one of them writes. Each row records the newest
+    thread `lastUpdatedDate`, which keeps older downloads from replacing
+    newer ones, and, when known, the pull request probe signature (which
+    leads with the PR source commit), next to the HTTP validators. Once the
+    stored payloads exceed `max_bytes`, the least recently read rows are
+    evicted.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        max_bytes: int,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._path = Path(path).expanduser()
+        self._max_bytes = max_bytes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # Opened lazily and reopened after `close`, so a store can outlive
+        # the clients that use it.
+        if self._connection is None:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self._path, check_same_thread=False, isolation_level=None)
+            connection.execute(f"PRAGMA busy_timeout = {_BUSY_TIMEOUT_MS}")
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def load(self, key: CacheKey) -> Optional[StoredThreads]:
+        """Return the stored payload for `key`, marking it recently used."""
+
+        now = self._clock()
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT payload, etag, last_modified, last_updated, source_commit, stored_at "
+                f"FROM threads WHERE {_KEY_CLAUSE}",
+                key,
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute(f"UPDATE threads SET accessed_at = ? WHERE {_KEY_CLAUSE}", (now, *key))
+
+        payload, etag, last_modified, last_updated, source_commit, stored_at = row
+        return StoredThreads(
+            payload=json.loads(payload),
+            etag=etag,
+            last_modified=last_modified,
+            last_updated=last_updated,
+            source_commit=source_commit,
+            age=max(0.0, now - stored_at),
+        )
+
+    def save(
+        self,
+        key: CacheKey,
+        payload: Dict[str, Any],
+        *,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        source_commit: Optional[str] = None,
+    ) -> bool:
+        """Write `payload` for `key` and evict old rows beyond the size budget.
+
+        A payload whose newest thread update is older than the stored one's
+        is not written, so a slow process cannot replace threads another one
+        already refreshed. Returns False in that case only.
+        """
+
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        if self._max_bytes <= 0 or len(body) > self._max_bytes:
+            return True
+        last_updated = _last_updated(payload)
+        now = self._clock()
+        with self._lock:
+            connection = self._connect()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = connection.execute(f"SELECT last_updated FROM threads WHERE {_KEY_CLAUSE}", key).fetchone()
+                stored = parse_timestamp(row[0]) if row is not None else None
+                if stored is not None and (last_updated is None or parse_timestamp(last_updated) < stored):
+                    connection.execute("COMMIT")
+                    return False
+                connection.execute(
+                    "INSERT OR REPLACE INTO threads VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        *key,
+                        body,
+                        etag,
+                        last_modified,
+                        last_updated,
+                        source_commit,
+                        len(body),
+                        now,
+                        now,
+                    ),
+                )
+                self._evict(connection)
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        return True
+
+    def touch(self, key: CacheKey, *, source_commit: Optional[str] = None) -> None:
+        """Record that the server confirmed the stored payload is current."""
+
+        now = self._clock()
+        with self._lock:
+            self._connect().execute(
+                "UPDATE threads SET stored_at = ?, accessed_at = ?, source_commit = COALESCE(?, source_commit) "
+                f"WHERE {_KEY_CLAUSE}",
+                (now, now, source_commit, *key),
+            )
+
+    def expire(self, key: CacheKey) -> None:
+        """Mark the stored payload as stale so readers revalidate it."""
+
+        with self._lock:
+            self._connect().execute(
+                f"UPDATE threads SET stored_at = 0, source_commit = NULL WHERE {_KEY_CLAUSE}",
+                key,
+            )
+
+    def delete(self, key: CacheKey) -> None:
+        with self._lock:
+            self._connect().execute(f"DELETE FROM threads WHERE {_KEY_CLAUSE}", key)
+
+    def size(self) -> int:
+        """Return the total size in bytes of the stored payloads."""
+
+        with self._lock:
+            (total,) = self._connect().execute("SELECT COALESCE(SUM(size), 0) FROM threads").fetchone()
+        return total
+
+    def close(self) -> None:
+        with self._lock:
+            connection, self._connection = self._connection, None
+        if connection is not None:
+            connection.close()
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        (total,) = connection.execute("SELECT COALESCE(SUM(size), 0) FROM threads").fetchone()
+        if total <= self._max_bytes:
+            return
+        rows = connection.execute(
+            "SELECT organization, project, repository, pull_request_id, size FROM threads ORDER BY accessed_at"
+        )
+        victims = []
+        for *key, size in rows:
+            if total <= self._max_bytes:
+                break
+            victims.append(key)
+            total -= size
+        connection.executemany(f"DELETE FROM threads WHERE {_KEY_CLAUSE}", victims)
+
+
+def open_thread_cache(config: MCPConfig) -> ThreadCache:
+    """Build the thread cache described by `config`, backed by disk if configured."""
+
+    store = ThreadStore(config.store_path, max_bytes=config.store_max_bytes) if config.store_path else None
+    return ThreadCache(
+        ttl=config.cache_ttl_seconds,
+        max_entries=config.cache_max_entries,
+        store=store,
+        probe_max_age=config.probe_max_age_seconds,
+    )
+
+
+def _last_updated(payload: Dict[str, Any]) -> Optional[str]:
+    return latest_timestamp(thread.get("lastUpdatedDate") for thread in payload.get("value") or [])
@@ -0,0 +1,142 @@
+"""Thread-grouped output shape and size budgets for LLM clients."""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+from .errors import MCPUserError
+from .models import CommentsResponse, ThreadsResponse
+from .service import project_response
+from .timestamps import parse_timestamp
+
+# Rough size of one LLM token in UTF-8 JSON; close enough for budgeting
+# without depending on a tokenizer.
+BYTES_PER_TOKEN = 4
+
+_THREAD_FIELDS = ("threadId", "filePath", "lineRange", "status", "resolvedBy", "codeContext")
+_COMMENT_FIELDS = ("commentId", "commentText", "authorDisplayName", "authorId", "timestamp")
+_EPOCH = datetime.min.replace(tzinfo=timezone.utc)
+
+
+def render_response(
+    response: CommentsResponse,
+    *,
+    shape: str = "comments",
+    fields: Optional[Sequence[str]] = None,
+    max_bytes: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Dump `response` in the requested output shape.
+
+    `comments` is the flat `CommentsResponse`, optionally projected to
+    `fields`. `threads` groups comments under their thread and honours the
+    `max_bytes`/`max_tokens` budget.
+    """
+
+    limit = budget_bytes(max_bytes, max_tokens)
+    if shape == "comments":
+        if limit is not None:
+            raise MCPUserError("Budgets require the threads shape", status=400)
+        return project_response(response, fields)
+    if shape != "threads":
+        raise MCPUserError(f"Unknown output shape: {shape}", status=400)
+    if fields:
+        raise MCPUserError("Fields apply to the comments shape only", status=400)
+    return fit_budget(group_threads(response), limit).model_dump(by_alias=True)
+
+
+def group_threads(response: CommentsResponse) -> ThreadsResponse:
+    """Regroup a flat comment list so thread-level fields appear once per thread."""
+
+    threads: Dict[int, Dict[str, Any]] = {}
+    for comment in response.model_dump(by_alias=True)["comments"]:
+        thread = threads.get(comment["threadId"])
+        if thread is None:
+            thread = {name: comment[name] for name in _THREAD_FIELDS}
+            thread["comments"] = []
+            threads[comment["threadId"]] = thread
+        thread["comments"].append({name: comment[name] for name in _COMMENT_FIELDS})
+
+    return ThreadsResponse.model_validate(
+        {
+            "pr": response.pr,
+            "repo": response.repo,
+            "activeThreads": response.active_threads,
+            "threads": list(threads.values()),
+            "cursor": response.cursor,
+            "removedThreadIds": response.removed_thread_ids,
+        }
+    )
+
+
+def budget_bytes(max_bytes: Optional[int] = None, max_tokens: Optional[int] = None) -> Optional[int]:
+    """Return the tighter of the two budgets in bytes, or None when neither is set."""
+
+    token_bytes = None if max_tokens is None else max_tokens * BYTES_PER_TOKEN
+    limits = [limit for limit in (max_bytes, token_bytes) if limit is not None]
+    if any(limit <= 0 for limit in limits):
+        raise MCPUserError("Budgets must be positive", status=400)
+    return min(limits, default=None)
+
+
+def fit_budget(response: ThreadsResponse, limit: Optional[int]) -> ThreadsResponse:
+    """Trim `response` until its compact JSON fits in `limit` bytes.
+
+    Replies are dropped oldest first and counted in the thread's
+    `omittedComments`, so every thread keeps its opening comment and latest
+    discussion. If that is not enough, whole threads are dropped, least
+    recently active first, and listed in `omittedThreadIds`.
+    """
+
+    if limit is None:
+        return response
+    data = response.model_dump(by_alias=True)
+    size = _size(data)
+    if size <= limit:
+        return response
+
+    data["truncated"] = True
+    threads: List[Dict[str, Any]] = data["threads"]
+    activity = {thread["threadId"]: _last_activity(thread) for thread in threads}
+    dropped: set[int] = set()
+    for thread, reply in _oldest_replies(threads):
+        if size <= limit:
+            break
+        dropped.add(id(reply))
+        thread["omittedComments"] += 1
+        size -= _size(reply) + 1
+    for thread in threads:
+        thread["comments"] = [comment for comment in thread["comments"] if id(comment) not in dropped]
+
+    threads.sort(key=lambda thread: activity[thread["threadId"]], reverse=True)
+    while threads and size > limit:
+        thread = threads.pop()
+        data["omittedThreadIds"].append(thread["threadId"])
+        size += len(str(thread["threadId"])) + 1 - _size(thread) - 1
+    # The running size ignores a few bytes of counters; settle it exactly.
+    while threads and _size(data) > limit:
+        data["omittedThreadIds"].append(threads.pop()["threadId"])
+    # Keep the original thread order for the threads that survived.
+    order = {thread.thread_id: index for index, thread in enumerate(response.threads)}
+    threads.sort(key=lambda thread: order[thread["threadId"]])
+    return ThreadsResponse.model_validate(data)
+
+
+def _oldest_replies(threads: List[Dict[str, Any]]) -> List[tuple]:
+    replies = [(thread, reply) for thread in threads for reply in thread["comments"][1:]]
+    replies.sort(key=lambda item: _timestamp(item[1]))
+    return replies
+
+
+def _last_activity(thread: Dict[str, Any]) -> datetime:
+    return max((_timestamp(comment) for comment in thread["comments"]), default=_EPOCH)
+
+
+def _timestamp(comment: Dict[str, Any]) -> datetime:
+    return parse_timestamp(comment.get("timestamp")) or _EPOCH
+
+
+def _size(value: Any) -> int:
+    return len(json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
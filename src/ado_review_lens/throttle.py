@@ -0,0 +1,179 @@
+"""Retry and adaptive concurrency helpers for Azure DevOps rate limits."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Mapping, Optional
+
+from .deadline import check_deadline, time_left
+
+# Statuses worth retrying: throttling and transient gateway failures.
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+# Shrink the concurrency limit once less than this share of the quota remains.
+_LOW_QUOTA_RATIO = 0.2
+
+
+class RetryPolicy:
+    """Jittered exponential backoff that defers to server-provided delays."""
+
+    def __init__(
+        self,
+        *,
+        max_attempts: int = 4,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        rand: Callable[[], float] = random.random,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.max_attempts = max(1, max_attempts)
+        self._backoff_base = backoff_base
+        self._backoff_max = backoff_max
+        self._rand = rand
+        self._clock = clock
+
+    def delay(self, attempt: int, headers: Optional[Mapping[str, str]] = None) -> Optional[float]:
+        """Return seconds to wait before retry number `attempt + 1`, or None to give up.
+
+        `Retry-After` wins when present, then `X-RateLimit-Reset`; otherwise
+        the delay is drawn uniformly from an exponentially growing window.
+        A server-provided delay is never shortened: when it exceeds
+        `backoff_max` the request is not retried at all.
+        """
+
+        server_delay = self._server_delay(headers or {})
+        if server_delay is not None:
+            if server_delay > self._backoff_max:
+                return None
+            # A little jitter keeps many clients from retrying in lockstep.
+            return server_delay + self._rand() * self._backoff_base
+
+        window = min(self._backoff_max, self._backoff_base * (2**attempt))
+        return self._rand() * window
+
+    def _server_delay(self, headers: Mapping[str, str]) -> Optional[float]:
+        retry_after = headers.get("Retry-After")
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                pass
+            try:
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - self._clock())
+            except (TypeError, ValueError):
+                pass
+
+        reset = headers.get("X-RateLimit-Reset")
+        if reset:
+            try:
+                return max(0.0, float(reset) - self._clock())
+            except ValueError:
+                pass
+        return None
+
+
+class _AimdLimit:
+    """Additive-increase/multiplicative-decrease concurrency limit."""
+
+    def __init__(self, max_limit: int) -> None:
+        self.max_limit = max(1, max_limit)
+        self.limit = self.max_limit
+        self.in_flight = 0
+
+    def observe(self, status_code: int, headers: Mapping[str, str]) -> None:
+        if status_code in (429, 503):
+            self.limit = max(1, self.limit // 2)
+            return
+
+        remaining = _header_float(headers, "X-RateLimit-Remaining")
+        quota = _header_float(headers, "X-RateLimit-Limit")
+        if remaining is not None and quota:
+            if remaining / quota < _LOW_QUOTA_RATIO:
+                self.limit = max(1, self.limit // 2)
+                return
+        if headers.get("X-RateLimit-Delay"):
+            # Azure DevOps is already delaying our requests; hold steady.
+            return
+        if status_code < 400:
+            self.limit = min(self.max_limit, self.limit + 1)
+
+
+class AdaptiveLimiter:
+    """Thread-safe concurrency gate whose limit follows rate-limit feedback."""
+
+    def __init__(self, max_limit: int) -> None:
+        self._state = _AimdLimit(max_limit)
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return self._state.limit
+
+    def __enter__(self) -> "AdaptiveLimiter":
+        with self._condition:
+            while self._state.in_flight >= self._state.limit:
+                check_deadline()
+                self._condition.wait(time_left())
+            self._state.in_flight += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        with self._condition:
+            self._state.in_flight -= 1
+            self._condition.notify_all()
+
+    def observe(self, status_code: int, headers: Mapping[str, str]) -> None:
+        with self._condition:
+            self._state.observe(status_code, headers)
+            self._condition.notify_all()
+
+
+class AsyncAdaptiveLimiter:
+    """Asyncio counterpart of `AdaptiveLimiter`."""
+
+    def __init__(self, max_limit: int) -> None:
+        self._state = _AimdLimit(max_limit)
+        self._condition: Optional[asyncio.Condition] = None
+
+    @property
+    def limit(self) -> int:
+        return self._state.limit
+
+    def _get_condition(self) -> asyncio.Condition:
+        # Created lazily so the limiter can be built outside a running loop.
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def __aenter__(self) -> "AsyncAdaptiveLimiter":
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(lambda: self._state.in_flight < self._state.limit)
+            self._state.in_flight += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        condition = self._get_condition()
+        async with condition:
+            self._state.in_flight -= 1
+            condition.notify_all()
+
+    async def observe(self, status_code: int, headers: Mapping[str, str]) -> None:
+        condition = self._get_condition()
+        async with condition:
+            self._state.observe(status_code, headers)
+            condition.notify_all()
+
+
+def _header_float(headers: Mapping[str, str], name: str) -> Optional[float]:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
@@ -0,0 +1,36 @@
+"""Parsing of the ISO-8601 timestamps Azure DevOps puts on threads and comments."""
+
+from __future__ import annotations
+
+import re
+from datetime import datetime, timezone
+from typing import Any, Iterable, Optional
+
+_FRACTION_PATTERN = re.compile(r"\.\d+")
+
+
+def parse_timestamp(value: Any) -> datetime | None:
+    """Parse an Azure DevOps ISO-8601 timestamp into an aware datetime."""
+
+    if not isinstance(value, str) or not value:
+        return None
+    text = value.strip()
+    if text.endswith(("Z", "z")):
+        text = text[:-1] + "+00:00"
+    # Azure DevOps emits 1 to 7 fractional digits, trimming trailing zeros;
+    # Python 3.10 only parses exactly 3 or 6, so pad or cut to 6.
+    text = _FRACTION_PATTERN.sub(lambda match: "." + match.group(0)[1:7].ljust(6, "0"), text, count=1)
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def latest_timestamp(values: Iterable[Any]) -> Optional[str]:
+    """Return the latest of `values` as originally written, ignoring unparseable ones."""
+
+    stamps = [(parsed, value) for value in values if (parsed := parse_timestamp(value)) is not None]
+    return max(stamps, key=lambda stamp: stamp[0])[1] if stamps else None
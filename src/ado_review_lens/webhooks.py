@@ -0,0 +1,140 @@
+"""Apply Azure DevOps service-hook events to the thread cache."""
+
+from __future__ import annotations
+
+import hmac
+import re
+from typing import Any, Dict, List, Optional
+
+from .cache import cache_key, off_loop
+from .errors import MCPUserError
+from .models import MCPConfig, PullRequestTarget, WebhookResult
+from .resolver import _build_target
+from .runtime import Generation, LensRuntime
+from .timestamps import latest_timestamp
+
+COMMENT_EVENT = "ms.vss-code.git-pullrequest-comment-event"
+UPDATED_EVENT = "git.pullrequest.updated"
+
+_THREAD_LINK_PATTERN = re.compile(r"/threads/(?P<id>\d+)", re.IGNORECASE)
+_CLOSED_STATUSES = {"completed", "abandoned"}
+
+
+def verify_secret(config: MCPConfig, provided: Optional[str]) -> None:
+    """Check the shared secret sent with a service-hook request."""
+
+    if not config.webhook_secret:
+        raise MCPUserError("Webhooks are not enabled", status=404)
+    if not provided or not hmac.compare_digest(provided.encode("utf-8"), config.webhook_secret.encode("utf-8")):
+        raise MCPUserError("Invalid webhook secret", status=401)
+
+
+async def apply_event(event: Dict[str, Any], *, runtime: LensRuntime) -> WebhookResult:
+    """Bring the cached threads of the PR named in `event` up to date.
+
+    Comment events patch the comment into its cached thread, or fetch that
+    single thread when it is not cached yet. PR updates mark the entry for
+    revalidation, and completed or abandoned PRs are dropped. PRs that are
+    not cached are left alone; their first read downloads them as usual.
+    """
+
+    with runtime.lease() as active:
+        return await _apply_event(event, active)
+
+
+async def _apply_event(event: Dict[str, Any], active: Generation) -> WebhookResult:
+    event_type = event.get("eventType")
+    resource = event.get("resource") or {}
+    if event_type == COMMENT_EVENT:
+        pull_request = resource.get("pullRequest") or {}
+    elif event_type == UPDATED_EVENT:
+        pull_request = resource
+    else:
+        return WebhookResult(action="ignored")
+
+    target = _event_target(active.config(), pull_request)
+    key = cache_key(target)
+    cache = active.cache()
+    result = WebhookResult(action="ignored", pr=target.pull_request_id)
+
+    if event_type == UPDATED_EVENT:
+        if (pull_request.get("status") or "").lower() in _CLOSED_STATUSES:
+            await off_loop(cache, cache.invalidate, key)
+            result.action = "invalidated"
+        else:
+            # A push may move or outdate threads; let the ETag decide.
+            await off_loop(cache, cache.expire, key)
+            result.action = "expired"
+        return result
+
+    comment = resource.get("comment") or {}
+    thread_id = _thread_id(comment)
+    if thread_id is None:
+        return result
+    result.thread_id = thread_id
+
+    if await off_loop(cache, cache.update, key, lambda payload: _patch_comment(payload, thread_id, comment)):
+        result.action = "patched"
+        return result
+    if key not in cache:
+        return result
+
+    thread = await active.async_client().get_thread(target, thread_id)
+    if await off_loop(cache, cache.update, key, lambda payload: _upsert_thread(payload, thread)):
+        result.action = "fetched"
+    return result
+
+
+def _event_target(config: MCPConfig, pull_request: Dict[str, Any]) -> PullRequestTarget:
+    repository = pull_request.get("repository") or {}
+    project = (repository.get("project") or {}).get("name")
+    pull_request_id = pull_request.get("pullRequestId")
+    if not project or not repository.get("name") or pull_request_id is None:
+        raise MCPUserError("Event does not identify a pull request", status=400)
+    # The cache is shared across projects, so every project's events apply.
+    return _build_target(
+        config=config,
+        project=project,
+        repository=repository["name"],
+        pull_request_id=int(pull_request_id),
+        allow_cross_project=True,
+    )
+
+
+def _thread_id(comment: Dict[str, Any]) -> Optional[int]:
+    links = comment.get("_links") or {}
+    for name in ("threads", "self"):
+        href = (links.get(name) or {}).get("href") or ""
+        match = _THREAD_LINK_PATTERN.search(href)
+        if match:
+            return int(match.group("id"))
+    return None
+
+
+def _patch_comment(payload: Dict[str, Any], thread_id: int, comment: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    threads: List[Dict[str, Any]] = list(payload.get("value") or [])
+    for index, thread in enumerate(threads):
+        if thread.get("id") != thread_id:
+            continue
+        comments = [existing for existing in thread.get("comments") or [] if existing.get("id") != comment.get("id")]
+        comments.append(_without_links(comment))
+        comments.sort(key=lambda item: item.get("id") or 0)
+        updated = comment.get("lastUpdatedDate") or comment.get("publishedDate")
+        threads[index] = {
+            **thread,
+            "comments": comments,
+            "lastUpdatedDate": latest_timestamp([thread.get("lastUpdatedDate"), updated]),
+        }
+        return {**payload, "value": threads}
+    return None
+
+
+def _upsert_thread(payload: Dict[str, Any], thread: Dict[str, Any]) -> Dict[str, Any]:
+    threads = [existing for existing in payload.get("value") or [] if existing.get("id") != thread.get("id")]
+    threads.append(thread)
+    return {**payload, "count": len(threads), "value": threads}
+
+
+def _without_links(comment: Dict[str, Any]) -> Dict[str, Any]:
+    # Event comments carry `_links`, which thread listings do not.
+    return {name: value for name, value in comment.items() if name != "_links"}
@@ -0,0 +1,197 @@
+"""Tests for the in-memory thread cache."""
+
+import asyncio
+
+import httpx
+
+from ado_review_lens.azure import AsyncAzureDevOpsClient
+from ado_review_lens.cache import BlobCache, ThreadCache, blob_key
+from ado_review_lens.models import MCPConfig, PullRequestTarget
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _target(pr: int = 1) -> PullRequestTarget:
+    return PullRequestTarget(organization="example", project="team", repository="repo", pullRequestId=pr)
+
+
+def test_cache_ttl_and_lru_eviction() -> None:
+    clock = _Clock()
+    cache = ThreadCache(ttl=10, max_entries=2, clock=clock)
+
+    cache.store(("a",), {"value": []})
+    cache.store(("b",), {"value": []})
+    assert cache.lookup(("a",))[1] is True
+
+    cache.store(("c",), {"value": []})
+    assert cache.lookup(("b",)) == (None, False)
+
+    clock.now = 11
+    entry, fresh = cache.lookup(("a",))
+    assert entry is not None and fresh is False
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions, stats.size) == (1, 3, 1, 2)
+
+
+def test_update_refreshes_the_ttl() -> None:
+    clock = _Clock()
+    cache = ThreadCache(ttl=10, max_entries=2, clock=clock)
+    cache.store(("a",), {"value": []})
+
+    clock.now = 8
+    assert cache.update(("a",), lambda payload: {"value": [{"id": 1}]})
+    clock.now = 15
+    entry, fresh = cache.lookup(("a",))
+    assert entry is not None and fresh is True and entry.payload == {"value": [{"id": 1}]}
+
+    clock.now = 18
+    assert cache.lookup(("a",))[1] is False
+    assert not cache.update(("b",), lambda payload: payload)
+
+
+def test_blob_cache_shares_contents_by_object_id() -> None:
+    cache = BlobCache(max_bytes=10)
+    first, second, other = (blob_key(_target(), commit, "/a.py") for commit in ("c1", "c2", "c3"))
+
+    assert cache.lookup(first) == (False, None)
+    cache.store(first, "obj-1", "12345")
+    cache.store(second, "obj-1", "12345")
+    cache.store(blob_key(_target(), "c1", "/logo.png"), None, None)
+    assert cache.stats().bytes == 5
+    assert cache.lookup(second) == (True, "12345")
+    assert cache.lookup(blob_key(_target(), "c1", "/logo.png")) == (True, None)
+
+    cache.store(other, "obj-2", "abcdefgh")
+    assert cache.lookup(other) == (True, "abcdefgh")
+    # Evicted contents turn the paths that pointed at them back into misses.
+    assert cache.lookup(first) == (False, None)
+    assert cache.stats().evictions == 1
+
+
+def test_client_revalidates_stale_entry_with_etag() -> None:
+    clock = _Clock()
+    cache = ThreadCache(ttl=5, max_entries=8, clock=clock)
+    seen_headers = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen_headers.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json={"value": [{"id": 1}]}, headers={"ETag": '"v1"'})
+
+    config = MCPConfig(organization_url="https://dev.azure.com/example", personal_access_token="token")
+
+    async def run():
+        async with AsyncAzureDevOpsClient(config, cache=cache, transport=httpx.MockTransport(handler)) as client:
+            first = await client.list_threads(_target())
+            cached = await client.list_threads(_target())
+            clock.now = 6
+            revalidated = await client.list_threads(_target())
+            return first, cached, revalidated
+
+    first, cached, revalidated = asyncio.run(run())
+
+    assert first == cached == revalidated == {"value": [{"id": 1}]}
+    assert seen_headers == [None, '"v1"']
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.revalidations) == (1, 1, 1)
+
+
+def test_probe_skips_thread_download_while_pull_request_is_unchanged() -> None:
+    clock = _Clock()
+    cache = ThreadCache(ttl=5, max_entries=8, clock=clock, probe_max_age=60)
+    pull_request = {"pullRequestId": 1, "lastMergeSourceCommit": {"commitId": "abc"}, "reviewers": []}
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path.endswith("/pullrequests"):
+            seen.append("list")
+            return httpx.Response(200, json={"value": [pull_request]})
+        if path.endswith("/threads"):
+            seen.append("threads")
+            return httpx.Response(200, json={"value": [{"id": len(seen)}]})
+        seen.append("probe")
+        return httpx.Response(200, json=pull_request)
+
+    config = MCPConfig(organization_url="https://dev.azure.com/example", personal_access_token="token")
+
+    async def run():
+        async with AsyncAzureDevOpsClient(config, cache=cache, transport=httpx.MockTransport(handler)) as client:
+            await client.list_threads(_target())
+            clock.now = 10
+            await client.list_threads(_target())
+            clock.now = 20
+            await client.list_threads(_target())
+            pull_request["reviewers"] = [{"id": "user-1", "vote": 10}]
+            clock.now = 30
+            await client.list_threads(_target())
+            clock.now = 40
+            await client.list_pull_requests("team", "repo")
+            await client.list_threads(_target())
+            clock.now = 100
+            await client.list_threads(_target())
+
+    asyncio.run(run())
+
+    # A cold miss is not probed; the first probe records the signature, an
+    # unchanged one renews the entry, and a new vote or an old download
+    # forces a fetch. A fresh listing stands in for the probe.
+    assert seen == ["threads", "probe", "threads", "probe", "probe", "threads", "list", "probe", "threads"]
+    assert cache.stats().probe_hits == 2
+
+
+def test_listed_signature_is_not_reused_after_a_fresh_hit() -> None:
+    clock = _Clock()
+    cache = ThreadCache(ttl=5, max_entries=8, clock=clock, probe_max_age=60)
+    pull_request = {"pullRequestId": 1, "lastMergeSourceCommit": {"commitId": "c1"}, "reviewers": []}
+    threads = [{"id": 1}]
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path.endswith("/pullrequests"):
+            seen.append("list")
+            return httpx.Response(200, json={"value": [pull_request]})
+        if path.endswith("/threads"):
+            seen.append("threads")
+            return httpx.Response(200, json={"value": list(threads)})
+        seen.append("probe")
+        return httpx.Response(200, json=pull_request)
+
+    config = MCPConfig(organization_url="https://dev.azure.com/example", personal_access_token="token")
+
+    async def run():
+        async with AsyncAzureDevOpsClient(config, cache=cache, transport=httpx.MockTransport(handler)) as client:
+            await client.list_pull_requests("team", "repo")
+            await client.list_threads(_target())
+            clock.now = 1
+            await client.list_pull_requests("team", "repo")
+            await client.list_threads(_target())
+            pull_request["lastMergeSourceCommit"] = {"commitId": "c2"}
+            threads.append({"id": 2})
+            clock.now = 8
+            return await client.list_threads(_target())
+
+    payload = asyncio.run(run())
+
+    assert payload == {"value": [{"id": 1}, {"id": 2}]}
+    assert seen == ["list", "threads", "list", "probe", "threads"]
+
+
+def test_listed_signatures_expire() -> None:
+    clock = _Clock()
+    cache = ThreadCache(ttl=5, max_entries=8, clock=clock, probe_max_age=60)
+
+    cache.remember_listed({("a",): "sig-a", ("b",): "sig-b"})
+    assert cache.take_listed(("a",)) == "sig-a"
+    assert cache.take_listed(("a",)) is None
+    clock.now = 60
+    assert cache.take_listed(("b",)) is None
@@ -0,0 +1,83 @@
+"""Tests for recording and replaying Azure DevOps traffic."""
+
+import asyncio
+import gzip
+from pathlib import Path
+
+import httpx
+import pytest
+
+from ado_review_lens.azure import AsyncAzureDevOpsClient, AzureDevOpsClient
+from ado_review_lens.cassette import Cassette
+from ado_review_lens.config import load_config
+from ado_review_lens.errors import MCPUserError, MissingConfigurationError
+from ado_review_lens.models import MCPConfig, PullRequestTarget
+
+_THREADS = {"value": [{"id": 1, "status": "active", "comments": [{"id": 1, "content": "Recorded"}]}]}
+
+_TARGET = PullRequestTarget(organization="example", project="team", repository="repo", pullRequestId=7)
+
+
+def _config(path: Path, mode: str) -> MCPConfig:
+    return MCPConfig(
+        organization_url="https://dev.azure.com/example",
+        personal_access_token="secret-token" if mode == "record" else "",
+        cassette_path=str(path),
+        cassette_mode=mode,
+        cache_max_entries=0,
+    )
+
+
+def test_async_client_records_then_replays_offline(tmp_path: Path) -> None:
+    cassette = tmp_path / "prs.jsonl.gz"
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=_THREADS, headers={"ETag": '"v1"'})
+
+    async def record():
+        async with AsyncAzureDevOpsClient(_config(cassette, "record"), transport=httpx.MockTransport(handler)) as client:
+            return await client.list_threads(_TARGET)
+
+    async def replay():
+        async with AsyncAzureDevOpsClient(_config(cassette, "replay")) as client:
+            payload = await client.list_threads(_TARGET)
+            with pytest.raises(MCPUserError, match="No recorded response"):
+                await client.list_threads(_TARGET.model_copy(update={"pull_request_id": 8}))
+            return payload
+
+    assert asyncio.run(record()) == _THREADS
+    recorded = gzip.decompress(cassette.read_bytes()).decode()
+    assert "secret-token" not in recorded and "Authorization" not in recorded
+
+    assert asyncio.run(replay()) == _THREADS
+
+
+def test_sync_client_replays_with_conditional_requests(tmp_path: Path) -> None:
+    path = tmp_path / "prs.jsonl.gz"
+    url = "https://dev.azure.com/example/team/_apis/git/repositories/repo/pullRequests/7/threads?api-version=7.1"
+    Cassette(path).record("GET", url, 200, {"ETag": '"v1"', "Content-Type": "application/json"}, b'{"value": []}')
+    Cassette(path).record("GET", url, 200, {"ETag": '"v2"'}, b'{"value": [{"id": 1}]}')
+
+    cassette = Cassette(path)
+    assert len(cassette) == 1
+    assert cassette.respond("GET", url, {"If-None-Match": '"v2"'}).status == 304
+
+    with AzureDevOpsClient(_config(path, "replay").model_copy(update={"stream_threads": True})) as client:
+        assert client.list_threads(_TARGET) == {"value": [{"id": 1}]}
+        assert list(client.iter_threads(_TARGET)) == [{"id": 1}]
+
+
+def test_replay_mode_needs_no_token(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("AZDO_ORG_URL", "https://dev.azure.com/example")
+    monkeypatch.delenv("AZDO_PAT", raising=False)
+    monkeypatch.setenv("AZDO_CASSETTE", str(tmp_path / "prs.jsonl.gz"))
+    monkeypatch.setenv("AZDO_REPLAY_LATENCY_MS", "25")
+
+    config = load_config()
+
+    assert (config.cassette_mode, config.replay_latency, config.personal_access_token) == ("replay", 0.025, "")
+
+    monkeypatch.setenv("AZDO_CASSETTE_MODE", "record")
+    with pytest.raises(MissingConfigurationError, match="AZDO_PAT is required"):
+        load_config()
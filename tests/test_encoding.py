@@ -0,0 +1,42 @@
+"""Tests for JSON encoding and response compression."""
+
+import asyncio
+import gzip
+import json
+
+from ado_review_lens import encoding
+from ado_review_lens.models import CommentsResponse
+
+
+def test_dumps_matches_standard_json() -> None:
+    value = {"commentText": "naïve", "lineRange": None, "ids": [1, 2]}
+    response = CommentsResponse(pr=7, repo="repo")
+
+    assert json.loads(encoding.dumps(value)) == value
+    assert json.loads(encoding.dumps(value, indent=True)) == value
+    assert json.loads(encoding.dumps(response)) == response.model_dump(by_alias=True)
+    assert b"\n" not in encoding.dumps(response) and b"\n" in encoding.dumps(response, indent=True)
+
+
+def test_negotiate_honours_quality_values(monkeypatch) -> None:
+    monkeypatch.setattr(encoding, "brotli", None)
+
+    assert encoding.negotiate("gzip, deflate, br") == "gzip"
+    assert encoding.negotiate("gzip;q=0, identity") is None
+    assert encoding.negotiate("*") == "gzip"
+    assert encoding.negotiate(None) is None
+
+
+def test_gzip_stream_flushes_each_chunk() -> None:
+    async def chunks():
+        for index in range(3):
+            yield f'{{"line":{index}}}\n'.encode()
+
+    async def collect():
+        return [part async for part in encoding.compress_stream(chunks(), "gzip")]
+
+    parts = asyncio.run(collect())
+
+    assert len(parts) == 4
+    assert gzip.decompress(b"".join(parts)).decode().splitlines() == ['{"line":0}', '{"line":1}', '{"line":2}']
+    assert gzip.decompress(encoding.compress(b"body", "gzip")) == b"body"
@@ -0,0 +1,32 @@
+"""Tests for incremental parsing of Azure DevOps list payloads."""
+
+import json
+
+import pytest
+
+from ado_review_lens.jsonstream import ArrayItemParser
+
+
+def test_parser_yields_items_across_arbitrary_chunks() -> None:
+    document = {
+        "count": 12345,
+        "value": [{"id": index, "text": "é \"quoted\" ]}" * index, "flags": [True, None, 1.5]} for index in range(20)],
+        "continuation": {"token": [1, 2]},
+    }
+    raw = json.dumps(document).encode("utf-8")
+
+    for size in (1, 7, 64, len(raw)):
+        parser = ArrayItemParser()
+        items = []
+        for start in range(0, len(raw), size):
+            items.extend(parser.feed(raw[start : start + size]))
+        items.extend(parser.close())
+        assert items == document["value"]
+
+
+def test_parser_rejects_truncated_body() -> None:
+    parser = ArrayItemParser()
+    parser.feed(b'{"value": [{"id": 1}, {"id"')
+
+    with pytest.raises(ValueError):
+        parser.close()
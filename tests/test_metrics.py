@@ -0,0 +1,116 @@
+"""Tests for stage timings and the Prometheus exposition."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from ado_review_lens import metrics
+from ado_review_lens.errors import AzureDevOpsRequestError, MCPUserError
+from ado_review_lens.models import CacheStats, CoalescingStats, MCPConfig, RuntimeStats
+from ado_review_lens.runtime import LensRuntime
+from ado_review_lens.service import fetch_comments_async, stream_comments_async
+
+_THREADS = {
+    "value": [
+        {"id": 1, "status": "active", "comments": [{"id": 1, "content": "Fix", "publishedDate": "2024-01-01T00:00:00Z"}]}
+    ]
+}
+
+
+def test_histogram_renders_cumulative_buckets() -> None:
+    histogram = metrics.Histogram("test_seconds", "Test.", [0.1, 1.0], ["stage"])
+    histogram.observe(0.05, "a")
+    histogram.observe(0.5, "a")
+    histogram.observe(5.0, "a")
+
+    assert histogram.samples() == [
+        'ado_review_lens_test_seconds_bucket{stage="a",le="0.1"} 1',
+        'ado_review_lens_test_seconds_bucket{stage="a",le="1"} 2',
+        'ado_review_lens_test_seconds_bucket{stage="a",le="+Inf"} 3',
+        'ado_review_lens_test_seconds_sum{stage="a"} 5.55',
+        'ado_review_lens_test_seconds_count{stage="a"} 3',
+    ]
+
+
+def test_fetch_records_stages_and_counters() -> None:
+    config = MCPConfig(
+        organization_url="https://dev.azure.com/example",
+        personal_access_token="token",
+        default_project="team",
+        default_repository="repo",
+    )
+    responses = {7: httpx.Response(200, json=_THREADS), 8: httpx.Response(404)}
+
+    async def run():
+        def handler(request: httpx.Request) -> httpx.Response:
+            return responses[int(request.url.path.split("/")[-2])]
+
+        runtime = LensRuntime(config, transport=httpx.MockTransport(handler))
+        try:
+            with metrics.collect_timings() as timings:
+                await fetch_comments_async(pr_id=7, runtime=runtime)
+            with pytest.raises(MCPUserError):
+                await fetch_comments_async(pr_id=8, runtime=runtime)
+            return timings, runtime.stats()
+        finally:
+            await runtime.aclose()
+
+    errors_before = metrics.ERRORS.value("404")
+    comments_before = metrics.COMMENTS_PER_PR.count()
+    timings, stats = asyncio.run(run())
+
+    assert set(timings) == {"config", "resolve", "fetch", "decode", "normalize"}
+    assert metrics.ERRORS.value("404") == errors_before + 1
+    assert metrics.COMMENTS_PER_PR.count() == comments_before + 1
+    assert "total" in metrics.format_timings(timings)
+
+    text = metrics.render(stats)
+    assert "# TYPE ado_review_lens_stage_seconds histogram" in text
+    assert 'ado_review_lens_upstream_requests_total{status="200"}' in text
+    assert "ado_review_lens_cache_entries 1" in text
+
+
+def test_streams_record_bytes_timings_and_late_errors() -> None:
+    config = MCPConfig(
+        organization_url="https://dev.azure.com/example",
+        personal_access_token="token",
+        default_project="team",
+        default_repository="repo",
+        stream_threads=True,
+    )
+    body = json.dumps(_THREADS).encode("utf-8")
+    # The second response is cut off after its first thread.
+    bodies = {7: body, 8: body[:-2]}
+
+    async def run():
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, content=bodies[int(request.url.path.split("/")[-2])])
+
+        runtime = LensRuntime(config, transport=httpx.MockTransport(handler))
+        try:
+            with metrics.collect_timings() as timings:
+                records = [record async for record in await stream_comments_async(pr_id=7, runtime=runtime)]
+            with pytest.raises(AzureDevOpsRequestError):
+                async for _ in await stream_comments_async(pr_id=8, runtime=runtime):
+                    pass
+            return timings, records
+        finally:
+            await runtime.aclose()
+
+    errors_before = metrics.ERRORS.value("502")
+    payloads_before = metrics.PAYLOAD_BYTES.count()
+    timings, records = asyncio.run(run())
+
+    assert len(records) == 2
+    assert {"fetch", "decode", "normalize"} <= set(timings)
+    assert metrics.PAYLOAD_BYTES.count() == payloads_before + 2
+    assert metrics.ERRORS.value("502") == errors_before + 1
+
+
+def test_render_without_runtime_stats() -> None:
+    stats = RuntimeStats(cache=CacheStats(), coalescing=CoalescingStats())
+
+    assert "ado_review_lens_cache_entries" not in metrics.render()
+    assert "ado_review_lens_cache_entries 0" in metrics.render(stats)
@@ -0,0 +1,51 @@
+"""Tests for the MCP server entry point and tool concurrency cap."""
+
+import asyncio
+
+import pytest
+
+from ado_review_lens import server
+
+
+def test_limited_tools_wait_for_a_free_slot(monkeypatch: pytest.MonkeyPatch) -> None:
+    running = peak = 0
+
+    async def tool(value: int) -> int:
+        """Echo `value`."""
+
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return value
+
+    limited = server._limited(tool)
+
+    async def run():
+        monkeypatch.setattr(server, "_tool_slots", asyncio.Semaphore(2))
+        return await asyncio.gather(*(limited(value) for value in range(6)))
+
+    assert asyncio.run(run()) == list(range(6))
+    assert peak == 2
+    assert limited.__name__ == "tool" and limited.__doc__ == "Echo `value`."
+
+
+def test_transport_options_default_from_environment(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("AZDO_MCP_TRANSPORT", "streamable-http")
+    monkeypatch.setenv("AZDO_MCP_PORT", "9000")
+
+    args = server._parse_args([])
+    assert (args.transport, args.host, args.port, args.max_concurrency) == ("streamable-http", "127.0.0.1", 9000, 32)
+    assert server._parse_args(["--transport", "sse", "--max-concurrency", "0"]).transport == "sse"
+    with pytest.raises(SystemExit):
+        server._parse_args(["--transport", "websocket"])
+
+
+@pytest.mark.parametrize(("transport", "offered"), [("stdio", True), ("sse", False), ("streamable-http", False)])
+def test_reload_tool_is_only_offered_over_stdio(monkeypatch: pytest.MonkeyPatch, transport: str, offered: bool) -> None:
+    monkeypatch.setattr(server, "_mcp", None)
+
+    tools = {tool.name for tool in asyncio.run(server._server(transport).list_tools())}
+    assert "fetch_pr_comments" in tools
+    assert ("reload_config" in tools) is offered
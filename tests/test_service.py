@@ -0,0 +1,492 @@
+"""Tests for the comment fetching service layer."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from ado_review_lens.errors import DeadlineExceededError, MCPUserError
+from ado_review_lens.models import CommentFilter, CommentModel, FetchRequest, MCPConfig
+from ado_review_lens.runtime import LensRuntime
+from ado_review_lens.service import (
+    fetch_comments_async,
+    fetch_comments_batch_async,
+    project_response,
+    scan_repository_async,
+    stream_comments_async,
+)
+
+_THREADS = {
+    "value": [
+        {
+            "id": 1,
+            "status": "active",
+            "threadContext": {"filePath": "/src/app.py", "rightFileStart": {"line": 3}, "rightFileEnd": {"line": 5}},
+            "comments": [
+                {
+                    "id": 10,
+                    "content": "Please rename this",
+                    "author": {"displayName": "Reviewer", "id": "user-1"},
+                    "publishedDate": "2024-01-01T00:00:00Z",
+                },
+                {"id": 11, "content": "Policy update", "commentType": "system"},
+            ],
+        },
+        {"id": 2, "status": "fixed", "comments": [{"id": 20, "content": "Done"}]},
+        {"id": 3, "isDeleted": True, "comments": [{"id": 30, "content": "Gone"}]},
+    ]
+}
+
+
+@pytest.fixture
+def config(monkeypatch: pytest.MonkeyPatch) -> MCPConfig:
+    monkeypatch.setenv("AZDO_ORG_URL", "https://dev.azure.com/example")
+    monkeypatch.setenv("AZDO_PAT", "token")
+    monkeypatch.setenv("AZDO_PROJECT", "team")
+    monkeypatch.setenv("AZDO_REPO", "repo")
+    return MCPConfig(
+        organization_url="https://dev.azure.com/example",
+        personal_access_token="token",
+        default_project="team",
+        default_repository="repo",
+    )
+
+
+def _runtime(config: MCPConfig, status: int = 200) -> LensRuntime:
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/example/team/_apis/git/repositories/repo/pullRequests/7/threads"
+        return httpx.Response(status, json=_THREADS)
+
+    return LensRuntime(config, transport=httpx.MockTransport(handler))
+
+
+def test_fetch_comments_async_normalizes_active_threads(config: MCPConfig) -> None:
+    async def run():
+        runtime = _runtime(config)
+        try:
+            return await fetch_comments_async(pr_id=7, runtime=runtime)
+        finally:
+            await runtime.aclose()
+
+    response = asyncio.run(run())
+
+    assert response.pr == 7
+    assert response.active_threads == 1
+    assert [comment.comment_id for comment in response.comments] == ["10"]
+    assert response.comments[0].file_path == "/src/app.py"
+    assert response.comments[0].line_range == "3-5"
+
+
+def test_fetch_comments_async_maps_not_found(config: MCPConfig) -> None:
+    async def run():
+        runtime = _runtime(config, status=404)
+        try:
+            return await fetch_comments_async(pr_id=7, runtime=runtime)
+        finally:
+            await runtime.aclose()
+
+    with pytest.raises(MCPUserError) as exc:
+        asyncio.run(run())
+
+    assert exc.value.status == 404
+
+
+def test_runtime_reuses_client_until_config_changes(config: MCPConfig, monkeypatch: pytest.MonkeyPatch) -> None:
+    async def run():
+        runtime = LensRuntime(config)
+        first = runtime.async_client()
+        assert runtime.async_client() is first
+
+        await runtime.reload()
+        assert runtime.async_client() is first
+
+        monkeypatch.setenv("AZDO_REPO", "other")
+        reloaded = await runtime.reload()
+        assert reloaded.default_repository == "other"
+        assert runtime.async_client() is not first
+        await runtime.aclose()
+
+    asyncio.run(run())
+
+
+def test_reload_keeps_env_precedence_and_drains_leased_clients(
+    config: MCPConfig, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr("ado_review_lens.config._dotenv_values", {})
+    monkeypatch.setattr("dotenv.dotenv_values", lambda path: {"AZDO_REPO": "dotenv-repo", "AZDO_PROJECT": "dotenv-team"})
+    monkeypatch.delenv("AZDO_PROJECT")
+
+    async def run():
+        runtime = LensRuntime(config)
+        with runtime.lease() as active:
+            first = active.async_client()
+            reload = asyncio.ensure_future(runtime.reload())
+            await asyncio.sleep(0.05)
+            # New calls get new clients while the leased ones stay open.
+            assert not reload.done()
+            assert runtime.async_client() is not first
+            assert not first._client.is_closed
+        reloaded = await reload
+        assert first._client.is_closed
+        await runtime.aclose()
+        return reloaded
+
+    reloaded = asyncio.run(run())
+
+    # The real environment still wins over .env; .env only fills gaps.
+    assert (reloaded.default_project, reloaded.default_repository) == ("dotenv-team", "repo")
+
+
+def test_fetch_comments_batch_reports_per_pr_errors(config: MCPConfig) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if "/pullRequests/404/" in request.url.path:
+            return httpx.Response(404)
+        return httpx.Response(200, json=_THREADS)
+
+    async def run():
+        runtime = LensRuntime(config, transport=httpx.MockTransport(handler))
+        try:
+            return await fetch_comments_batch_async(
+                [FetchRequest(prId=7), FetchRequest(prId=404), FetchRequest(prUrl="https://example.com/bad")],
+                runtime=runtime,
+                max_concurrency=2,
+            )
+        finally:
+            await runtime.aclose()
+
+    batch = asyncio.run(run())
+
+    assert (batch.succeeded, batch.failed) == (1, 2)
+    assert batch.results[0].result is not None and batch.results[0].result.pr == 7
+    assert batch.results[1].error is not None and batch.results[1].error.status == 404
+    assert batch.results[2].error is not None and batch.results[2].error.error == "Invalid PR URL"
+
+
+def test_batch_reports_non_json_responses_per_pr(config: MCPConfig) -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if "/pullRequests/7/" in request.url.path:
+            # What Azure DevOps serves for a rejected token.
+            return httpx.Response(203, text="<html>Sign in</html>")
+        if "/pullRequests/9/" in request.url.path:
+            return httpx.Response(200, text="<html>Gateway</html>")
+        return httpx.Response(200, json=_THREADS)
+
+    async def run():
+        runtime = LensRuntime(config, transport=httpx.MockTransport(handler))
+        try:
+            return await fetch_comments_batch_async(
+                [FetchRequest(prId=7), FetchRequest(prId=8), FetchRequest(prId=9)], runtime=runtime
+            )
+        finally:
+            await runtime.aclose()
+
+    batch = asyncio.run(run())
+
+    assert (batch.succeeded, batch.failed) == (1, 2)
+    assert [item.error.status if item.error else None for item in batch.results] == [401, None, 502]
+    assert batch.results[1].result is not None and batch.results[1].result.pr == 8
+
+
+def test_deadline_keeps_finished_prs_and_lists_the_rest(config: MCPConfig) -> None:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if "/pullRequests/9/" in request.url.path:
+            await asyncio.sleep(1)
+        return httpx.Response(200, json=_THREADS)
+
+    async def run():
+        runtime = LensRuntime(config, transport=httpx.MockTransport(handler))
+        try:
+            batch = await fetch_comments_batch_async(
+                [FetchRequest(prId=7), FetchRequest(prId=9)],
+                runtime=runtime,
+                deadline=0.2,
+            )
+            with pytest.raises(DeadlineExceededError):
+                await fetch_comments_async(pr_id=9, runtime=runtime, deadline=0.05)
+            return batch
+        finally:
+            await runtime.aclose()
+
+    batch = asyncio.run(run())
+
+    assert (batch.succeeded, batch.failed) == (1, 1)
+    assert batch.results[0].result is not None and batch.results[0].result.pr == 7
+    assert batch.results[1].error is not None and batch.results[1].error.status == 504
+    assert batch.timed_out == [9]
+
+
+def test_scan_repository_fetches_every_active_pr(config: MCPConfig) -> None:
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.url.path)
+        if request.url.path.endswith("/pullrequests"):
+            assert request.url.params["searchCriteria.status"] == "active"
+            return httpx.Response(200, json={"value": [{"pullRequestId": 9}, {"pullRequestId": 7}, {"pullRequestId": 8}]})
+        if "/pullRequests/8/" in request.url.path:
+            return httpx.Response(404)
+        return httpx.Response(200, json=_THREADS)
+
+    async def run():
+        runtime = LensRuntime(config, transport=httpx.MockTransport(handler))
+        try:
+            return await scan_repository_async(runtime=runtime, max_concurrency=2)
+        finally:
+            await runtime.aclose()
+
+    scan = asyncio.run(run())
+
+    assert [item.pr for item in scan.results] == [7, 8, 9]
+    assert (scan.succeeded, scan.failed) == (2, 1)
+    assert scan.results[1].error is not None and scan.results[1].error.status == 404
+    assert seen[0] == "/example/team/_apis/git/repositories/repo/pullrequests"
+
+
+def test_scan_repository_enforces_cross_project_rules(config: MCPConfig) -> None:
+    with pytest.raises(MCPUserError, match="Cross-project access not allowed"):
+        asyncio.run(scan_repository_async(repo="other", runtime=LensRuntime(config)))
+
+
+def test_fetch_comments_since_returns_only_changes(config: MCPConfig) -> None:
+    payload = {
+        "value": [
+            {
+                "id": 1,
+                "status": "active",
+                "lastUpdatedDate": "2024-01-02T00:00:00.1234567Z",
+                "comments": [
+                    {"id": 10, "content": "Old", "lastUpdatedDate": "2024-01-01T00:00:00Z"},
+                    {"id": 11, "content": "New", "lastUpdatedDate": "2024-01-02T00:00:00.1234567Z"},
+                ],
+            },
+            {"id": 2, "status": "fixed", "lastUpdatedDate": "2024-01-01T12:00:00Z", "comments": []},
+            {"id": 3, "status": "active", "lastUpdatedDate": "2023-12-01T00:00:00Z", "comments": [{"id": 30, "content": "Stale"}]},
+        ]
+    }
+
+    async def run(since):
+        runtime = LensRuntime(config, transport=httpx.MockTransport(lambda request: httpx.Response(200, json=payload)))
+        try:
+            return await fetch_comments_async(pr_id=7, since=since, runtime=runtime)
+        finally:
+            await runtime.aclose()
+
+    delta = asyncio.run(run("2024-01-01T06:00:00Z"))
+
+    assert [comment.comment_id for comment in delta.comments] == ["11"]
+    assert delta.removed_thread_ids == [2]
+    assert delta.cursor == "2024-01-02T00:00:00.1234567Z"
+
+    unchanged = asyncio.run(run(delta.cursor))
+    assert unchanged.comments == [] and unchanged.removed_thread_ids == []
+    assert unchanged.cursor == delta.cursor
+
+    with pytest.raises(MCPUserError):
+        asyncio.run(run("yesterday"))
+
+
+def test_filters_skip_threads_and_comments(config: MCPConfig) -> None:
+    async def run(filters):
+        runtime = _runtime(config)
+        try:
+            return await fetch_comments_async(pr_id=7, filters=filters, runtime=runtime)
+        finally:
+            await runtime.aclose()
+
+    def ids(filters):
+        return [comment.comment_id for comment in asyncio.run(run(filters)).comments]
+
+    assert ids(CommentFilter(files=["src/*.py"])) == ["10"]
+    assert ids(CommentFilter(files=["docs/**"])) == []
+    assert ids(CommentFilter(files=["src/**/*.py", "*.md"])) == ["10"]
+    assert ids(CommentFilter(files=["*.py"])) == ["10"]
+    assert ids(CommentFilter(files=["*/*/*.py"])) == []
+    assert ids(CommentFilter(authors=["USER-1"])) == ["10"]
+    assert ids(CommentFilter(authors=["someone"])) == []
+    assert ids(CommentFilter(updatedAfter="2024-01-01T00:00:00Z")) == []
+    assert ids(CommentFilter(includeResolved=True)) == ["10", "20"]
+
+    with pytest.raises(MCPUserError, match="Invalid updatedAfter"):
+        asyncio.run(run(CommentFilter(updatedAfter="last week")))
+
+
+def test_iteration_scoped_fetch(config: MCPConfig) -> None:
+    def thread(thread_id: int, iteration: int) -> dict:
+        return {
+            "id": thread_id,
+            "status": "active",
+            "pullRequestThreadContext": {"iterationContext": {"secondComparingIteration": iteration}},
+            "comments": [{"id": thread_id * 10, "content": f"On iteration {iteration}"}],
+        }
+
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/iterations"):
+            return httpx.Response(200, json={"value": [{"id": 1}, {"id": 2}, {"id": 3}]})
+        seen.append((request.url.params.get("$iteration"), request.url.params.get("$baseIteration")))
+        threads = [thread(1, 1), thread(2, 2), thread(3, 3), {"id": 4, "comments": []}]
+        return httpx.Response(200, json={"value": threads})
+
+    async def run(filters):
+        runtime = LensRuntime(config, transport=httpx.MockTransport(handler))
+        try:
+            response = await fetch_comments_async(pr_id=7, filters=filters, runtime=runtime)
+            return [comment.thread_id for comment in response.comments]
+        finally:
+            await runtime.aclose()
+
+    assert asyncio.run(run(CommentFilter(iteration="latest"))) == [3]
+    assert asyncio.run(run(CommentFilter(iteration=2))) == [2]
+    assert asyncio.run(run(CommentFilter(iteration="latest", baseIteration=1))) == [2, 3]
+    assert seen == [("3", None), ("2", None), ("3", "1")]
+
+    with pytest.raises(MCPUserError, match="baseIteration must be lower"):
+        asyncio.run(run(CommentFilter(iteration="latest", baseIteration=3)))
+    with pytest.raises(MCPUserError, match="baseIteration requires iteration"):
+        asyncio.run(run(CommentFilter(baseIteration=1)))
+
+
+def test_context_lines_read_each_file_version_once(config: MCPConfig) -> None:
+    source = "\n".join(f"line {number}" for number in range(1, 11))
+
+    def thread(thread_id: int, context: dict | None) -> dict:
+        return {
+            "id": thread_id,
+            "status": "active",
+            "threadContext": context,
+            "pullRequestThreadContext": {
+                "iterationContext": {"firstComparingIteration": 0, "secondComparingIteration": 2}
+            },
+            "comments": [{"id": thread_id * 10, "content": "Look here"}],
+        }
+
+    threads = [
+        thread(1, {"filePath": "/src/app.py", "rightFileStart": {"line": 3}, "rightFileEnd": {"line": 5}}),
+        thread(2, {"filePath": "/src/app.py", "rightFileStart": {"line": 9}, "rightFileEnd": {"line": 9}}),
+        thread(3, {"filePath": "/src/old.py", "leftFileStart": {"line": 1}, "leftFileEnd": {"line": 1}}),
+        thread(4, None),
+    ]
+    iterations = [
+        {"id": 1, "sourceRefCommit": {"commitId": "c1"}, "commonRefCommit": {"commitId": "base"}},
+        {"id": 2, "sourceRefCommit": {"commitId": "c2"}, "commonRefCommit": {"commitId": "base"}},
+    ]
+    reads = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path.endswith("/iterations"):
+            return httpx.Response(200, json={"value": iterations})
+        if path.endswith("/items"):
+            params = request.url.params
+            reads.append((params["versionDescriptor.version"], params["path"]))
+            return httpx.Response(200, json={"objectId": f"blob-{params['path']}", "content": source})
+        return httpx.Response(200, json={"value": threads})
+
+    async def run():
+        runtime = LensRuntime(config, transport=httpx.MockTransport(handler))
+        try:
+            batch = await fetch_comments_batch_async(
+                [FetchRequest(prId=7, contextLines=1), FetchRequest(prId=8, contextLines=1)],
+                runtime=runtime,
+            )
+            return batch, runtime.stats()
+        finally:
+            await runtime.aclose()
+
+    batch, stats = asyncio.run(run())
+
+    assert batch.succeeded == 2
+    assert sorted(reads) == [("base", "/src/old.py"), ("c2", "/src/app.py")]
+    assert stats.blobs.size == 2
+    for item in batch.results:
+        contexts = {comment.thread_id: comment.code_context for comment in item.result.comments}
+        assert (contexts[1].commit_id, contexts[1].start_line, contexts[1].end_line) == ("c2", 2, 6)
+        assert contexts[1].text == "line 2\nline 3\nline 4\nline 5\nline 6"
+        assert (contexts[2].start_line, contexts[2].end_line) == (8, 10)
+        assert (contexts[3].commit_id, contexts[3].start_line, contexts[3].end_line) == ("base", 1, 2)
+        assert contexts[4] is None
+
+
+def test_field_projection(config: MCPConfig) -> None:
+    async def run():
+        runtime = _runtime(config)
+        try:
+            response = await fetch_comments_async(pr_id=7, runtime=runtime)
+            records = [
+                record
+                async for record in await stream_comments_async(pr_id=7, fields=["filePath", "commentText"], runtime=runtime)
+            ]
+            return response, records
+        finally:
+            await runtime.aclose()
+
+    response, records = asyncio.run(run())
+
+    projected = project_response(response, ["commentText", "lineRange"])
+    assert projected["comments"] == [{"commentText": "Please rename this", "lineRange": "3-5"}]
+    assert projected["activeThreads"] == 1
+    assert records[0] == {"filePath": "/src/app.py", "commentText": "Please rename this"}
+    assert "summary" in records[-1]
+
+    with pytest.raises(MCPUserError, match="Unknown comment fields: body"):
+        project_response(response, ["body"])
+
+
+def test_stream_comments_yields_comments_then_summary(config: MCPConfig) -> None:
+    async def run():
+        runtime = _runtime(config)
+        try:
+            return [record async for record in await stream_comments_async(pr_id=7, runtime=runtime)]
+        finally:
+            await runtime.aclose()
+
+    records = asyncio.run(run())
+
+    assert [record.get("commentId") for record in records[:-1]] == ["10"]
+    assert records[-1] == {
+        "summary": {"pr": 7, "repo": "repo", "activeThreads": 1, "cursor": None, "removedThreadIds": []}
+    }
+
+
+def test_stream_threads_option_parses_incrementally(config: MCPConfig) -> None:
+    streaming_config = config.model_copy(update={"stream_threads": True})
+
+    async def run():
+        runtime = _runtime(streaming_config)
+        try:
+            return await fetch_comments_async(pr_id=7, runtime=runtime)
+        finally:
+            await runtime.aclose()
+
+    response = asyncio.run(run())
+
+    assert response.active_threads == 1
+    assert [comment.comment_id for comment in response.comments] == ["10"]
+
+
+def test_normalized_records_match_validated_models(config: MCPConfig) -> None:
+    async def run():
+        runtime = _runtime(config)
+        try:
+            return await fetch_comments_async(pr_id=7, runtime=runtime)
+        finally:
+            await runtime.aclose()
+
+    response = asyncio.run(run())
+    expected = CommentModel(
+        commentId="10",
+        threadId=1,
+        commentText="Please rename this",
+        filePath="/src/app.py",
+        lineRange="3-5",
+        authorDisplayName="Reviewer",
+        authorId="user-1",
+        timestamp="2024-01-01T00:00:00Z",
+        status="active",
+        isDeleted=False,
+    )
+
+    assert response.comments == [expected]
+    assert json.loads(response.model_dump_json(by_alias=True)) == response.model_dump(by_alias=True)
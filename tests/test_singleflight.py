@@ -0,0 +1,66 @@
+"""Tests for coalescing of identical concurrent fetches."""
+
+import asyncio
+import threading
+
+import httpx
+
+from ado_review_lens.models import MCPConfig
+from ado_review_lens.runtime import LensRuntime
+from ado_review_lens.service import fetch_comments_async
+from ado_review_lens.singleflight import SingleFlight
+
+
+def test_concurrent_async_fetches_share_one_request(monkeypatch) -> None:
+    monkeypatch.setenv("AZDO_ORG_URL", "https://dev.azure.com/example")
+    monkeypatch.setenv("AZDO_PAT", "token")
+    config = MCPConfig(
+        organization_url="https://dev.azure.com/example",
+        personal_access_token="token",
+        default_project="team",
+        default_repository="repo",
+    )
+    upstream_calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        upstream_calls.append(request.url.path)
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"value": []})
+
+    async def run():
+        runtime = LensRuntime(config, transport=httpx.MockTransport(handler))
+        try:
+            responses = await asyncio.gather(*(fetch_comments_async(pr_id=7, runtime=runtime) for _ in range(5)))
+            return responses, runtime.stats()
+        finally:
+            await runtime.aclose()
+
+    responses, stats = asyncio.run(run())
+
+    assert len(upstream_calls) == 1
+    assert all(response is responses[0] for response in responses)
+    assert (stats.coalescing.executed, stats.coalescing.coalesced) == (1, 4)
+
+
+def test_sync_single_flight_shares_result() -> None:
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def slow() -> int:
+        calls.append(1)
+        release.wait(timeout=5)
+        return 42
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flights.do("pr", slow))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    while flights.stats().coalesced < 2:
+        pass
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == [42, 42, 42]
+    assert len(calls) == 1
@@ -0,0 +1,50 @@
+"""Tests that entry points defer heavy imports."""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+from ado_review_lens import __version__
+from ado_review_lens.startup import run_fast_path
+
+_HEAVY = ("mcp", "fastapi", "pydantic", "httpx", "requests", "typer", "dotenv")
+
+
+def _loaded_after(code: str) -> set:
+    probe = f"import sys\n{code}\nprint(__import__('json').dumps(sorted(sys.modules)))"
+    completed = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True)
+    modules = json.loads(completed.stdout.splitlines()[-1])
+    return {name for name in _HEAVY if name in modules}
+
+
+def test_server_import_loads_no_heavy_dependencies() -> None:
+    assert _loaded_after("import ado_review_lens.server") == set()
+
+
+def test_version_path_loads_no_heavy_dependencies() -> None:
+    code = "from ado_review_lens.startup import run_fast_path\nrun_fast_path(['--version'])"
+    assert _loaded_after(code) == set()
+
+
+def test_cli_import_defers_service_layer() -> None:
+    assert _loaded_after("import ado_review_lens.cli") == {"typer"}
+
+
+def test_fast_path_reports_version_and_health(
+    capsys: pytest.CaptureFixture[str], monkeypatch: pytest.MonkeyPatch, tmp_path
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("AZDO_ORG_URL", raising=False)
+    monkeypatch.setenv("AZDO_PAT", "token")
+
+    assert run_fast_path(["--version"]) == 0
+    assert capsys.readouterr().out.strip() == __version__
+
+    assert run_fast_path(["--health"]) == 1
+    assert json.loads(capsys.readouterr().out)["missing"] == ["AZDO_ORG_URL"]
+
+    (tmp_path / ".env").write_text("AZDO_ORG_URL=https://dev.azure.com/example\n", encoding="utf-8")
+    assert run_fast_path(["--health"]) == 0
+    assert run_fast_path(["--pr", "1"]) is None
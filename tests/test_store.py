@@ -0,0 +1,169 @@
+"""Tests for the persistent SQLite thread store."""
+
+import asyncio
+import threading
+from pathlib import Path
+
+import httpx
+
+from ado_review_lens.azure import AsyncAzureDevOpsClient
+from ado_review_lens.cache import ThreadCache
+from ado_review_lens.models import MCPConfig, PullRequestTarget
+from ado_review_lens.store import ThreadStore
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _payload(thread_count: int) -> dict:
+    return {
+        "value": [
+            {"id": index, "lastUpdatedDate": f"2024-01-0{index + 1}T00:00:00Z", "comments": []}
+            for index in range(thread_count)
+        ]
+    }
+
+
+def test_store_round_trip_and_size_eviction(tmp_path: Path) -> None:
+    clock = _Clock()
+    store = ThreadStore(tmp_path / "threads.db", max_bytes=400, clock=clock)
+
+    store.save(("org", "team", "repo", "1"), _payload(2), etag='"v1"')
+    clock.now += 5
+    loaded = store.load(("org", "team", "repo", "1"))
+
+    assert loaded is not None
+    assert loaded.payload == _payload(2)
+    assert (loaded.etag, loaded.last_updated, loaded.age) == ('"v1"', "2024-01-02T00:00:00Z", 5.0)
+
+    clock.now += 1
+    store.save(("org", "team", "repo", "2"), _payload(2))
+    clock.now += 1
+    store.load(("org", "team", "repo", "1"))
+    clock.now += 1
+    store.save(("org", "team", "repo", "3"), _payload(2))
+
+    # PR 2 was least recently read, so it went first once the budget was exceeded.
+    assert store.load(("org", "team", "repo", "2")) is None
+    assert store.load(("org", "team", "repo", "1")) is not None
+    assert store.size() <= 400
+    store.close()
+
+
+def test_older_threads_do_not_replace_newer_ones(tmp_path: Path) -> None:
+    key = ("org", "team", "repo", "1")
+    newer = ThreadCache(ttl=60, max_entries=8, store=ThreadStore(tmp_path / "threads.db", max_bytes=4096))
+    older = ThreadCache(ttl=60, max_entries=8, store=ThreadStore(tmp_path / "threads.db", max_bytes=4096))
+
+    newer.store(key, _payload(3))
+    # A slower process finishes a download that started before the newest update.
+    older.store(key, _payload(2))
+
+    assert key not in older
+    entry, _ = older.lookup(key)
+    assert entry is not None and entry.payload == _payload(3)
+    assert older.stats().store_hits == 1
+
+
+def test_update_patches_and_refreshes_threads_only_held_by_the_store(tmp_path: Path) -> None:
+    key = ("org", "team", "repo", "1")
+    clock = _Clock()
+
+    def open_cache() -> ThreadCache:
+        store = ThreadStore(tmp_path / "threads.db", max_bytes=4096, clock=clock)
+        return ThreadCache(ttl=60, max_entries=8, clock=clock, store=store)
+
+    open_cache().store(key, _payload(1))
+
+    clock.now += 50
+    # A restarted process has nothing in memory yet.
+    cache = open_cache()
+    assert cache.update(key, lambda payload: _payload(2))
+
+    clock.now += 50
+    entry, fresh = cache.lookup(key)
+    assert entry is not None and fresh is True and entry.payload == _payload(2)
+    stored = ThreadStore(tmp_path / "threads.db", max_bytes=4096, clock=clock).load(key)
+    assert stored is not None and stored.payload == _payload(2) and stored.age == 50
+
+
+def test_thread_updates_are_ordered_by_time_not_text(tmp_path: Path) -> None:
+    key = ("org", "team", "repo", "1")
+    store = ThreadStore(tmp_path / "threads.db", max_bytes=4096)
+    # "11:00:00+01:00" sorts last as text but is the earliest of the three.
+    payload = {
+        "value": [
+            {"id": 1, "lastUpdatedDate": "2024-01-01T10:00:31Z"},
+            {"id": 2, "lastUpdatedDate": "2024-01-01T10:00:30.5Z"},
+            {"id": 3, "lastUpdatedDate": "2024-01-01T11:00:00+01:00"},
+        ]
+    }
+    store.save(key, payload)
+    loaded = store.load(key)
+    assert loaded is not None and loaded.last_updated == "2024-01-01T10:00:31Z"
+
+    # A textually larger but earlier timestamp must not replace the stored threads.
+    assert not store.save(key, {"value": [{"id": 1, "lastUpdatedDate": "2024-01-01T10:59:00+01:00"}]})
+
+
+def test_clients_share_threads_through_the_store(tmp_path: Path) -> None:
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.path)
+        return httpx.Response(200, json=_payload(1), headers={"ETag": '"v1"'})
+
+    config = MCPConfig(
+        organization_url="https://dev.azure.com/example",
+        personal_access_token="token",
+        store_path=str(tmp_path / "threads.db"),
+    )
+    target = PullRequestTarget(organization="example", project="team", repository="repo", pullRequestId=1)
+
+    async def fetch():
+        # Each client opens its own store connection, as separate processes would.
+        async with AsyncAzureDevOpsClient(config, transport=httpx.MockTransport(handler)) as client:
+            payload = await client.list_threads(target)
+            return payload, client._cache.stats()
+
+    first, _ = asyncio.run(fetch())
+    second, stats = asyncio.run(fetch())
+
+    assert first == second == _payload(1)
+    assert len(requests) == 1
+    assert (stats.store_hits, stats.hits, stats.misses) == (1, 1, 0)
+
+
+def test_async_client_reads_and_writes_the_store_off_the_event_loop(tmp_path: Path) -> None:
+    threads = []
+
+    class RecordingStore(ThreadStore):
+        def load(self, key):
+            threads.append(threading.get_ident())
+            return super().load(key)
+
+        def save(self, key, payload, **validators):
+            threads.append(threading.get_ident())
+            return super().save(key, payload, **validators)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=_payload(1), headers={"ETag": '"v1"'})
+
+    config = MCPConfig(organization_url="https://dev.azure.com/example", personal_access_token="token")
+    cache = ThreadCache(ttl=60, max_entries=8, store=RecordingStore(tmp_path / "threads.db", max_bytes=4096))
+    target = PullRequestTarget(organization="example", project="team", repository="repo", pullRequestId=1)
+
+    async def fetch() -> int:
+        async with AsyncAzureDevOpsClient(config, transport=httpx.MockTransport(handler), cache=cache) as client:
+            await client.list_threads(target)
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(fetch())
+
+    assert threads
+    assert loop_thread not in threads
@@ -0,0 +1,75 @@
+"""Tests for the thread-grouped output shape and its size budget."""
+
+import json
+
+import pytest
+
+from ado_review_lens.errors import MCPUserError
+from ado_review_lens.models import CommentsResponse
+from ado_review_lens.threads import fit_budget, group_threads, render_response
+
+
+def _comment(thread_id: int, comment_id: int, day: int, text: str = "text") -> dict:
+    return {
+        "commentId": str(comment_id),
+        "threadId": thread_id,
+        "commentText": text,
+        "filePath": f"/src/file{thread_id}.py",
+        "lineRange": "10-12",
+        "authorDisplayName": "Reviewer",
+        "authorId": "user-1",
+        "timestamp": f"2024-01-{day:02d}T00:00:00Z",
+        "status": "active",
+        "isDeleted": False,
+        "resolvedBy": None,
+        "externalId": None,
+    }
+
+
+def _response() -> CommentsResponse:
+    comments = [_comment(1, 1, 1), _comment(1, 2, 2), _comment(1, 3, 5)]
+    comments += [_comment(2, 1, 3), _comment(2, 2, 4)]
+    return CommentsResponse.model_validate(
+        {"pr": 7, "repo": "repo", "activeThreads": 2, "comments": comments, "cursor": "2024-01-05T00:00:00Z"}
+    )
+
+
+def test_group_threads_states_thread_fields_once() -> None:
+    response = _response()
+    grouped = group_threads(response)
+
+    assert [thread.thread_id for thread in grouped.threads] == [1, 2]
+    assert [comment.comment_id for comment in grouped.threads[0].comments] == ["1", "2", "3"]
+    assert grouped.threads[0].file_path == "/src/file1.py"
+    assert grouped.cursor == response.cursor
+    assert len(grouped.model_dump_json(by_alias=True)) < len(response.model_dump_json(by_alias=True))
+
+
+def test_budget_drops_oldest_replies_then_stale_threads() -> None:
+    grouped = group_threads(_response())
+    full = len(json.dumps(grouped.model_dump(by_alias=True), separators=(",", ":")))
+    reply = len(json.dumps(grouped.threads[0].comments[1].model_dump(by_alias=True), separators=(",", ":")))
+
+    assert fit_budget(grouped, full) is grouped
+
+    trimmed = fit_budget(grouped, full - reply)
+    assert trimmed.truncated
+    # The oldest reply (thread 1, day 2) goes first; openers and newest replies stay.
+    assert [comment.comment_id for comment in trimmed.threads[0].comments] == ["1", "3"]
+    assert trimmed.threads[0].omitted_comments == 1
+    assert len(trimmed.threads[1].comments) == 2
+
+    tight = fit_budget(grouped, 450)
+    assert len(tight.model_dump_json(by_alias=True)) <= 450
+    assert [thread.thread_id for thread in tight.threads] == [1]
+    assert tight.omitted_thread_ids == [2]
+
+
+def test_render_response_validates_shape_options() -> None:
+    response = _response()
+
+    assert render_response(response, shape="threads", max_tokens=1000)["truncated"] is False
+    with pytest.raises(MCPUserError, match="Budgets require the threads shape"):
+        render_response(response, max_bytes=100)
+    with pytest.raises(MCPUserError, match="Fields apply to the comments shape only"):
+        render_response(response, shape="threads", fields=["commentText"])
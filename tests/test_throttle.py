@@ -0,0 +1,81 @@
+"""Tests for retry backoff and adaptive concurrency."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from ado_review_lens.azure import AsyncAzureDevOpsClient
+from ado_review_lens.errors import AzureDevOpsRequestError
+from ado_review_lens.models import MCPConfig, PullRequestTarget
+from ado_review_lens.throttle import AdaptiveLimiter, RetryPolicy
+
+
+def test_retry_delay_prefers_server_headers() -> None:
+    policy = RetryPolicy(backoff_base=1.0, backoff_max=60.0, rand=lambda: 0.5, clock=lambda: 1000.0)
+
+    assert policy.delay(0, {"Retry-After": "7"}) == 7.5
+    assert policy.delay(0, {"X-RateLimit-Reset": "1010"}) == 10.5
+    assert policy.delay(3, {}) == 4.0
+    assert policy.delay(10, {}) == 30.0
+    # Server delays are honoured in full, or not retried at all.
+    assert RetryPolicy(rand=lambda: 0).delay(0, {"Retry-After": "25"}) == 25.0
+    assert RetryPolicy(rand=lambda: 0).delay(0, {"Retry-After": "120"}) is None
+
+
+def test_limiter_backs_off_as_quota_falls() -> None:
+    limiter = AdaptiveLimiter(8)
+
+    limiter.observe(200, {"X-RateLimit-Remaining": "50", "X-RateLimit-Limit": "100"})
+    assert limiter.limit == 8
+
+    limiter.observe(200, {"X-RateLimit-Remaining": "10", "X-RateLimit-Limit": "100"})
+    assert limiter.limit == 4
+
+    limiter.observe(429, {})
+    assert limiter.limit == 2
+
+    limiter.observe(200, {})
+    assert limiter.limit == 3
+
+
+def test_client_retries_throttled_requests() -> None:
+    responses = [
+        httpx.Response(429, headers={"Retry-After": "0"}),
+        httpx.Response(503),
+        httpx.Response(200, json={"value": []}),
+    ]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return responses.pop(0)
+
+    config = MCPConfig(organization_url="https://dev.azure.com/example", personal_access_token="token")
+    target = PullRequestTarget(organization="example", project="team", repository="repo", pullRequestId=1)
+
+    async def run():
+        async with AsyncAzureDevOpsClient(config, transport=httpx.MockTransport(handler)) as client:
+            client._retry = RetryPolicy(rand=lambda: 0.0)
+            return await client.list_threads(target)
+
+    assert asyncio.run(run()) == {"value": []}
+    assert responses == []
+
+
+def test_client_gives_up_rather_than_retrying_before_retry_after() -> None:
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.path)
+        return httpx.Response(429, headers={"Retry-After": "120"})
+
+    config = MCPConfig(organization_url="https://dev.azure.com/example", personal_access_token="token")
+    target = PullRequestTarget(organization="example", project="team", repository="repo", pullRequestId=1)
+
+    async def run():
+        async with AsyncAzureDevOpsClient(config, transport=httpx.MockTransport(handler)) as client:
+            return await client.list_threads(target)
+
+    with pytest.raises(AzureDevOpsRequestError) as raised:
+        asyncio.run(run())
+    assert raised.value.status == 429
+    assert len(requests) == 1
@@ -0,0 +1,28 @@
+"""Tests for Azure DevOps timestamp parsing."""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from ado_review_lens.timestamps import parse_timestamp
+
+
+@pytest.mark.parametrize(
+    ("value", "microsecond"),
+    [
+        ("2024-05-01T10:20:30Z", 0),
+        ("2024-05-01T10:20:30.5+00:00", 500000),
+        ("2024-05-01T10:20:30.12Z", 120000),
+        ("2024-05-01T10:20:30.1234Z", 123400),
+        ("2024-05-01T10:20:30.12345Z", 123450),
+        ("2024-05-01T10:20:30.1234567Z", 123456),
+    ],
+)
+def test_parse_timestamp_accepts_any_fraction_length(value: str, microsecond: int) -> None:
+    assert parse_timestamp(value) == datetime(2024, 5, 1, 10, 20, 30, microsecond, tzinfo=timezone.utc)
+
+
+def test_parse_timestamp_rejects_other_values() -> None:
+    assert parse_timestamp("yesterday") is None
+    assert parse_timestamp("") is None
+    assert parse_timestamp(None) is None
@@ -0,0 +1,104 @@
+"""Tests for applying service-hook events to the thread cache."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from ado_review_lens.errors import MCPUserError
+from ado_review_lens.models import MCPConfig
+from ado_review_lens.runtime import LensRuntime
+from ado_review_lens.service import fetch_comments_async
+from ado_review_lens.webhooks import COMMENT_EVENT, UPDATED_EVENT, apply_event, verify_secret
+
+_THREADS_PATH = "/example/team/_apis/git/repositories/repo/pullRequests/7/threads"
+
+_THREADS = {
+    "value": [
+        {
+            "id": 1,
+            "status": "active",
+            "lastUpdatedDate": "2024-01-01T00:00:00Z",
+            "comments": [{"id": 1, "content": "First", "publishedDate": "2024-01-01T00:00:00Z"}],
+        }
+    ]
+}
+
+_PULL_REQUEST = {"pullRequestId": 7, "status": "active", "repository": {"name": "repo", "project": {"name": "team"}}}
+
+
+def _comment_event(thread_id: int, comment_id: int, content: str) -> dict:
+    href = f"https://dev.azure.com/example/_apis/git/repositories/abc/pullRequests/7/threads/{thread_id}"
+    return {
+        "eventType": COMMENT_EVENT,
+        "resource": {
+            "pullRequest": _PULL_REQUEST,
+            "comment": {
+                "id": comment_id,
+                "content": content,
+                "publishedDate": "2024-01-02T00:00:00Z",
+                "lastUpdatedDate": "2024-01-02T00:00:00Z",
+                "_links": {"threads": {"href": href}},
+            },
+        },
+    }
+
+
+@pytest.fixture
+def config() -> MCPConfig:
+    return MCPConfig(
+        organization_url="https://dev.azure.com/example",
+        personal_access_token="token",
+        default_project="team",
+        default_repository="repo",
+        webhook_secret="s3cret",
+    )
+
+
+def test_verify_secret(config: MCPConfig) -> None:
+    verify_secret(config, "s3cret")
+    with pytest.raises(MCPUserError, match="Invalid webhook secret"):
+        verify_secret(config, "wrong")
+    with pytest.raises(MCPUserError, match="not enabled"):
+        verify_secret(config.model_copy(update={"webhook_secret": None}), "s3cret")
+
+
+def test_events_keep_cached_threads_current(config: MCPConfig) -> None:
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request.url.path)
+        if request.url.path == f"{_THREADS_PATH}/2":
+            return httpx.Response(
+                200,
+                json={
+                    "id": 2,
+                    "status": "active",
+                    "lastUpdatedDate": "2024-01-03T00:00:00Z",
+                    "comments": [{"id": 1, "content": "New thread"}],
+                },
+            )
+        return httpx.Response(200, json=_THREADS)
+
+    async def run():
+        runtime = LensRuntime(config, transport=httpx.MockTransport(handler))
+        try:
+            await fetch_comments_async(pr_id=7, runtime=runtime)
+            patched = await apply_event(_comment_event(1, 2, "Reply"), runtime=runtime)
+            fetched = await apply_event(_comment_event(2, 1, "New thread"), runtime=runtime)
+            response = await fetch_comments_async(pr_id=7, runtime=runtime)
+            closed = await apply_event(
+                {"eventType": UPDATED_EVENT, "resource": {**_PULL_REQUEST, "status": "completed"}},
+                runtime=runtime,
+            )
+            return patched, fetched, response, closed
+        finally:
+            await runtime.aclose()
+
+    patched, fetched, response, closed = asyncio.run(run())
+
+    assert (patched.action, fetched.action, closed.action) == ("patched", "fetched", "invalidated")
+    assert [comment.comment_text for comment in response.comments] == ["First", "Reply", "New thread"]
+    assert response.cursor == "2024-01-03T00:00:00Z"
+    # One full download, then only the single unknown thread.
+    assert requests == [_THREADS_PATH, f"{_THREADS_PATH}/2"]